@@ -137,4 +137,7 @@ def main():
         print("프로그램 종료.")
 
 if __name__ == "__main__":
+    import sys
+    # python agv_tfs_display.py [포트]  (예: serial_replay.py 가 출력한 /dev/pts/N 으로 캡처 재생 데이터 사용)
+    PORT = sys.argv[1] if len(sys.argv) > 1 else PORT
     main()
@@ -1,81 +1,75 @@
 import time
 import curses
-from Donkibot_i import Comm
+from Donkibot_i import Comm, ControlLoop, ScreenRenderer
 
 # 시리얼 포트 설정
 PORT = '/dev/ttyUSB0'  # ttyUSB0
 BAUDRATE = 115200
 
 def tfs_control_mode(stdscr, agv):
-    """TFS 센서 값에 따라 AGV를 제어하는 모드"""
+    """TFS 센서 값에 따라 AGV를 제어하는 모드 (제어 루프 통계 dict 반환)"""
     stdscr.clear()
-    stdscr.nodelay(True)
     
     # 제어 파라미터 (필요시 조정)
     BASE_SPEED = 300  # 기본 전진 속도
     DISTANCE_THRESHOLD = 300 # 전진을 시작하는 최소 거리 (mm)
     DISTANCE_MAX_LIMIT = 3000 # 와이어 인식 최대 거리 (mm)
     SPEED_LIMIT = BASE_SPEED # 최대 속도 제한
-
-    # 제어 주기 설정
-    CONTROL_INTERVAL = 0.05  # 50ms
-    last_control_time = 0
-    vl, vr = 0, 0 # 기본값은 정지
     MAX_TURN_SPEED = 200  # 최대 회전 속도 조정값
-    
-    while True:
-        key = stdscr.getch()
-        if key in [ord('q'), ord('Q')]:  # 'q', 'Q' 키로 종료
-            agv.CLR(0, 0) # 메뉴로 돌아가기 전 정지
-            break
 
-        current_time = time.time()
-        
-        # 50ms 마다 제어 명령 전송
-        if current_time - last_control_time < CONTROL_INTERVAL:
-            time.sleep(0.005) # 짧은 대기
-            continue
-            
-        last_control_time = current_time
+    # 제어 주기: 제어 스레드가 새 STS 프레임(약 50ms)마다 한 번 실행하고,
+    # 프레임이 CONTROL_INTERVAL 동안 없으면 마지막 프레임으로 다시 실행 (CLR 유지, 절대 마감 시각 기준)
+    CONTROL_INTERVAL = 0.1  # 100ms (프레임 주기의 2배, TX_KEEPALIVE 이내)
+    # 화면 갱신 주기: 제어 상태 스냅샷을 읽어 바뀐 칸만 다시 씀 (터미널이 느려도 제어 주기에는 영향 없음)
+    RENDER_INTERVAL = 0.1  # 100ms
 
-        try:
-            s = agv.get_latest_data()
-            vl, vr = 0, 0 # 기본값은 정지
+    def control_step():
+        s = agv.get_latest_data()
+        vl, vr = 0, 0 # 기본값은 정지
 
-            # 제어 로직 (CLR 사용)
-            if s.TfsDistance >= DISTANCE_THRESHOLD:
-                # 각도에 따라 좌우 바퀴 속도 차등 분배
-                # TfsAngle: 양수 -> 왼쪽으로 당김, 음수 -> 오른쪽으로 당김
-                turn_effect = int((s.TfsAngle / 90.0) * MAX_TURN_SPEED) * 4
-                
-                vl = turn_effect
-                vr = -turn_effect
-                
-                # 속도 범위 제한
-                vl = max(-SPEED_LIMIT, min(SPEED_LIMIT, vl))
-                vr = max(-SPEED_LIMIT, min(SPEED_LIMIT, vr))
+        # 제어 로직 (CLR 사용)
+        if s.TfsDistance >= DISTANCE_THRESHOLD:
+            # 각도에 따라 좌우 바퀴 속도 차등 분배
+            # TfsAngle: 양수 -> 왼쪽으로 당김, 음수 -> 오른쪽으로 당김
+            turn_effect = int((s.TfsAngle / 90.0) * MAX_TURN_SPEED) * 4
+            
+            vl = turn_effect
+            vr = -turn_effect
+            
+            # 속도 범위 제한
+            vl = max(-SPEED_LIMIT, min(SPEED_LIMIT, vl))
+            vr = max(-SPEED_LIMIT, min(SPEED_LIMIT, vr))
 
-            agv.CLR(-vl, -vr)
+        agv.CLR(-vl, -vr)
+        return s, vl, vr
 
-            # 화면 표시 (매번 갱신)
-            stdscr.clear()
-            stdscr.addstr(0, 0, "TFS 와이어 제어 모드 (m: 메뉴로 돌아가기)")
-            stdscr.addstr(2, 0, f"TFS Rotary Angle   : {s.TfsAngle:4d} °")
-            stdscr.addstr(5, 0, f"명령: Left Wheel={vl}, Right Wheel={vr}")
-            
-            if vl == 0 and vr == 0:
-                stdscr.addstr(7, 0, "상태: 정지")
-            else:
-                stdscr.addstr(7, 0, "상태: 주행 중")
+    view = ScreenRenderer(stdscr)
+    stdscr.timeout(int(RENDER_INTERVAL * 1000))  # getch() 가 최대 RENDER_INTERVAL 동안 키 입력 대기
 
-            stdscr.refresh()
+    with ControlLoop(control_step, CONTROL_INTERVAL, frames=agv) as loop:
+        while True:
+            key = stdscr.getch()
+            if key in [ord('q'), ord('Q')]:  # 'q', 'Q' 키로 종료
+                break
+            if key == curses.KEY_RESIZE:
+                view.invalidate()
 
-        except Exception as e:
-            stdscr.addstr(9, 0, f"제어 오류: {e}")
-            stdscr.refresh()
+            # 화면 표시 (바뀐 부분만 갱신)
+            cells = {(0, 0): "TFS 와이어 제어 모드 (m: 메뉴로 돌아가기)"}
+            snapshot = loop.snapshot()
+            if snapshot is not None:
+                s, vl, vr = snapshot
+                cells[(2, 0)] = f"TFS Rotary Angle   : {s.TfsAngle:4d} °"
+                cells[(5, 0)] = f"명령: Left Wheel={vl}, Right Wheel={vr}"
+                cells[(7, 0)] = "상태: 정지" if vl == 0 and vr == 0 else "상태: 주행 중"
+            if loop.error is not None:
+                cells[(9, 0)] = f"제어 오류: {loop.error}"
+            cells[(11, 0)] = loop.scheduler.summary()
+            view.draw(cells)
         
     stdscr.nodelay(False)
-    agv.CLR(0, 0) # 모드 종료 시 확실히 정지
+    agv.CLR(0, 0) # 모드 종료 시 확실히 정지 (제어 스레드 종료 후)
+    return loop.scheduler.stats()
     
 def main(stdscr):
     """메인 함수: 메뉴를 표시하고 선택된 모드를 실행합니다."""
@@ -106,4 +100,7 @@ def main(stdscr):
     time.sleep(1)
 
 if __name__ == "__main__":
+    import sys
+    # python agv_tfs_lat_control.py [포트]  (예: serial_replay.py 가 출력한 /dev/pts/N 으로 캡처 재생 데이터 사용)
+    PORT = sys.argv[1] if len(sys.argv) > 1 else PORT
     curses.wrapper(main)
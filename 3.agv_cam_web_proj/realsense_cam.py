@@ -20,8 +20,22 @@ class RealSenseCamera:
         self.prev_time = time.time()
         self.fps = 0
 
+    @classmethod
+    def without_device(cls, width=640, height=480, fps=30):
+        """카메라 없이 인코딩 경로(encode_frame)만 사용하는 인스턴스 (벤치마크, 저장된 영상 처리용)"""
+        camera = cls.__new__(cls)
+        camera.width = width
+        camera.height = height
+        camera.fps_setting = fps
+        camera.pipeline = None
+        camera.font = cv2.FONT_HERSHEY_COMPLEX_SMALL
+        camera.prev_time = time.time()
+        camera.fps = 0
+        return camera
+
     def __del__(self):
-        self.pipeline.stop()
+        if self.pipeline is not None:
+            self.pipeline.stop()
 
 
     def draw_overlay(self, frame, depth, fps):
@@ -64,18 +78,21 @@ class RealSenseCamera:
             return jpeg.tobytes()
 
         frame = np.asanyarray(color_frame.get_data())
+
+        # 거리값: 화면 중앙 픽셀의 거리(m), 최대 10m, 최소 0.2m
+        distance = depth_frame.get_distance(int(self.width / 2), int(self.height / 2))
+
+        return self.encode_frame(frame, distance)
+
+    def encode_frame(self, frame, distance):
+        """컬러 프레임(BGR) 크기 조정, FPS/거리 오버레이 후 JPEG bytes 로 변환"""
         frame = cv2.resize(frame, (self.width, self.height))
-        height, width = frame.shape[:2]
 
         # FPS 계산
         curr_time = time.time()
-        self.fps = 1.0 / (curr_time - self.prev_time)
+        self.fps = 1.0 / max(curr_time - self.prev_time, 1e-6)
         self.prev_time = curr_time
 
-        # 거리값: 화면 중앙 픽셀의 거리(m), 최대 10m, 최소 0.2m
-        center_x, center_y = int(width / 2), int(height / 2)
-        distance = depth_frame.get_distance(center_x, center_y)
-
         # 키 이벤트와 거리값 영상 하단에 오버레이
         self.draw_overlay(frame, distance,self.fps)
 
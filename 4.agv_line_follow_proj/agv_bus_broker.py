@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+텔레메트리 브로커 (Linux 전용)
+- 시리얼 포트를 이 프로세스 하나만 열고, 수신한 STS 프레임을 공유 메모리 링(TelemetryBus)에 기록
+- 같은 포트로 실행한 agv_state_disp.py / agv_line_follow_control.py / agv_data_logger.py 는
+  connect_agv() 가 브로커를 찾아 포트 대신 공유 메모리에서 프레임을 읽음 (동시에 여러 개 실행 가능)
+- 속도 명령은 제어권을 가진 프로세스 하나의 CLR 만 전송 (제어 프로그램 > 모니터, 멈추면 BUS_LEASE 후 정지)
+
+python agv_bus_broker.py [포트] [--report 2] [--capacity 4096] [--framing ascii|auto] [--capture agv.cap]
+"""
+
+import argparse
+
+from Donkibot_i import BUS_CAPACITY, FRAMING_ASCII, FRAMING_AUTO, TelemetryBroker
+
+PORT = '/dev/ttyUSB0'  # 실제 환경에 맞게 변경
+BAUDRATE = 115200
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="시리얼 포트를 여러 프로세스가 함께 쓰도록 하는 텔레메트리 브로커")
+    parser.add_argument('port', nargs='?', default=PORT, help="시리얼 포트 (serial_replay.py 의 /dev/pts/N 도 가능)")
+    parser.add_argument('--baudrate', type=int, default=BAUDRATE)
+    parser.add_argument('--capacity', type=int, default=BUS_CAPACITY, help="공유 메모리 링 슬롯 수")
+    parser.add_argument('--framing', choices=(FRAMING_ASCII, FRAMING_AUTO), default=FRAMING_ASCII)
+    parser.add_argument('--capture', help="수신/송신 데이터를 기록할 캡처 파일")
+    parser.add_argument('--report', type=float, default=2.0, help="상태 출력 주기 (s)")
+    args = parser.parse_args()
+
+    with TelemetryBroker(args.port, args.baudrate, capacity=args.capacity,
+                         framing=args.framing, capture=args.capture) as broker:
+        print(f"브로커 {broker.name}: {args.port} -> 공유 메모리 {args.capacity} 슬롯, 소켓 {broker.sock_path}")
+        try:
+            while True:
+                broker.run(duration=args.report)
+                print(f"  {broker.summary()}")
+        except KeyboardInterrupt:
+            pass
+        print(f"브로커 종료: {broker.summary()}")
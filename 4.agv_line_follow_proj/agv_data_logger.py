@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STS 프레임 CSV 기록기
+- agv_bus_broker.py 가 실행 중이면 제어 프로그램과 같은 포트를 함께 쓰면서 기록 (속도 명령은 보내지 않음),
+  없으면 포트를 직접 열고 CLR(0,0) 을 보내며 기록
+- history 링에서 since(마지막 순번) 으로 새 프레임을 묶어서 가져오므로 주기마다 프레임을 하나씩 복사하지 않음
+- 열: seq, t_rx(time.monotonic()), t_wall(벽시계 시각), STS 필드 11개
+
+python agv_data_logger.py [포트] [-o agv_log.csv] [--interval 0.2] [--duration 60]
+"""
+
+import argparse
+import csv
+import time
+
+from Donkibot_i import STS_FIELD_NAMES, BusComm, connect_agv
+
+PORT = '/dev/ttyUSB0'  # 실제 환경에 맞게 변경
+BAUDRATE = 115200
+COLUMNS = ('seq', 't_rx') + STS_FIELD_NAMES
+
+
+def take_new_rows(agv, last_seq: int):
+    """
+    last_seq 이후 프레임 행 복사본과 (새 마지막 순번, 버린 행 수)
+    - 브로커 링 view 는 복사한 뒤 ver 를 다시 비교해, 복사 도중 덮어써진(한 바퀴 밀린) 행은 버림
+    """
+    view = agv.since(last_seq)
+    rows = view.copy()
+    dropped = 0
+    if 'ver' in rows.dtype.names:
+        valid = ((rows['ver'] & 1) == 0) & (rows['ver'] == view['ver']) & (rows['seq'] > last_seq)
+        dropped = len(rows) - int(valid.sum())
+        rows = rows[valid]
+    if len(rows):
+        last_seq = int(rows['seq'][-1])
+    return rows, last_seq, dropped
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AGV STS 프레임을 CSV 로 기록")
+    parser.add_argument('port', nargs='?', default=PORT)
+    parser.add_argument('--baudrate', type=int, default=BAUDRATE)
+    parser.add_argument('-o', '--output', default=time.strftime('agv_log_%Y%m%d_%H%M%S.csv'))
+    parser.add_argument('--interval', type=float, default=0.2, help="링에서 새 프레임을 가져오는 주기 (s)")
+    parser.add_argument('--duration', type=float, help="기록 시간 (s), 생략 시 Ctrl+C 까지")
+    args = parser.parse_args()
+
+    agv = connect_agv(args.port, args.baudrate)
+    on_bus = isinstance(agv, BusComm)
+    wall_offset = time.time() - time.monotonic()
+    last_seq = agv.frame_seq
+    written = dropped = 0
+    print(f"기록 시작: {args.port}{' (텔레메트리 브로커)' if on_bus else ''} -> {args.output}")
+    end = None if args.duration is None else time.monotonic() + args.duration
+    try:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS[:2] + ('t_wall',) + COLUMNS[2:])
+            while end is None or time.monotonic() < end:
+                if not on_bus:
+                    agv.CLR(0, 0)      # 최소 명령을 주어야 응답함
+                time.sleep(args.interval)
+                rows, last_seq, lost = take_new_rows(agv, last_seq)
+                dropped += lost
+                for row in rows:
+                    seq, t_rx = int(row['seq']), float(row['t_rx'])
+                    writer.writerow([seq, f"{t_rx:.6f}", f"{t_rx + wall_offset:.6f}"] +
+                                    [int(row[name]) for name in STS_FIELD_NAMES])
+                written += len(rows)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if not on_bus:
+            agv.CLR(0, 0)
+        agv.destroy()
+    print(f"기록 종료: {written} 프레임, 버린 행 {dropped}")
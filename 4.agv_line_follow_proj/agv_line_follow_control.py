@@ -1,10 +1,11 @@
 import time
 import curses
-from Donkibot_i import Comm
+from Donkibot_i import BUS_PRIORITY_CONTROL, ControlLoop, FrameFilter, LineController, ObstacleGovernor, ScreenRenderer, connect_agv
 
 # 시리얼 포트 설정
 PORT = '/dev/ttyUSB0'  # 실제 환경에 맞게 변경
 BAUDRATE = 115200
+LATENCY_DUMP = None  # 종료 시 감지-구동 지연 히스토그램을 저장할 JSON 파일 (None: 저장 안 함)
 
 # AGV 제어 상태
 agv_running = False
@@ -80,193 +81,171 @@ def display_data_mode(stdscr, agv):
 
 
 def line_follow_control_mode(stdscr, agv):
-    """라인 추종 제어 모드 - 단순화된 LCU 기반 제어"""
+    """라인 추종 제어 모드 - 단순화된 LCU 기반 제어 (제어 루프 통계 dict 반환)"""
     global agv_running, agv_paused
     
     stdscr.clear()
-    stdscr.nodelay(True)
     
     # 제어 파라미터 설정 (단순화)
     BASE_SPEED = 150          # 기본 전진 속도 (최대 1m/s 고려)
     MAX_SPEED = 200           # 최대 속도 제한
-    TURN_SPEED_DIFF = 50      # 회전시 좌우 바퀴 속도 차이
-    OBSTACLE_E_STOP_DISTANCE = 150  # 장애물 감지 거리 임계값 (mm)
-    
-    # 제어 주기
-    CONTROL_INTERVAL = 0.05  # 50ms
-    last_control_time = 0
+    line_controller = LineController()  # 표 기반 PD 라인 추종 제어기 (이득: LINE_GAINS)
+    OBSTACLE_E_STOP_DISTANCE = 150  # 장애물 최후 수단 정지 거리 (mm)
+    # 장애물 속도 조절: 충돌 예상 시간(TTC)으로 기본 속도를 연속으로 낮추고, 정지 거리 안에서만 정지 (설정: OBSTACLE_GAINS)
+    governor = ObstacleGovernor({'stop_distance': OBSTACLE_E_STOP_DISTANCE})
+    # 센서 필터: 라이다 한 프레임짜리 튐으로 정지하지 않도록 이동 중앙값 적용 (단계 설정: SENSOR_FILTERS)
+    sensors = FrameFilter().attach(agv)
     
-    while True:
-        key = stdscr.getch()
-        
-        # 키 입력 처리
-        if key in [ord('m'), ord('M'), 27]:  # M 또는 ESC: 메뉴로 돌아가기
-            agv.CLR(0, 0)  # 안전 정지
-            break
-        elif key in [ord('s'), ord('S')]:  # S: 시작/재개
-            if not agv_running:
-                agv_running = True
-                agv_paused = False
-            elif agv_paused:
-                agv_paused = False
-        elif key in [ord('p'), ord('P')]:  # P: 일시정지
-            if agv_running:
-                agv_paused = True
-                agv.CLR(0, 0)  # 즉시 정지
-        elif key in [ord('x'), ord('X')]:  # X: 완전정지
+    # 제어 주기: 제어 스레드가 새 STS 프레임(약 50ms)마다 한 번 실행하고,
+    # 프레임이 CONTROL_INTERVAL 동안 없으면 마지막 프레임으로 다시 실행 (CLR 유지, 절대 마감 시각 기준)
+    CONTROL_INTERVAL = 0.1  # 100ms (프레임 주기의 2배, TX_KEEPALIVE 이내)
+    # 화면 갱신 주기: 제어 상태 스냅샷을 읽어 바뀐 칸만 다시 씀 (터미널이 느려도 제어 주기에는 영향 없음)
+    RENDER_INTERVAL = 0.1  # 100ms
+
+    def control_step():
+        global agv_running, agv_paused
+        s = sensors.get_latest_data()
+        vl, vr = 0, 0
+        status_msg = ""
+
+        # 라이다 거리/변화율로 허용 속도 계산, 정지 거리 이내면 장애물 정지 (해제는 여유 거리 + 유지 시간)
+        speed_limit = governor.update(s.LidarDistance, s.Speed, sensors.rate('LidarDistance'))
+        agv_obstacle_detected = governor.stopped
+
+        # 1단계: 안전 조건 확인
+        if s.EmgFlag == 1:
+            vl, vr = 0, 0
+            status_msg = "🚨 비상정지 활성화"
             agv_running = False
             agv_paused = False
-            agv.CLR(0, 0)  # 즉시 정지
 
-        current_time = time.time()
-        
-        # 제어 주기 체크
-        if current_time - last_control_time < CONTROL_INTERVAL:
-            time.sleep(0.005)
-            continue
-            
-        dt = current_time - last_control_time
-        last_control_time = current_time
+        elif agv_obstacle_detected == True:  # 장애물 감지 (주행 상태는 유지, 조절기 해제 조건을 만족하면 자동 재출발)
+            vl, vr = 0, 0
+            status_msg = "🚧 장애물 감지 - 정지"    
 
-        
-        try:
-            s = agv.get_latest_data()
+        elif not agv_running:
             vl, vr = 0, 0
-            status_msg = ""
+            status_msg = "⏹️ 정지 상태 (메뉴에서 시작하세요)"
+            
+        elif agv_paused:
+            vl, vr = 0, 0
+            status_msg = "⏸️ 일시정지 중"
+            
+        else:
+            line_pos = s.LinePos  # -15 ~ +15 범위
+            
+            # 라인 센서 기반 제어 (표 기반 PD + 편차에 따른 감속)
+            vl, vr = line_controller.update(line_pos, min(BASE_SPEED, speed_limit))
+            if vl == 0 and vr == 0:
+                status_msg = "🚧 장애물 앞 감속 정지"
+            elif vl < 0 or vr < 0:
+                # 편차가 커서 안쪽 바퀴가 역회전 - 제자리 회전에 가까움
+                status_msg = "[TURN-L] 제자리 좌회전" if vl < vr else "[TURN-R] 제자리 우회전"
+            elif vl == vr:
+                status_msg = "[FORWARD] 직진"
+            elif vl < vr:
+                # 라인이 왼쪽에 있으면 왼쪽으로 회전
+                status_msg = "[LEFT] 좌회전"
+            else:
+                # 라인이 오른쪽에 있으면 오른쪽으로 회전
+                status_msg = "[RIGHT] 우회전"
 
-            # 라이다 장애물 감지 플래그 (예: 200mm 이내)
-            agv_obstacle_detected = False
+        if not (agv_running and not agv_paused) or agv_obstacle_detected:
+            line_controller.reset()  # 재출발 첫 주기에 D 항이 튀지 않도록
+            
+        # 속도 제한
+        vl = max(-MAX_SPEED, min(MAX_SPEED, vl))
+        vr = max(-MAX_SPEED, min(MAX_SPEED, vr))
 
-            if s.LidarDistance < OBSTACLE_E_STOP_DISTANCE:
-                agv_obstacle_detected = True
+        # 명령 전송
+        agv.CLR(int(vl), int(vr))
+        return s, vl, vr, status_msg, agv_running and not agv_paused, speed_limit, governor.ttc
 
-            # 1단계: 안전 조건 확인
-            if s.EmgFlag == 1:
-                vl, vr = 0, 0
-                status_msg = "🚨 비상정지 활성화"
-                agv_running = False
-                agv_paused = False
+    view = ScreenRenderer(stdscr)
+    stdscr.timeout(int(RENDER_INTERVAL * 1000))  # getch() 가 최대 RENDER_INTERVAL 동안 키 입력 대기
 
-            elif agv_obstacle_detected == True:  # 장애물 감지 
-                vl, vr = 0, 0
-                status_msg = "🚧 장애물 감지 - 정지"    
-                agv_running = False
-                agv_paused = False
+    with ControlLoop(control_step, CONTROL_INTERVAL, name='line_follow', frames=agv) as loop:
+        while True:
+            key = stdscr.getch()
+            
+            # 키 입력 처리 (제어 스레드와 같은 lock 안에서 상태 변경)
+            if key in [ord('m'), ord('M'), 27]:  # M 또는 ESC: 메뉴로 돌아가기
+                break
+            with loop.lock:
+                if key in [ord('s'), ord('S')]:  # S: 시작/재개
+                    if not agv_running:
+                        agv_running = True
+                        agv_paused = False
+                    elif agv_paused:
+                        agv_paused = False
+                elif key in [ord('p'), ord('P')]:  # P: 일시정지
+                    if agv_running:
+                        agv_paused = True
+                        agv.CLR(0, 0)  # 즉시 정지
+                elif key in [ord('x'), ord('X')]:  # X: 완전정지
+                    agv_running = False
+                    agv_paused = False
+                    agv.CLR(0, 0)  # 즉시 정지
+            if key == curses.KEY_RESIZE:
+                view.invalidate()
 
-            elif not agv_running:
-                vl, vr = 0, 0
-                status_msg = "⏹️ 정지 상태 (메뉴에서 시작하세요)"
-                
-            elif agv_paused:
-                vl, vr = 0, 0
-                status_msg = "⏸️ 일시정지 중"
-                
-            else:
-                line_pos = s.LinePos  # -15 ~ +15 범위
-                
-                # 라인 센서 기반 제어 로직
-                if abs(line_pos) > 8:
-                    # ±8을 넘어가면 제자리 턴
-                    if line_pos < -8:
-                        # 라인이 왼쪽에 많이 벗어남 - 제자리 좌회전
-                        vl = -TURN_SPEED_DIFF
-                        vr = TURN_SPEED_DIFF
-                        status_msg = "[TURN-L] 제자리 좌회전"
-                    else:
-                        # 라인이 오른쪽에 많이 벗어남 - 제자리 우회전
-                        vl = TURN_SPEED_DIFF
-                        vr = -TURN_SPEED_DIFF
-                        status_msg = "[TURN-R] 제자리 우회전"
-                elif line_pos == 0:
-                    # 중앙에 있으면 직진
-                    vl = BASE_SPEED
-                    vr = BASE_SPEED
-                    status_msg = "[FORWARD] 직진"
-                elif line_pos < 0:
-                    # 라인이 왼쪽에 있으면 왼쪽으로 부드럽게 회전
-                    turn_intensity = abs(line_pos) / 8.0  # 0~1 정규화 (±8 범위)
-                    speed_reduction = int(TURN_SPEED_DIFF * turn_intensity)
-                    vl = BASE_SPEED - speed_reduction
-                    vr = BASE_SPEED
-                    status_msg = "[LEFT] 좌회전"
-                else:
-                    # 라인이 오른쪽에 있으면 오른쪽으로 부드럽게 회전
-                    turn_intensity = abs(line_pos) / 8.0  # 0~1 정규화 (±8 범위)
-                    speed_reduction = int(TURN_SPEED_DIFF * turn_intensity)
-                    vl = BASE_SPEED
-                    vr = BASE_SPEED - speed_reduction
-                    status_msg = "[RIGHT] 우회전"
-                
-            # 속도 제한
-            vl = max(-MAX_SPEED, min(MAX_SPEED, vl))
-            vr = max(-MAX_SPEED, min(MAX_SPEED, vr))
+            # 화면 표시 (바뀐 부분만 갱신)
+            cells = {
+                (0, 0): "=" * 70,
+                (1, 0): "         AGV LCU 라인 트레이싱 제어",
+                (2, 0): "=" * 70,
+                (3, 0): "키 제어: S=시작/재개 | P=일시정지 | X=완전정지 | M=메뉴",
+            }
+            snapshot = loop.snapshot()
+            if snapshot is not None:
+                s, vl, vr, status_msg, driving, speed_limit, ttc = snapshot
 
-            # 명령 전송
-            agv.CLR(int(vl), int(vr))
+                # 센서 데이터
+                cells[(5, 2)] = "[SENSOR] 센서 데이터"
+                cells[(6, 4)] = f"LCU 라인 위치  : {s.LinePos:5d} (-15:왼쪽 <- 0:중앙 -> 15:오른쪽)"
+                cells[(7, 4)] = f"LiDAR 거리     : {s.LidarDistance:5d} mm (raw {sensors.raw.LidarDistance:5d})"
+                cells[(8, 4)] = f"배터리 SOC     : {s.SOC:5d} %"
+                cells[(9, 4)] = f"비상정지       : {'[ACTIVE]' if s.EmgFlag else '[OFF]'}"
+                cells[(10, 4)] = f"속도           : {s.Speed:5d} mm/s"
+                cells[(11, 4)] = f"오도미터       : {s.Odometer:6d} mm"
+                cells[(12, 4)] = f"TAG #1       : {s.RF_tag1:5d} index"
+                cells[(13, 4)] = f"TAG #2       : {s.RF_tag2:6d} mm/s"
 
-            # 화면 표시
-            stdscr.clear()
-            stdscr.addstr(0, 0, "=" * 70)
-            stdscr.addstr(1, 0, "         AGV LCU 라인 트레이싱 제어")
-            stdscr.addstr(2, 0, "=" * 70)
-            stdscr.addstr(3, 0, "키 제어: S=시작/재개 | P=일시정지 | X=완전정지 | M=메뉴")
-            
-            # 센서 데이터
-            stdscr.addstr(5, 2, "[SENSOR] 센서 데이터")
-            stdscr.addstr(6, 4, f"LCU 라인 위치  : {s.LinePos:5d} (-15:왼쪽 <- 0:중앙 -> 15:오른쪽)")
-            stdscr.addstr(7, 4, f"LiDAR 거리     : {s.LidarDistance:5d} mm")
-            stdscr.addstr(8, 4, f"배터리 SOC     : {s.SOC:5d} %")
-            stdscr.addstr(9, 4, f"비상정지       : {'[ACTIVE]' if s.EmgFlag else '[OFF]'}")
-            stdscr.addstr(10, 4, f"속도           : {s.Speed:5d} mm/s") 
-            stdscr.addstr(11, 4, f"오도미터       : {s.Odometer:6d} mm")
-            stdscr.addstr(12, 4, f"TAG #1       : {s.RF_tag1:5d} index") 
-            stdscr.addstr(13, 4, f"TAG #2       : {s.RF_tag2:6d} mm/s")
-            
-            # 라인 위치 시각화 (300mm 기준)
-            stdscr.addstr(15, 2, "[VISUAL] LCU 라인 위치 시각화")
-            line_visual = "L" + "=" * 15 + "C" + "=" * 15 + "R"
-            marker_pos = 15 + s.LinePos + 1  # 중앙(15) + 위치(-15~15) + 여백(1)
-            marker_pos = max(0, min(len(line_visual), marker_pos))
-            marker_line = " " * marker_pos + "^"
-            stdscr.addstr(18, 4, line_visual)
-            stdscr.addstr(19, 4, marker_line)
-            
-            # 제어 상태
-            stdscr.addstr(21, 2, "[CONTROL] 제어 상태")
-            stdscr.addstr(22, 4, f"상태: {status_msg}")
-            stdscr.addstr(23, 4, f"좌측 바퀴: {int(vl):4d}, 우측 바퀴: {int(vr):4d}")
-            
-            if agv_running and not agv_paused and s.EmgFlag == 0:
-                stdscr.addstr(28, 4, f"라인 위치: {s.LinePos:3d}, 속도 차이: {abs(vr-vl):3d}")
-                stdscr.addstr(29, 4, f"기본 속도: {BASE_SPEED}, 회전 강도: {TURN_SPEED_DIFF}")
-            
-            # 제어 방식 설명 (안전한 출력)
-            try:
-                max_y, max_x = stdscr.getmaxyx()     #현재 콘솔의 크기 반환
-                if max_y > 21:
-                    stdscr.addstr(21, 2, "[INFO] 라인 추종 제어 (제자리 턴 포함)")
-                if max_y > 22:
-                    stdscr.addstr(22, 4, "±8 이하: 부드러운 회전 | ±8 초과: 제자리 턴")
-                if max_y > 23:
-                    stdscr.addstr(23, 4, "중앙(0): 직진 | 왼쪽(-): 좌회전 | 오른쪽(+): 우회전")
-                if max_y > 25:
-                    stdscr.addstr(25, 2, f"업데이트: {time.strftime('%H:%M:%S')}")
-            except:
-                pass
+                # 라인 위치 시각화 (300mm 기준)
+                cells[(15, 2)] = "[VISUAL] LCU 라인 위치 시각화"
+                line_visual = "L" + "=" * 15 + "C" + "=" * 15 + "R"
+                marker_pos = 15 + s.LinePos + 1  # 중앙(15) + 위치(-15~15) + 여백(1)
+                marker_pos = max(0, min(len(line_visual), marker_pos))
+                cells[(18, 4)] = line_visual
+                cells[(19, 4)] = " " * marker_pos + "^"
 
-            stdscr.refresh()
+                # 제어 상태
+                cells[(21, 2)] = "[CONTROL] 제어 상태"
+                cells[(22, 4)] = f"상태: {status_msg}"
+                cells[(23, 4)] = f"좌측 바퀴: {int(vl):4d}, 우측 바퀴: {int(vr):4d}"
+                cells[(24, 4)] = f"장애물 허용 속도: {speed_limit:5.0f} mm/s, TTC: {ttc:5.1f} s"
 
-        except Exception as e:
-            try:
-                max_y, max_x = stdscr.getmaxyx()
-                if max_y > 20:
-                    stdscr.addstr(20, 0, f"[ERROR] 제어 오류: {str(e)}")
-                stdscr.refresh()
-            except:
-                pass
+                if driving and s.EmgFlag == 0:
+                    cells[(28, 4)] = f"라인 위치: {s.LinePos:3d}, 속도 차이: {abs(vr-vl):3d}"
+                    cells[(29, 4)] = (f"기본 속도: {BASE_SPEED}, kp: {line_controller.gains['kp']}, "
+                                      f"kd: {line_controller.gains['kd']}")
+
+            # 제어 방식 설명 (화면 밖 좌표는 ScreenRenderer 가 무시)
+            cells[(21, 2)] = "[INFO] 라인 추종 제어 (PD, 표 조회)"
+            cells[(22, 4)] = "편차 비례 조향 + 변화 감쇠 | 큰 편차: 감속, 제자리 턴에 가까움"
+            cells[(23, 4)] = "중앙(0): 직진 | 왼쪽(-): 좌회전 | 오른쪽(+): 우회전"
+            cells[(25, 2)] = f"업데이트: {time.strftime('%H:%M:%S')}"
+            cells[(26, 2)] = loop.scheduler.summary()
+            if agv.tracer is not None:
+                cells[(27, 2)] = agv.tracer.summary()
+            if loop.error is not None:
+                cells[(20, 0)] = f"[ERROR] 제어 오류: {loop.error}"
+            view.draw(cells)
         
     stdscr.nodelay(False)
+    sensors.detach()
     agv.CLR(0, 0)
+    return loop.scheduler.stats()
     
 def main(stdscr):
     """메인 함수: 메뉴를 표시하고 선택된 모드를 실행합니다."""
@@ -281,7 +260,7 @@ def main(stdscr):
     agv = None
     
     try:
-        agv = Comm(port=PORT, baudrate=BAUDRATE)
+        agv = connect_agv(PORT, BAUDRATE, priority=BUS_PRIORITY_CONTROL)   # 브로커가 있으면 속도 명령 제어권을 가져감
     except Exception as e:
         stdscr.clear()
         stdscr.addstr(0, 0, "❌ AGV 연결 실패!")
@@ -317,10 +296,16 @@ def main(stdscr):
     agv_paused = False
     agv.CLR(0, 0)  # 안전 정지
     agv.destroy()
+    if LATENCY_DUMP and agv.tracer is not None:
+        agv.tracer.dump(LATENCY_DUMP)
     stdscr.clear()
     stdscr.addstr(0, 0, "프로그램이 안전하게 종료되었습니다.")
     stdscr.refresh()
     time.sleep(1)
 
 if __name__ == "__main__":
+    import sys
+    # python agv_line_follow_control.py [포트] [지연 기록 JSON]  (예: serial_replay.py 가 출력한 /dev/pts/N 으로 캡처 재생 데이터 사용)
+    PORT = sys.argv[1] if len(sys.argv) > 1 else PORT
+    LATENCY_DUMP = sys.argv[2] if len(sys.argv) > 2 else LATENCY_DUMP
     curses.wrapper(main)
@@ -1,6 +1,6 @@
 import time
 import curses
-from Donkibot_i import Comm
+from Donkibot_i import BusComm, connect_agv
 
 # 시리얼 포트 설정
 PORT = '/dev/ttyUSB0'  # 실제 환경에 맞게 변경
@@ -30,7 +30,8 @@ def display_data_mode(stdscr, agv):
     stdscr.nodelay(True)
     
     while True:
-        agv.CLR(0,0)      # 최소 명령을 주어야 응답함
+        if not isinstance(agv, BusComm):
+            agv.CLR(0,0)      # 최소 명령을 주어야 응답함 (브로커 사용 시에는 브로커가 보냄)
         key = stdscr.getch()
         if key in [ord('m'), ord('M'), 27]: # 'm' 또는 ESC 키
             break
@@ -59,11 +60,23 @@ def display_data_mode(stdscr, agv):
             stdscr.addstr(11, 0, f"RF_tag1 INDEX    | {agv_status.RF_tag1:^10d}")
             stdscr.addstr(12, 0, f"RF_tag2 제한속도 | {agv_status.RF_tag2:^10d} mm/s")
 
-            stdscr.addstr(14, 0, f"마지막 업데이트: {time.strftime('%H:%M:%S')}")
+            link = agv.stats()
+            gap = link['gap_ms']
+            stdscr.addstr(14, 0, f"링크: {link['frames_per_sec']:5.1f} frame/s | "
+                                 f"RX {link['rx_bytes_per_sec']:6.0f} B/s | TX {link['tx_bytes_per_sec']:5.0f} B/s   ")
+            stdscr.addstr(15, 0, f"프레임 간격: 평균 {gap['mean']:5.1f} ms, 최대 {gap['max']:6.1f} ms | "
+                                 f"파싱 오류 {sum(link['parse_errors'].values())}   ")
+            if 'bus' in link:
+                bus = link['bus']
+                stdscr.addstr(16, 0, f"브로커: {bus['name']} (pid {bus['broker_pid']}, "
+                                     f"{'실행 중' if bus['broker_alive'] else '응답 없음'}) | "
+                                     f"제어권 pid {bus['owner_pid'] or '-'} | 놓친 프레임 {bus['lapped']}   ")
+
+            stdscr.addstr(18, 0, f"마지막 업데이트: {time.strftime('%H:%M:%S')}")
             stdscr.refresh()
             
         except Exception as e:
-            stdscr.addstr(14, 0, f"데이터 수신 오류: {e}")
+            stdscr.addstr(18, 0, f"데이터 수신 오류: {e}")
             stdscr.refresh()
         
         time.sleep(0.1)
@@ -85,8 +98,8 @@ def main(stdscr):
     stdscr.clear()
 
     try:
-        agv = Comm(port=PORT, baudrate=BAUDRATE)
-        stdscr.addstr(0, 0, f"✅ AGV 연결 성공: {PORT}")
+        agv = connect_agv(PORT, BAUDRATE)     # agv_bus_broker.py 가 실행 중이면 브로커를 통해 읽음
+        stdscr.addstr(0, 0, f"✅ AGV 연결 성공: {PORT}" + (" (텔레메트리 브로커)" if isinstance(agv, BusComm) else ""))
         stdscr.addstr(1, 0, "2초 후 메뉴로 이동합니다...")
         stdscr.refresh()
 
@@ -115,7 +128,8 @@ def main(stdscr):
     # 종료 처리
     agv_running = False
     agv_paused = False
-    agv.CLR(0, 0)  # 안전 정지
+    if not isinstance(agv, BusComm):
+        agv.CLR(0, 0)  # 안전 정지 (브로커 사용 시 모니터는 제어 프로그램의 명령을 덮어쓰지 않음)
     agv.destroy()
     stdscr.clear()
     stdscr.addstr(0, 0, "프로그램이 안전하게 종료되었습니다.")
@@ -123,4 +137,7 @@ def main(stdscr):
     time.sleep(1)
 
 if __name__ == "__main__":
+    import sys
+    # python agv_state_disp.py [포트]  (예: serial_replay.py 가 출력한 /dev/pts/N 으로 캡처 재생 데이터 사용)
+    PORT = sys.argv[1] if len(sys.argv) > 1 else PORT
     curses.wrapper(main)
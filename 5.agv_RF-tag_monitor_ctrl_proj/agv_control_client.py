@@ -4,7 +4,8 @@ import json
 import curses
 import requests
 from enum import Enum
-from Donkibot_i import Comm
+from Donkibot_i import (ODOMETER_MM_PER_COUNT, SYSTEM_CLOCK, Comm, FrameFilter, LineController, ObstacleGovernor,
+                        SpeedProfilePlanner)
 import functools
 
 AGV_STATE_INITIAL = 0
@@ -22,8 +23,9 @@ class CMD_AGV(Enum):
     RESUME = 4
     NONE = 0
 
-OBSTACLE_THRESHOLD = 150  # 장애물 감지 임계값 (mm)
-detect_curved_motion_radius = 5  # 곡선 주행 감지 반경
+OBSTACLE_THRESHOLD = 150  # 장애물 최후 수단 정지 거리 (mm), 그 앞에서는 ObstacleGovernor 가 TTC 로 감속
+CONTROL_INTERVAL = 0.05   # STM 의 STS 송신 주기 (s)
+FRAME_TIMEOUT = 2 * CONTROL_INTERVAL  # 새 프레임을 기다리는 최대 시간 (TX_KEEPALIVE 이내), 넘으면 마지막 명령만 재송신
     
 class AGV_MACHINE_OPERATE:
     # [삭제 용이] AGV 궤적 로그 함수
@@ -33,7 +35,7 @@ class AGV_MACHINE_OPERATE:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
             f.write(f"{timestamp} - {str}\n")    
 
-    def __init__(self):
+    def __init__(self, agv_port='/dev/ttyUSB0', clock=SYSTEM_CLOCK, transport=None):
         self.agv_info_2_server = {
             "SOC": 100,                  # State of Charge
             "LIDAR": 1200,               # LIDAR distance in mm
@@ -58,21 +60,32 @@ class AGV_MACHINE_OPERATE:
         
         self.server_post_url = 'http://localhost:5000/client_data'
         self.server_get_url = 'http://localhost:5000/server_data'
+        self.server_waypoints_url = 'http://localhost:5000/waypoints'  # WP 별 경로 위치/속도 제한 (속도 프로파일용)
         self.str_server_post_error = ""
         self.str_server_get_error = ""
         self.agv_clr_cmd = ""
+        self.last_clr = (0, 0)  # 마지막으로 보낸 바퀴 속도 (프레임이 늦을 때 재송신)
         self.isServer_connected = False
         self.isRunning = True
         
         self.agv_comm = None  # 하드웨어 통신 객체 초기화
-        self.agv_port = '/dev/ttyUSB0'  # 실제 AGV와 연결된 포트 설정
+        self.line_controller = LineController()  # 표 기반 PD 라인 추종 제어기 (이득 변경: set_gains())
+        self.sensor_filter = None  # 센서 필터 (하드웨어 연결 시 Comm 에 연결, 단계 설정: SENSOR_FILTERS)
+        self.agv_port = agv_port  # 실제 AGV와 연결된 포트 설정 (시뮬레이터 headless 모드는 pty 경로)
         self.agv_baudrate = 115200
+        self.clock = clock          # VirtualClock 을 주면 시뮬레이터와 같은 가상 시간으로 실행
+        self.transport = transport  # pty_harness.LoopbackSerial 등 프로세스 내부 연결 (없으면 agv_port 를 염)
+        # 장애물 속도 조절기: 라이다 거리/변화율로 허용 속도를 낮추고, OBSTACLE_THRESHOLD 안에서만 정지 (설정: OBSTACLE_GAINS)
+        self.obstacle_governor = ObstacleGovernor({'stop_distance': OBSTACLE_THRESHOLD}, clock=clock)
+        # RF 태그 구간 속도 프로파일: 서버 waypoints 를 받으면 느린 구간 앞에서 미리 감속 (받기 전에는 태그 속도 제한 그대로)
+        self.speed_planner = SpeedProfilePlanner(mm_per_count=ODOMETER_MM_PER_COUNT, clock=clock)
         self.comm_lock = threading.Lock()
         self.agv_data = {
             "line_pos": 0,
             "lidar_distance": 1500,
             "emg_flag": 0,
             "speed": 0,
+            "odometer": 0,
             "tag1": 0,
             "tag2": 100,
             "battery_soc": 100,
@@ -83,7 +96,11 @@ class AGV_MACHINE_OPERATE:
         
         self.tx_thread = threading.Thread(target=self.send_data_to_server, daemon=True)
         self.rx_thread = threading.Thread(target=self.rx_data_from_server, daemon=True)
-        self.on_moving_agv_thread = threading.Thread(target=self.main_control_loop, daemon=True)
+        # 제어 스레드 이름은 CLR 감지-구동 지연 추적 라벨 (agv_comm.stats()['latency'])
+        self.on_moving_agv_thread = threading.Thread(target=self.main_control_loop, name='station_client',
+                                                     daemon=True)
+        for thread in (self.tx_thread, self.rx_thread, self.on_moving_agv_thread):
+            self.clock.register(thread)
         
         self.tx_thread.start()
         self.rx_thread.start()
@@ -102,7 +119,8 @@ class AGV_MACHINE_OPERATE:
     def initialize_hardware(self):
         """AGV 하드웨어 초기화"""
         try:
-            self.agv_comm = Comm(self.agv_port, self.agv_baudrate)
+            self.agv_comm = Comm(self.agv_port, self.agv_baudrate, clock=self.clock, transport=self.transport)
+            self.sensor_filter = FrameFilter(clock=self.clock).attach(self.agv_comm)
             self.isConnected_to_agv = True
             print("AGV 하드웨어에 연결되었습니다:", self.agv_port)
         except Exception as e:
@@ -114,15 +132,18 @@ class AGV_MACHINE_OPERATE:
         with self.comm_lock:
             if self.agv_comm is not None:
                 try:
-                    data = self.agv_comm.get_latest_data()
+                    data = self.sensor_filter.get_latest_data()  # 라이다 튐 등을 걸러낸 최신 프레임
                     self.agv_data["line_pos"] = data.LinePos
                     self.agv_info_2_server['LIDAR'] = self.agv_data["lidar_distance"] = data.LidarDistance
                     self.agv_data["emg_flag"] = data.EmgFlag
                     self.agv_info_2_server['CURRENT_SPEED'] = self.agv_data["speed"] = data.Speed
+                    self.agv_data["odometer"] = data.Odometer
                     
                     self.agv_info_2_server['RF_TAG'] = self.agv_data["tag1"] = data.RF_tag1 #Next RF-Tag ID
                     self.agv_info_2_server['SPEED_LIMIT'] = self.agv_data["tag2"] = data.RF_tag2 #Speed_limit
                     self.agv_info_2_server['BATTERY_SOC'] = self.agv_data["battery_soc"] = data.SOC
+                    self.obstacle_governor.update(data.LidarDistance, data.Speed,
+                                                  self.sensor_filter.rate('LidarDistance'))
                     
                     
                 except Exception as e:
@@ -152,7 +173,7 @@ class AGV_MACHINE_OPERATE:
                 with self.comm_lock:
                     self.str_server_post_error = f"Error sending data to server: {e}"
                     self.isServer_connected = False
-            time.sleep(.05)  # 50ms 간격으로 전송        
+            self.clock.sleep(.05)  # 50ms 간격으로 전송        
 
 # 수신 스레드: 100ms마다 서버 메시지 수신 및 처리
     def rx_data_from_server(self):
@@ -168,7 +189,7 @@ class AGV_MACHINE_OPERATE:
             except Exception as e:
                 with self.comm_lock:
                     self.str_server_get_error = f"Error receiving data from server: {e}"
-            time.sleep(.1)  # 100ms 간격으로 수신
+            self.clock.sleep(.1)  # 100ms 간격으로 수신
        
 
 # 수신 스레드: 100ms마다 서버 메시지 수신 및 처리
@@ -176,24 +197,52 @@ class AGV_MACHINE_OPERATE:
 
         while self.isRunning:
             try:
+                if not self.speed_planner.route:
+                    self.load_route()
                 response = requests.get(self.server_get_url)
                 self.cmd_data_to_client = response.json()
                 self.str_server_get_error = ""
                     
             except Exception as e:
                 self.str_server_get_error = f"Error receiving data from server: {e}"
-            time.sleep(.1)  # 100ms 간격으로 수신
+            self.clock.sleep(.1)  # 100ms 간격으로 수신
             
         
+    def load_route(self):
+        """서버 waypoints(id, s, speed)를 받아 속도 프로파일 경로로 설정 (실패 시 다음 수신 주기에 다시 시도)"""
+        try:
+            waypoints = requests.get(self.server_waypoints_url, timeout=1).json()
+            route = [wp for wp in waypoints if 's' in wp and 'speed' in wp]
+            if route:
+                with self.comm_lock:
+                    self.speed_planner.set_route(route)
+        except Exception as e:
+            self.str_server_get_error = f"Error receiving waypoints from server: {e}"
+
+    def wait_for_sensor_frame(self, last_seq):
+        """새 STS 프레임 수신까지 대기 (최대 FRAME_TIMEOUT) 후 프레임 순번 반환 (last_seq 그대로면 시간 초과)"""
+        if self.agv_comm is None:
+            self.clock.sleep(CONTROL_INTERVAL)
+            return last_seq + 1
+        seq, _ = self.agv_comm.wait_for_frame(last_seq, timeout=FRAME_TIMEOUT)
+        return seq
+
     def main_control_loop(self):
-        """메인 제어 루프"""
+        """메인 제어 루프 (새 STS 프레임마다 1회 실행)"""
 
         bAGV_moving = False
         agv_info = self.agv_info_2_server
+        last_seq = 0
 
         while self.isRunning:
             # AGV 상태 업데이트
             try:
+                seq = self.wait_for_sensor_frame(last_seq)
+                if seq == last_seq:
+                    # 프레임이 늦음: 이미 사용한 프레임으로 상태 머신/속도 계획을 다시 돌리지 않고 마지막 명령만 재송신
+                    self.agv_comm.CLR(*self.last_clr)
+                    continue
+                last_seq = seq
                 self.get_sensor_data()
 
                 # RF-Tag 속도 제한 처리
@@ -272,57 +321,40 @@ class AGV_MACHINE_OPERATE:
                         self.agv_info_2_server["STATE"] = AGV_STATE_ABNORMAL
                 
                     self.line_following_control(bAGV_moving, 'backward')
-                
-                time.sleep(0.05)  # 50ms 제어 루프 주기    
             except Exception as e:
                 print("Error in main control loop:", e) 
-                time.sleep(1)
+                self.clock.sleep(1)
         
         
     def check_obstacle(self):
-        """장애물 감지 함수"""
-        if self.agv_data["lidar_distance"] < OBSTACLE_THRESHOLD:  # 예: 150mm 이내에 장애물이 있으면 True 반환
-            return True
-        return False
+        """장애물 정지 여부 (OBSTACLE_THRESHOLD 이내로 들어오면 True, 여유 거리 밖에서 일정 시간 유지되어야 False)"""
+        return self.obstacle_governor.stopped
     
     
     def line_following_control(self,bMoving=False, moving_direction = 'forward') :
-        """라인 추종 제어 알고리즘 (예시)"""
+        """라인 추종 제어: LinePos 와 RF-Tag 속도 제한으로 LineController 표를 조회해 바퀴 속도 결정"""
         line_pos = self.agv_data["line_pos"]
-        base_speed = self.agv_data["tag2"]   # 최대 속도 제한
+        base_speed = 0
         left_speed, right_speed = int(0),int(0)
 
         if moving_direction == 'backward':
             line_pos *= -1  # 후진 시 라인 방향 보정
 
         if bMoving == True:
-            # 조향 제어        
-            if abs(line_pos) > detect_curved_motion_radius: # -12 ~ 12
-                if line_pos < -detect_curved_motion_radius:
-                    # 제자리 좌회전
-                    left_speed , right_speed = -base_speed//2, base_speed//2
-                else:
-                    # 제자리 우회전
-                    left_speed , right_speed = base_speed//2, -base_speed//2
-
-            elif line_pos == 0: # 직진
-                left_speed, right_speed = base_speed, base_speed
-
-            else: #미세 조정
-                TURN_SPEED_WHEEL_DIFFERENCE = 80
-                correction = int(abs(line_pos) / (detect_curved_motion_radius * 1.0)) # 0~1 정규화 (±5 범위)
-                max_correction = int(TURN_SPEED_WHEEL_DIFFERENCE *correction)  # 최대 보정값 설정
-                
-                if line_pos < 0:    #좌측 보정 좌측 휠 느리게
-                    left_speed,right_speed = base_speed - max_correction, base_speed                 
-                else:               #우측 보정 우측 휠 느리게
-                    left_speed, right_speed = base_speed , base_speed - max_correction
+            # 속도 제한: 태그 구간 속도 프로파일(느린 구간 앞에서 미리 감속)과 장애물 TTC 감속 중 작은 값
+            planned = self.speed_planner.update(self.agv_data["odometer"], self.agv_data["tag1"], self.agv_data["tag2"])
+            base_speed = int(min(planned, self.obstacle_governor.limit))
+            # 조향 제어 (PD + 편차에 따른 감속, 큰 편차에서는 안쪽 바퀴가 역회전해 제자리 회전에 가까워짐)
+            left_speed, right_speed = self.line_controller.update(line_pos, base_speed)
         else:
             left_speed, right_speed = 0, 0  # 정지 명령 
+            self.line_controller.reset()
+            self.speed_planner.reset()
             
         if self.agv_comm is not None:
             self.agv_comm.CLR(left_speed, right_speed)        
-            self.agv_clr_cmd = f"LinePos: {line_pos}, LeftSpeed: {left_speed}, RightSpeed: {right_speed}"
+            self.last_clr = (left_speed, right_speed)
+            self.agv_clr_cmd = f"LinePos: {line_pos}, Limit: {base_speed}, LeftSpeed: {left_speed}, RightSpeed: {right_speed}"
 
         
 
@@ -369,7 +401,9 @@ def menu(stdscr, agv_machine):
         time.sleep(1)
 
 if __name__ == "__main__":
-    agv_machine = AGV_MACHINE_OPERATE()
+    import sys
+    # python agv_control_client.py [포트]  (예: agv_simulator.py --headless 가 출력한 /dev/pts/N)
+    agv_machine = AGV_MACHINE_OPERATE(*sys.argv[1:2])
     try:
         # curses.wrapper가 menu 함수를 한 번만 호출하도록 구조 변경
         curses.wrapper(functools.partial(menu, agv_machine=agv_machine))
@@ -37,6 +37,7 @@ agv_client_info = {
     "Alv_cnt": 0
 }       
 
+# WP(RF-Tag) 별 속도 제한 기본값 (서버에 연결되면 load_wp_speed() 가 서버 waypoints 의 speed 로 교체)
 agv_wp_speed = {
     0: 100,
     1: 150,
@@ -59,6 +60,14 @@ cmd_data_to_client = {
     "Alv_cnt": 0
 }
 
+def load_wp_speed():
+    """서버 /waypoints 의 WP 별 속도 제한으로 agv_wp_speed 갱신 (실패하면 기본값 유지)"""
+    try:
+        res = requests.get('http://localhost:5000/waypoints', timeout=1)
+        agv_wp_speed.update({wp['id']: wp['speed'] for wp in res.json() if 'speed' in wp})
+    except Exception as e:
+        print("[WP 속도 제한 수신 실패, 기본값 사용]", e)
+
 # 송신 스레드: 100ms마다 AGV 상태 전송
 def send_thread():
     server_url = 'http://localhost:5000/client_data'  # Flask 서버 주소
@@ -178,6 +187,7 @@ def input_thread(stdscr):
         time.sleep(0.1)
 
 if __name__ == "__main__":
+    load_wp_speed()
     t_send = threading.Thread(target=send_thread, daemon=True)
     t_send.start()
     t_poll = threading.Thread(target=poll_server_data_thread, daemon=True)
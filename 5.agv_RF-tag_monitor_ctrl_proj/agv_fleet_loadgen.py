@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+agv_station_server 용량 측정 부하 발생기: asyncio 프로세스 하나로 AGV 클라이언트 수백 대를 흉내냄
+- 차량마다 실제 클라이언트와 같은 주기로 POST /client_data (20 Hz), GET /server_data (10 Hz) 요청
+- 차량 동작은 행동 스크립트(단계 목록)로 지정: 내장 스크립트(idle, patrol, mixed) 또는 JSON 파일
+- 종료 시 엔드포인트별 지연 백분위수(p50/p90/p99/p99.9/max), 오류율(종류별), 처리량(req/s) 출력
+- 지연은 응답 시간(요청 송신~응답 수신)과 예정 시각 기준 지연(예정 송신 시각~응답 수신)을 함께 기록
+  (서버가 밀려 송신 자체가 늦어진 시간까지 포함하는 값, 부하 발생기 자신이 밀렸는지 판단할 때 사용)
+- 외부 패키지 없이 표준 라이브러리 HTTP/1.1 클라이언트 사용 (기본: 실제 클라이언트처럼 요청마다 새 연결,
+  --keepalive: 차량/엔드포인트별 연결 재사용)
+
+python agv_fleet_loadgen.py --vehicles 200 --duration 60 [--url http://localhost:5000] [--script mixed]
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import math
+import random
+import time
+from urllib.parse import urlsplit
+
+AGV_STATE_INITIAL = 0
+AGV_STATE_READY = 1
+AGV_STATE_RUNNING = 2
+AGV_STATE_OBSTACLE_ESTOP = 3
+AGV_STATE_PUSH_BUTTON_ESTOP = 4
+AGV_STATE_SERVER_BUTTON_ESTOP = 5
+AGV_STATE_ABNORMAL = 6
+
+POST_RATE_HZ = 20           # agv_control_client.send_data_to_server 주기
+GET_RATE_HZ = 10            # agv_control_client.rx_data_from_server 주기
+PERCENTILES = (50, 90, 99, 99.9)
+
+# WP(RF-Tag) 별 속도 제한 (agv_control_client_simul.agv_wp_speed 와 같은 값)
+AGV_WP_SPEED = {0: 100, 1: 150, 2: 150, 3: 100, 4: 150, 5: 100, 6: 100, 7: 100, 8: 150, 9: 100, 10: 150, 11: 0}
+
+# 행동 스크립트: 단계 목록을 반복 실행
+# - duration: 단계 길이 (s)
+# - STATE / LIDAR / CURRENT_SPEED: 해당 단계 동안 보낼 값 (CURRENT_SPEED 가 'limit' 이면 현재 WP 속도 제한)
+# - tag_step: 단계 시작 시 RF_TAG 증가량 (WP 순환)
+SCRIPTS = {
+    'idle': [
+        {"duration": 10, "STATE": AGV_STATE_READY, "CURRENT_SPEED": 0},
+    ],
+    'patrol': [
+        {"duration": 5, "STATE": AGV_STATE_RUNNING, "CURRENT_SPEED": 'limit', "tag_step": 1},
+    ],
+    'mixed': [
+        {"duration": 3, "STATE": AGV_STATE_READY, "CURRENT_SPEED": 0},
+        {"duration": 5, "STATE": AGV_STATE_RUNNING, "CURRENT_SPEED": 'limit', "tag_step": 1},
+        {"duration": 5, "STATE": AGV_STATE_RUNNING, "CURRENT_SPEED": 'limit', "tag_step": 1},
+        {"duration": 2, "STATE": AGV_STATE_OBSTACLE_ESTOP, "CURRENT_SPEED": 0, "LIDAR": 120},
+        {"duration": 5, "STATE": AGV_STATE_RUNNING, "CURRENT_SPEED": 'limit', "tag_step": 1},
+    ],
+}
+
+
+def percentile(sorted_values, p):
+    """정렬된 목록의 p 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class EndpointStats:
+    """엔드포인트 하나의 지연 표본과 오류 집계"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = []       # 응답 시간 (s)
+        self.lag = []           # 예정 송신 시각 기준 지연 (s)
+        self.errors = collections.Counter()
+        self.sent = 0
+        self.late = 0           # 다음 주기까지 송신하지 못해 건너뛴 주기 수
+
+    def record(self, scheduled: float, start: float, end: float, error: str = None):
+        self.sent += 1
+        if error is not None:
+            self.errors[error] += 1
+            return
+        self.latency.append(end - start)
+        self.lag.append(end - scheduled)
+
+    def summary(self, elapsed: float, expected: int) -> dict:
+        latency = sorted(self.latency)
+        lag = sorted(self.lag)
+        n_errors = sum(self.errors.values())
+
+        def ms(values):
+            result = {f"p{p:g}": round(percentile(values, p) * 1000.0, 2) for p in PERCENTILES} if values else {}
+            if values:
+                result['max'] = round(values[-1] * 1000.0, 2)
+                result['mean'] = round(sum(values) / len(values) * 1000.0, 2)
+            return result
+
+        return {
+            'sent': self.sent,
+            'expected': expected,
+            'ok': len(latency),
+            'error_rate': round(n_errors / self.sent, 4) if self.sent else 0.0,
+            'errors': dict(self.errors),
+            'skipped_ticks': self.late,
+            'throughput_rps': round(len(latency) / elapsed, 1) if elapsed > 0 else 0.0,
+            'latency_ms': ms(latency),
+            'scheduled_latency_ms': ms(lag),
+        }
+
+
+class HttpConnection:
+    """asyncio 스트림 위의 최소 HTTP/1.1 클라이언트 (Content-Length 응답만 처리)"""
+
+    def __init__(self, host: str, port: int, keepalive: bool):
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method: str, path: str, body: bytes = None):
+        """(status, 응답 body) 반환, 연결 오류는 예외로 전달"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                   "Connection: " + ("keep-alive" if self.keepalive else "close")]
+        if body is not None:
+            headers += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        self._writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + (body or b''))
+        try:
+            status_line = await self._reader.readline()
+            if not status_line:
+                raise ConnectionResetError("서버가 응답 전에 연결을 닫음")
+            status = int(status_line.split()[1])
+            length, close = None, not self.keepalive
+            while True:
+                line = await self._reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.strip().lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'connection' and value.strip().lower() == 'close':
+                    close = True
+            payload = await (self._reader.readexactly(length) if length is not None else self._reader.read())
+        except BaseException:
+            self.close()
+            raise
+        if close or length is None or status_line.startswith(b'HTTP/1.0'):
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+class Vehicle:
+    """가상 AGV 한 대: 스크립트에 따라 상태를 바꾸며 POST/GET 주기 작업을 실행"""
+
+    def __init__(self, index: int, script: list, soc_drain: float, rng: random.Random):
+        self.index = index
+        self.script = script
+        self.cycle = sum(phase['duration'] for phase in script)
+        self.offset = rng.uniform(0.0, self.cycle)      # 차량마다 스크립트 위치를 다르게 시작
+        self.soc_drain = soc_drain
+        self.rf_tag = rng.randrange(len(AGV_WP_SPEED))
+        self.alive = 0
+        self.server_cmd = None
+        self._phase_index = None
+        self.info = {"SOC": 100, "LIDAR": 1200, "RF_TAG": 0, "SPEED_LIMIT": 0,
+                     "CURRENT_SPEED": 0, "STATE": AGV_STATE_INITIAL, "Alv_cnt": 0}
+
+    def update(self, t: float):
+        """시작 후 t 초 시점의 상태로 info 갱신"""
+        pos = (t + self.offset) % self.cycle
+        for index, phase in enumerate(self.script):
+            if pos < phase['duration']:
+                break
+            pos -= phase['duration']
+        if index != self._phase_index:
+            self._phase_index = index
+            self.rf_tag = (self.rf_tag + phase.get('tag_step', 0)) % len(AGV_WP_SPEED)
+        limit = AGV_WP_SPEED[self.rf_tag]
+        speed = phase.get('CURRENT_SPEED', 0)
+        self.info.update(
+            SOC=max(0, round(100 - self.soc_drain * t)),
+            LIDAR=phase.get('LIDAR', 1200),
+            RF_TAG=self.rf_tag,
+            SPEED_LIMIT=limit,
+            CURRENT_SPEED=limit if speed == 'limit' else speed,
+            STATE=phase.get('STATE', AGV_STATE_READY),
+            Alv_cnt=self.alive,
+        )
+
+
+async def periodic(rate_hz: float, start: float, stop: float, stats: EndpointStats, call):
+    """start 부터 stop 까지 rate_hz 고정 주기로 call(scheduled) 실행 (밀린 주기는 건너뛰고 late 로 집계)"""
+    loop = asyncio.get_running_loop()
+    period = 1.0 / rate_hz
+    scheduled = start
+    while scheduled < stop:
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await call(scheduled)
+        scheduled += period
+        now = loop.time()
+        if now > scheduled + period:
+            skipped = int((now - scheduled) / period)
+            stats.late += skipped
+            scheduled += skipped * period
+
+
+async def run_vehicle(vehicle: Vehicle, args, target, post_stats, get_stats, start, stop):
+    host, port, base = target
+    loop = asyncio.get_running_loop()
+    post_conn = HttpConnection(host, port, args.keepalive)
+    get_conn = HttpConnection(host, port, args.keepalive)
+
+    async def call(conn, stats, method, path, body_fn, on_ok, scheduled):
+        t0 = loop.time()
+        try:
+            status, payload = await asyncio.wait_for(conn.request(method, path, body_fn()), args.timeout)
+            if status != 200:
+                error = f"http_{status}"
+            else:
+                on_ok(payload)
+                error = None
+        except asyncio.TimeoutError:
+            conn.close()
+            error = 'timeout'
+        except (ConnectionError, OSError) as e:
+            error = type(e).__name__
+        except (ValueError, IndexError):
+            error = 'bad_response'
+        stats.record(scheduled, t0, loop.time(), error)
+
+    def post_body():
+        vehicle.update(loop.time() - start)
+        return json.dumps(vehicle.info).encode()
+
+    def post_ok(payload):
+        vehicle.alive += 1
+
+    def get_ok(payload):
+        vehicle.server_cmd = json.loads(payload).get('From_server_cmd')
+
+    # 차량마다 주기 내 시작 위상을 흩어 동시 요청 폭주를 피함 (실제 차량들은 서로 동기화되어 있지 않음)
+    phase = vehicle.offset % (1.0 / POST_RATE_HZ)
+    try:
+        await asyncio.gather(
+            periodic(POST_RATE_HZ, start + phase, stop, post_stats,
+                     lambda s: call(post_conn, post_stats, 'POST', base + '/client_data', post_body, post_ok, s)),
+            periodic(GET_RATE_HZ, start + phase, stop, get_stats,
+                     lambda s: call(get_conn, get_stats, 'GET', base + '/server_data', lambda: None, get_ok, s)),
+        )
+    finally:
+        post_conn.close()
+        get_conn.close()
+
+
+async def monitor_loop_lag(start: float, stop: float, samples: list, interval: float = 0.05):
+    """부하 발생기 이벤트 루프 지연 측정 (크면 부하 발생기 자체가 병목 -> 결과 신뢰도 낮음)"""
+    loop = asyncio.get_running_loop()
+    expected = start
+    while expected < stop:
+        expected += interval
+        await asyncio.sleep(max(0.0, expected - loop.time()))
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run_fleet(args) -> dict:
+    url = urlsplit(args.url)
+    target = (url.hostname or 'localhost', url.port or 80, url.path.rstrip('/'))
+    if args.script in SCRIPTS:
+        script = SCRIPTS[args.script]
+    else:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+    rng = random.Random(args.seed)
+    vehicles = [Vehicle(i, script, args.soc_drain, rng) for i in range(args.vehicles)]
+    post_stats, get_stats = EndpointStats('/client_data'), EndpointStats('/server_data')
+    loop_lag = []
+
+    loop = asyncio.get_running_loop()
+    start = loop.time() + 0.2
+    stop = start + args.duration
+    wall_start = time.monotonic()
+    await asyncio.gather(
+        monitor_loop_lag(start, stop, loop_lag),
+        *(run_vehicle(v, args, target, post_stats, get_stats, start, stop) for v in vehicles),
+    )
+    elapsed = time.monotonic() - wall_start - 0.2
+
+    loop_lag.sort()
+    total_ok = len(post_stats.latency) + len(get_stats.latency)
+    total_sent = post_stats.sent + get_stats.sent
+    return {
+        'url': args.url,
+        'vehicles': args.vehicles,
+        'script': args.script,
+        'duration_s': round(elapsed, 2),
+        'keepalive': args.keepalive,
+        'target_rps': args.vehicles * (POST_RATE_HZ + GET_RATE_HZ),
+        'throughput_rps': round(total_ok / elapsed, 1) if elapsed > 0 else 0.0,
+        'error_rate': round(1 - total_ok / total_sent, 4) if total_sent else 0.0,
+        'endpoints': {
+            post_stats.name: post_stats.summary(elapsed, int(args.vehicles * POST_RATE_HZ * args.duration)),
+            get_stats.name: get_stats.summary(elapsed, int(args.vehicles * GET_RATE_HZ * args.duration)),
+        },
+        'generator_loop_lag_ms': {
+            'p99': round((percentile(loop_lag, 99) or 0.0) * 1000.0, 2),
+            'max': round((loop_lag[-1] if loop_lag else 0.0) * 1000.0, 2),
+        },
+    }
+
+
+def print_report(result: dict):
+    print(f"{result['vehicles']}대 x ({POST_RATE_HZ} Hz POST + {GET_RATE_HZ} Hz GET), "
+          f"{result['duration_s']:.1f}s, 스크립트 {result['script']}, keepalive={result['keepalive']}")
+    print(f"  처리량 {result['throughput_rps']:.1f} req/s (목표 {result['target_rps']}) | "
+          f"오류율 {result['error_rate'] * 100:.2f} %")
+    for name, ep in result['endpoints'].items():
+        lat = ep['latency_ms']
+        lat_str = " ".join(f"{k}={v:.1f}" for k, v in lat.items()) if lat else "-"
+        print(f"  {name:<13s} ok {ep['ok']:7d}/{ep['expected']:7d} | {ep['throughput_rps']:8.1f} req/s | "
+              f"skip {ep['skipped_ticks']:5d} | ms {lat_str}")
+        if ep['errors']:
+            print(f"  {'':<13s} 오류: {ep['errors']}")
+        sched = ep['scheduled_latency_ms']
+        if sched:
+            print(f"  {'':<13s} 예정 시각 기준 p99={sched['p99']:.1f} ms max={sched['max']:.1f} ms")
+    lag = result['generator_loop_lag_ms']
+    print(f"  부하 발생기 루프 지연 p99={lag['p99']:.1f} ms max={lag['max']:.1f} ms"
+          + ("  (부하 발생기 포화: 차량 수를 줄이거나 프로세스를 나눠 실행)" if lag['p99'] > 10 else ""))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="agv_station_server 부하 발생기 (AGV 클라이언트 다수 흉내)")
+    parser.add_argument('--url', default='http://localhost:5000', help="서버 주소")
+    parser.add_argument('--vehicles', type=int, default=100, help="가상 AGV 대수")
+    parser.add_argument('--duration', type=float, default=30.0, help="측정 시간 (s)")
+    parser.add_argument('--script', default='mixed',
+                        help=f"행동 스크립트: {', '.join(SCRIPTS)} 또는 단계 목록 JSON 파일 경로")
+    parser.add_argument('--timeout', type=float, default=1.0, help="요청 timeout (s)")
+    parser.add_argument('--keepalive', action='store_true', help="요청마다 새 연결 대신 연결 재사용")
+    parser.add_argument('--soc-drain', type=float, default=0.05, help="초당 SOC 감소량 (%%)")
+    parser.add_argument('--seed', type=int, default=0, help="차량별 시작 위치/WP 난수 시드")
+    parser.add_argument('--json', help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_fleet(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
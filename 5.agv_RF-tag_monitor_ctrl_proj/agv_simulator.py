@@ -1,10 +1,54 @@
 import serial
 import curses
+import argparse
+import json
+import math
+import random
 import threading
 import time
 
+from Donkibot_i import (BIN_CLR_STRUCT, BIN_SYNC, BIN_TYPE_CLR, MODE_ASCII_COMMAND, MODE_BIN_COMMAND,
+                        ODOMETER_MM_PER_COUNT, SYSTEM_CLOCK, STSFrame, encode_sts_binary, unpack_binary_frame)
+
 PORT = '/dev/ttyS0'
 BAUDRATE = 115200
+TX_PERIOD = 0.05        # STS 송신 주기 (s)
+
+# headless(폐루프) 모드 차량 모델 파라미터
+WHEEL_BASE = 160.0          # 좌우 바퀴 간격 (mm)
+WHEEL_ACCEL = 800.0         # 바퀴 속도 가속 한계 (mm/s^2)
+LINE_SENSOR_OFFSET = 80.0   # 차축 중심에서 라인 센서까지 전방 거리 (mm)
+LINE_MM_PER_STEP = 5.0      # LinePos 1 단계당 횡방향 거리 (mm), ±15 단계 = ±75 mm
+LIDAR_MAX = 1200            # 장애물이 없을 때 LidarDistance (mm)
+TAG_DETECT_RANGE = 30.0     # RF 태그 인식 거리 (mm)
+CMD_TIMEOUT = 0.5           # 이 시간 동안 CLR 명령이 없으면 정지 (STM 워치독 가정, s)
+ODOMETER_PER_MM = 1.0 / ODOMETER_MM_PER_COUNT   # Odometer 는 실제 AGV 처럼 엔코더 count 로 송신 (100000/바퀴 둘레)
+SIM_SUBSTEP = 0.005         # 적분 간격 (s)
+
+# 링크 장애 주입 (--faults): 종류별 프레임당 발생 확률, 프레임마다 최대 한 가지
+FAULT_KINDS = ('drop', 'flip', 'truncate', 'garbage', 'stall')
+FAULT_STALL_TIME = 0.1      # stall: 송신 멈춤 시간 (s, 0.5~1.5 배 사이에서 무작위)
+FAULT_GARBAGE_LEN = (4, 32) # garbage: 끼워 넣는 쓰레기 byte 수 범위
+FAULT_DROP_LEN = (1, 3)     # drop: 연속으로 빠지는 byte 수 범위
+
+# 기본 트랙: 3 m x 1.5 m, 모서리 반경 400 mm 의 폐곡선 (반시계 방향), 태그/장애물 예시 포함
+DEFAULT_TRACK = {
+    "size": [3000, 1500],
+    "corner_radius": 400,
+    "loop": True,
+    "tags": [
+        {"s": 500, "tag1": 1, "tag2": 150},
+        {"s": 2400, "tag1": 2, "tag2": 80},
+        {"s": 4200, "tag1": 3, "tag2": 150},
+        {"s": 6000, "tag1": 4, "tag2": 100},
+    ],
+    "obstacles": [],        # 예: {"s": 3000, "t_on": 20, "t_off": 25} -> 트랙 위치 s 에 시간 구간 동안 장애물
+                            #     "speed": 60 을 더하면 t_on 부터 트랙 진행 방향으로 60 mm/s 로 이동 (앞서 가는 사람/대차)
+    "estops": [],           # 예: {"t_on": 40, "t_off": 41} -> 비상정지 버튼(EmgFlag) 눌림 구간
+    "line_pos_sign": 1,     # 1: 라인이 오른쪽이면 LinePos 양수, -1: 반대 (센서 장착 방향에 맞춰 선택)
+    "lidar_noise": 0.0,     # 장애물 측정 거리에 더할 가우시안 잡음 표준편차 (mm, 실제 라이다 2~10mm)
+    "seed": 0,              # 잡음 난수 시드 (같은 시드면 같은 측정값이 재현됨)
+}
 
 ###########################################################
 # Example AGV status message format
@@ -27,17 +71,106 @@ AGV_info_msg = {
 
 isOperating = True
 str_rx = ""
+clr_cmd = (0, 0)        # 마지막으로 받은 CLR 바퀴 속도 (vl, vr)
+clr_time = 0.0          # 그 수신 시각 (clock.now())
+clock = SYSTEM_CLOCK    # 시간 소스 (가상 시간 실행 시 VirtualClock 으로 교체)
+tx_binary = False       # True: "$MODE,BIN" 수신 후 바이너리 STS 프레임 송신
+fault_injector = None   # FaultInjector 를 넣으면 송신 프레임에 링크 장애 주입
+
+
+class FaultInjector:
+    """
+    송신 프레임에 실제 링크에서 생기는 장애를 흉내내는 단계 (seed 고정 난수로 재현 가능)
+    - drop: 프레임 안의 연속 byte 1~3개 누락
+    - flip: 프레임 안 byte 하나의 bit 하나 반전
+    - truncate: 프레임 뒷부분이 잘려 종료 문자 없이 전송
+    - garbage: 프레임 안(또는 앞)에 쓰레기 byte 묶음 삽입
+    - stall: 프레임을 보내기 전에 링크가 잠시 멈춤 (프레임 자체는 정상)
+    events 에 (프레임 순번, 종류) 를 기록하므로 수신 측 손실과 대조할 수 있음
+    """
+
+    def __init__(self, rates: dict, seed: int = 0, stall_time: float = FAULT_STALL_TIME):
+        unknown = set(rates) - set(FAULT_KINDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 장애 종류: {', '.join(sorted(unknown))}")
+        if sum(rates.values()) > 1.0:
+            raise ValueError("장애 확률의 합은 1 이하여야 합니다.")
+        self.rates = {kind: rates.get(kind, 0.0) for kind in FAULT_KINDS}
+        self.stall_time = stall_time
+        self.rng = random.Random(seed)
+        self.frames = 0
+        self.events = []
+        self.counts = {kind: 0 for kind in FAULT_KINDS}
+
+    @classmethod
+    def from_spec(cls, spec: str, seed: int = 0, **kwargs) -> 'FaultInjector':
+        """"drop=0.01,flip=0.01,stall=0.001" 형식의 문자열로 생성"""
+        rates = {}
+        for item in filter(None, spec.split(',')):
+            kind, _, rate = item.partition('=')
+            rates[kind.strip()] = float(rate)
+        return cls(rates, seed, **kwargs)
+
+    def apply(self, data: bytes):
+        """프레임 하나에 장애 적용: (보낼 bytes, 장애 종류 또는 None, 송신 전 멈출 시간 s)"""
+        self.frames += 1
+        rng = self.rng
+        roll = rng.random()
+        kind = None
+        for candidate in FAULT_KINDS:
+            roll -= self.rates[candidate]
+            if roll < 0:
+                kind = candidate
+                break
+        if kind is None:
+            return data, None, 0.0
+
+        self.events.append((self.frames, kind))
+        self.counts[kind] += 1
+        stall = 0.0
+        if kind == 'drop':
+            n = rng.randint(*FAULT_DROP_LEN)
+            at = rng.randrange(len(data) - n + 1)
+            data = data[:at] + data[at + n:]
+        elif kind == 'flip':
+            at = rng.randrange(len(data))
+            data = data[:at] + bytes([data[at] ^ (1 << rng.randrange(8))]) + data[at + 1:]
+        elif kind == 'truncate':
+            data = data[:rng.randrange(1, len(data) - 1)]
+        elif kind == 'garbage':
+            at = rng.randrange(len(data) + 1)
+            data = data[:at] + rng.randbytes(rng.randint(*FAULT_GARBAGE_LEN)) + data[at:]
+        else:
+            stall = self.stall_time * rng.uniform(0.5, 1.5)
+        return data, kind, stall
+
+    def summary(self) -> str:
+        faults = ", ".join(f"{kind} {n}" for kind, n in self.counts.items() if n)
+        return f"프레임 {self.frames}개 중 장애 {len(self.events)}개 ({faults or '없음'})"
+
 
 def on_sending_message():
-    """시리얼 포트로 메시지 송신"""
+    """시리얼 포트로 메시지 송신 (fault_injector 가 있으면 장애 적용 후 송신)"""
     global AGV_info_msg,ser,isOperating
 
-    msg = f"$STS,{AGV_info_msg['agvStatus']},{AGV_info_msg['SOC']},{AGV_info_msg['LinePos']},{AGV_info_msg['EmgFlag']},{AGV_info_msg['LidarDistance']},{AGV_info_msg['TfsAngle']},{AGV_info_msg['TfsDistance']},{AGV_info_msg['Speed']},{AGV_info_msg['Odometer']},{AGV_info_msg['RF_tag1']},{AGV_info_msg['RF_tag2']}\r\n"
+    if tx_binary:
+        try:
+            data = encode_sts_binary(STSFrame(**AGV_info_msg))
+        except Exception as e:
+            print(f"송신 에러: {e}")
+            return
+    else:
+        msg = f"$STS,{AGV_info_msg['agvStatus']},{AGV_info_msg['SOC']},{AGV_info_msg['LinePos']},{AGV_info_msg['EmgFlag']},{AGV_info_msg['LidarDistance']},{AGV_info_msg['TfsAngle']},{AGV_info_msg['TfsDistance']},{AGV_info_msg['Speed']},{AGV_info_msg['Odometer']},{AGV_info_msg['RF_tag1']},{AGV_info_msg['RF_tag2']}\r\n"
+        data = msg.encode('latin-1')
 
+    if fault_injector is not None:
+        data, _, stall = fault_injector.apply(data)
+        if stall:
+            clock.sleep(stall)
 
     try:
         if ser.is_open:
-            ser.write(msg.encode('latin-1'))
+            ser.write(data)
             # print(f"송신: {msg.strip()}")
         else:
             print("시리얼 포트가 열려 있지 않습니다.")
@@ -48,17 +181,312 @@ def tx_thread_func():
     global isOperating
     while isOperating:
         on_sending_message()
-        time.sleep(0.05)
+        clock.sleep(TX_PERIOD)
+
+def split_commands(rx_buf: bytearray) -> list:
+    """수신 버퍼에서 완성된 명령을 꺼내 문자열 목록으로 반환 (ASCII 줄, 바이너리 CLR 프레임)"""
+    commands = []
+    while rx_buf:
+        if rx_buf.startswith(BIN_SYNC):
+            result, frame_type, payload, end = unpack_binary_frame(rx_buf, 0)
+            if result == 'incomplete':
+                break
+            if result == 'ok' and frame_type == BIN_TYPE_CLR:
+                vl, vr = BIN_CLR_STRUCT.unpack(payload)
+                commands.append(f"$CLR,{vl},{vr}")
+            del rx_buf[:end]
+            continue
+        end = rx_buf.find(b'\r\n')
+        sync = rx_buf.find(BIN_SYNC)
+        if sync > 0 and (end < 0 or sync < end):
+            del rx_buf[:sync]   # 바이너리 프레임 앞의 쓰레기 데이터
+            continue
+        if end < 0:
+            break
+        commands.append(rx_buf[:end].decode('latin-1').strip())
+        del rx_buf[:end + 2]
+    return commands
+
+def on_command(command: str):
+    """수신 명령 처리: 프레임 형식 전환 요청 반영, CLR 바퀴 속도 저장, 마지막 명령 표시"""
+    global str_rx, tx_binary, clr_cmd, clr_time
+    if command == MODE_BIN_COMMAND:
+        tx_binary = True
+    elif command == MODE_ASCII_COMMAND:
+        tx_binary = False
+    elif command.startswith('$CLR,'):
+        try:
+            vl, vr = map(int, command[5:].split(','))
+            clr_cmd, clr_time = (vl, vr), clock.now()
+        except ValueError:
+            pass
+    str_rx = command
 
 def rx_thread_func():
-    global isOperating, str_rx, ser
+    global isOperating, ser
+    rx_buf = bytearray()
     while isOperating:
         try:
-            if ser.in_waiting > 0:
-                str_rx = ser.readline().decode('latin-1').strip()
+            # 도착한 만큼 읽고, 없으면 1 byte 가 올 때까지 포트 timeout 동안 대기
+            chunk = ser.read(ser.in_waiting or 1)
+            if chunk:
+                rx_buf += chunk
+                for command in split_commands(rx_buf):
+                    on_command(command)
         except Exception as e:
             print(f"수신 에러: {e}")
-        time.sleep(0.05)
+            clock.sleep(0.05)
+
+
+class Track:
+    """
+    라인 트랙: 꼭짓점 목록(mm)으로 만든 폴리라인, loop=True 이면 마지막 점과 첫 점을 연결
+    - project(): 점에서 가장 가까운 트랙 위치 s(트랙 시작점부터의 거리)와 부호 있는 횡방향 거리
+      (진행 방향 기준 왼쪽이 +)
+    """
+
+    def __init__(self, points, loop=True):
+        self.points = [tuple(map(float, p)) for p in points]
+        if loop:
+            self.points.append(self.points[0])
+        self.loop = loop
+        self.segments = []      # (x0, y0, 단위벡터 ux, uy, 길이, 시작 s)
+        s = 0.0
+        for (x0, y0), (x1, y1) in zip(self.points, self.points[1:]):
+            length = math.hypot(x1 - x0, y1 - y0)
+            if length > 0:
+                self.segments.append((x0, y0, (x1 - x0) / length, (y1 - y0) / length, length, s))
+                s += length
+        self.length = s
+
+    @classmethod
+    def rounded_rectangle(cls, width, height, radius, arc_step_deg=10):
+        """(0, 0) 에서 +x 방향으로 출발하는 반시계 방향 모서리 둥근 직사각형"""
+        points = []
+        corners = [(width - radius, radius, -90), (width - radius, height - radius, 0),
+                   (radius, height - radius, 90), (radius, radius, 180)]
+        points.append((radius, 0.0))
+        for cx, cy, start_deg in corners:
+            for deg in range(start_deg, start_deg + 91, arc_step_deg):
+                points.append((cx + radius * math.cos(math.radians(deg)),
+                               cy + radius * math.sin(math.radians(deg))))
+        return cls(points[:-1], loop=True)
+
+    @classmethod
+    def from_config(cls, config):
+        if 'points' in config:
+            return cls(config['points'], loop=config.get('loop', True))
+        width, height = config.get('size', DEFAULT_TRACK['size'])
+        return cls.rounded_rectangle(width, height, config.get('corner_radius', DEFAULT_TRACK['corner_radius']))
+
+    def pose_at(self, s):
+        """트랙 위치 s 의 (x, y, heading)"""
+        if self.loop:
+            s %= self.length
+        for x0, y0, ux, uy, length, s0 in self.segments:
+            if s <= s0 + length:
+                d = max(0.0, s - s0)
+                return x0 + ux * d, y0 + uy * d, math.atan2(uy, ux)
+        x0, y0, ux, uy, length, _ = self.segments[-1]
+        return x0 + ux * length, y0 + uy * length, math.atan2(uy, ux)
+
+    def project(self, x, y, hint=None, window=4):
+        """(s, 횡방향 거리, 구간 번호), hint 가 있으면 그 주변 구간만 탐색"""
+        n = len(self.segments)
+        if hint is None:
+            indices = range(n)
+        elif self.loop:
+            indices = [(hint + k) % n for k in range(-window, window + 1)]
+        else:
+            indices = range(max(0, hint - window), min(n, hint + window + 1))
+
+        best = None
+        for i in indices:
+            x0, y0, ux, uy, length, s0 = self.segments[i]
+            d = min(length, max(0.0, (x - x0) * ux + (y - y0) * uy))
+            px, py = x - (x0 + ux * d), y - (y0 + uy * d)
+            dist2 = px * px + py * py
+            if best is None or dist2 < best[0]:
+                best = (dist2, s0 + d, ux * py - uy * px, i)
+        return best[1], best[2], best[3]
+
+    def ahead(self, s_from, s_to):
+        """s_from 에서 진행 방향으로 s_to 까지의 거리 (loop 이면 한 바퀴 기준으로 감음)"""
+        d = s_to - s_from
+        return d % self.length if self.loop else d
+
+
+class KinematicAGV:
+    """
+    차동 구동 AGV 모델: CLR 바퀴 속도를 가속 한계로 따라가며 위치/자세를 적분하고
+    트랙/태그/장애물 설정에 맞춰 STS 센서 값(LinePos, Speed, Odometer, RF_tag, LidarDistance, EmgFlag)을 생성
+    """
+
+    def __init__(self, track: Track, config=None):
+        config = config or {}
+        self.track = track
+        self.tags = sorted(config.get('tags', []), key=lambda tag: tag['s'])
+        self.obstacles = config.get('obstacles', [])
+        self.estops = config.get('estops', [])
+        self.line_sign = config.get('line_pos_sign', 1)
+        self.lidar_noise = config.get('lidar_noise', 0.0)
+        self.rng = random.Random(config.get('seed', 0))
+        self.x, self.y, self.heading = track.pose_at(config.get('start_s', 0.0))
+        self.vl = self.vr = 0.0
+        self.odometer_mm = 0.0
+        self.t = 0.0
+        self._hint = None
+        self.s, self.lateral = self._sense_track()
+        self.tag1, self.tag2 = 0, 0
+
+    def _sense_track(self):
+        sx = self.x + LINE_SENSOR_OFFSET * math.cos(self.heading)
+        sy = self.y + LINE_SENSOR_OFFSET * math.sin(self.heading)
+        s, lateral, self._hint = self.track.project(sx, sy, self._hint)
+        return s, lateral
+
+    def step(self, dt, cmd_vl, cmd_vr):
+        """dt 동안 명령 바퀴 속도를 따라 이동"""
+        dv = WHEEL_ACCEL * dt
+        self.vl += max(-dv, min(dv, cmd_vl - self.vl))
+        self.vr += max(-dv, min(dv, cmd_vr - self.vr))
+        v = (self.vl + self.vr) / 2
+        w = (self.vr - self.vl) / WHEEL_BASE
+        mid_heading = self.heading + w * dt / 2
+        self.x += v * math.cos(mid_heading) * dt
+        self.y += v * math.sin(mid_heading) * dt
+        self.heading += w * dt
+        self.odometer_mm += v * dt
+        self.t += dt
+
+        prev_s = self.s
+        self.s, self.lateral = self._sense_track()
+        if v > 0:
+            for tag in self.tags:
+                # 이번 간격 동안 지나간 태그 (뒤로 크게 점프한 경우는 loop 한 바퀴로 처리)
+                if self.track.ahead(prev_s - TAG_DETECT_RANGE, tag['s']) <= \
+                        self.track.ahead(prev_s - TAG_DETECT_RANGE, self.s):
+                    self.tag1, self.tag2 = tag['tag1'], tag['tag2']
+
+    def odometer(self):
+        """주행 거리를 STS Odometer 값(엔코더 count)으로 변환"""
+        return int(self.odometer_mm * ODOMETER_PER_MM)
+
+    def line_pos(self):
+        """센서가 라인 왼쪽(+)에 있으면 라인은 오른쪽 -> LinePos 양수, 범위를 벗어나면 ±15 로 포화"""
+        return max(-15, min(15, int(round(self.line_sign * self.lateral / LINE_MM_PER_STEP))))
+
+    def lidar_distance(self):
+        distance = LIDAR_MAX
+        for obstacle in self.obstacles:
+            if obstacle.get('t_on', 0) <= self.t < obstacle.get('t_off', float('inf')):
+                s = obstacle['s'] + obstacle.get('speed', 0.0) * (self.t - obstacle.get('t_on', 0))
+                ahead = self.track.ahead(self.s, s)
+                distance = min(distance, ahead)
+        if self.lidar_noise > 0 and distance < LIDAR_MAX:
+            distance = min(LIDAR_MAX, distance + self.rng.gauss(0.0, self.lidar_noise))
+        return int(max(0, distance))
+
+    def emg_flag(self):
+        return int(any(e.get('t_on', 0) <= self.t < e.get('t_off', float('inf')) for e in self.estops))
+
+    def update_info(self, info):
+        """AGV_info_msg 형식 dict 에 현재 센서 값을 기록"""
+        info['LinePos'] = self.line_pos()
+        info['Speed'] = int(round((self.vl + self.vr) / 2))
+        info['Odometer'] = self.odometer()
+        info['RF_tag1'] = self.tag1
+        info['RF_tag2'] = self.tag2
+        info['LidarDistance'] = self.lidar_distance()
+        info['EmgFlag'] = self.emg_flag()
+
+
+def sim_thread_func(model: KinematicAGV):
+    """headless 모드: TX_PERIOD 마다 모델을 적분하고 STS 프레임 송신"""
+    global isOperating
+    last = clock.now()
+    next_tx = last
+    while isOperating:
+        now = clock.now()
+        dt = now - last
+        last = now
+        cmd = clr_cmd if now - clr_time <= CMD_TIMEOUT else (0, 0)
+        while dt > 0:
+            h = min(dt, SIM_SUBSTEP)
+            model.step(h, *cmd)
+            dt -= h
+        model.update_info(AGV_info_msg)
+        on_sending_message()
+        next_tx += TX_PERIOD
+        delay = next_tx - clock.now()
+        if delay > 0:
+            clock.sleep(delay)
+        else:
+            next_tx = clock.now()           # 밀린 송신은 따라잡지 않음
+
+
+def start_headless(config=None, sim_clock=None):
+    """
+    ser 가 설정된 상태에서 폐루프 모델 + 수신 스레드 시작, (모델, 스레드 목록) 반환
+    sim_clock: VirtualClock 을 주면 모델 적분/송신 주기/CLR 워치독이 가상 시간으로 동작
+    """
+    global isOperating, clock, clr_cmd, clr_time
+    config = config if config is not None else DEFAULT_TRACK
+    clock = sim_clock if sim_clock is not None else SYSTEM_CLOCK
+    model = KinematicAGV(Track.from_config(config), config)
+    AGV_info_msg['agvStatus'] = 1
+    clr_cmd, clr_time = (0, 0), clock.now()
+    isOperating = True
+    threads = [threading.Thread(target=sim_thread_func, args=(model,), daemon=True),
+               threading.Thread(target=rx_thread_func, daemon=True)]
+    for thread in threads:
+        clock.register(thread)
+        thread.start()
+    return model, threads
+
+
+def run_headless(args):
+    """curses 없이 폐루프 시뮬레이터 실행, 1초마다 상태 한 줄 출력"""
+    global ser, isOperating, TX_PERIOD, tx_binary
+    config = DEFAULT_TRACK
+    if args.track:
+        with open(args.track, encoding='utf-8') as f:
+            config = json.load(f)
+    TX_PERIOD = 1.0 / args.rate
+    tx_binary = args.binary
+
+    pty_port = None
+    if args.port:
+        ser = serial.Serial(args.port, BAUDRATE, timeout=0.1)
+        print(f"시리얼 포트 {args.port} 연결 성공.")
+    else:
+        from pty_harness import PtyPort     # POSIX 전용
+        pty_port = PtyPort()
+        ser = pty_port.master_serial()
+        print(f"가상 시리얼 포트: {pty_port.port}  (예: Comm(port='{pty_port.port}'))")
+
+    model, threads = start_headless(config)
+    print(f"트랙 길이 {model.track.length:.0f} mm, 태그 {len(model.tags)}개, {args.rate:.0f} Hz 송신 (Ctrl+C 종료)")
+    start = time.monotonic()
+    try:
+        while args.duration is None or time.monotonic() - start < args.duration:
+            time.sleep(1.0)
+            info = AGV_info_msg
+            print(f"t={model.t:7.1f}s s={model.s:7.0f} lat={model.lateral:6.1f}mm LinePos={info['LinePos']:3d} "
+                  f"Speed={info['Speed']:4d} Odo={info['Odometer']:7d} tag={info['RF_tag1']}/{info['RF_tag2']} "
+                  f"Lidar={info['LidarDistance']:4d} Emg={info['EmgFlag']} cmd={clr_cmd}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        isOperating = False
+        for thread in threads:
+            thread.join(1.0)
+        if fault_injector is not None:
+            print(fault_injector.summary())
+        if pty_port is not None:
+            pty_port.close()
+        else:
+            ser.close()
 
 
 def main(stdscr):
@@ -108,7 +536,7 @@ def menu(stdscr):
         stdscr.addstr(9, 0, f"8) Odometer: {AGV_info_msg['Odometer']}")
         stdscr.addstr(10, 0, f"9) RF_tag1: {AGV_info_msg['RF_tag1']}")
         stdscr.addstr(11, 0, f"a) RF_tag2 (speed limit mm/s): {AGV_info_msg['RF_tag2']}")
-        stdscr.addstr(12, 0, f"rx: {str_rx} ")
+        stdscr.addstr(12, 0, f"rx: {str_rx} ({'binary' if tx_binary else 'ascii'})")
         stdscr.addstr(13, 0, "원하는 번호 (1-a) 선택하시거나 종료하려면 'q'를 누르세요.")
         
         stdscr.refresh()
@@ -261,7 +689,28 @@ def set_rftag2_value(stdscr):
     
 
 if __name__ == "__main__":
-    
+    parser = argparse.ArgumentParser(description="AGV 시리얼 시뮬레이터")
+    parser.add_argument('--headless', action='store_true',
+                        help="curses 메뉴 없이 CLR 명령으로 움직이는 폐루프 모델 실행")
+    parser.add_argument('--port', default=None,
+                        help=f"시리얼 포트 (기본: curses 모드 {PORT}, headless 모드는 pty 생성)")
+    parser.add_argument('--track', default=None, help="트랙/태그/장애물 설정 JSON 파일 (headless)")
+    parser.add_argument('--rate', type=float, default=1.0 / TX_PERIOD, help="STS 송신 주파수 Hz (headless)")
+    parser.add_argument('--binary', action='store_true', help="처음부터 바이너리 STS 프레임 송신 (headless)")
+    parser.add_argument('--duration', type=float, default=None, help="실행 시간 s (headless)")
+    parser.add_argument('--faults', default=None,
+                        help="송신 링크 장애 주입, 예: drop=0.01,flip=0.01,truncate=0.01,garbage=0.01,stall=0.002")
+    parser.add_argument('--seed', type=int, default=0, help="장애 주입 난수 시드")
+    args = parser.parse_args()
+
+    if args.faults:
+        fault_injector = FaultInjector.from_spec(args.faults, args.seed)
+
+    if args.headless:
+        run_headless(args)
+        exit(0)
+
+    PORT = args.port or PORT
     try:
         ser = serial.Serial(PORT, BAUDRATE, timeout=0.1)
         print(f"시리얼 포트 {PORT} 연결 성공.")
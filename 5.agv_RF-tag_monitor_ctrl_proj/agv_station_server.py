@@ -1,13 +1,14 @@
 from flask import Flask, jsonify, render_template, request
 import threading
-import time
 import math
 from enum import Enum
+from Donkibot_i import SYSTEM_CLOCK
 
 # AGV Path & Waypoints Backend for start.html
 app = Flask(__name__, template_folder='templates')
 
 client_list = set()  # 접속 중인 클라이언트 관리
+clock = SYSTEM_CLOCK  # 상태 머신 주기용 시간 소스 (가상 시간 실행 시 VirtualClock 으로 교체)
 
 # [삭제 용이] AGV 궤적 로그 함수
 def log_agv_info(str):
@@ -212,7 +213,7 @@ def on_operating_state():
                 warning_msg_box = "서버에서 비상정지 명령이 실행되었습니다."
             
             
-        time.sleep(time_elapsed)
+        clock.sleep(time_elapsed)
 
 
 # AGV simulation state
@@ -237,18 +238,19 @@ driving_path = [
     {"type": "line",  "x1": 116,  "y1": 375, "x2": 116,  "y2": 620}
 ]
         
+# speed: 해당 WP(RF-Tag) 부터 다음 WP 까지의 속도 제한 (mm/s), s: 경로 시작부터 거리 (mm, 아래에서 계산)
 waypoints = [
-    {"id": 0, "x": 1491, "y": 640, "visible": False, "offset_x": 0, "offset_y": 0},
-    {"id": 1, "x": 1491, "y": 600, "visible": True, "offset_x": +25, "offset_y": 0},
-    {"id": 2, "x": 1491, "y": 375, "visible": True, "offset_x": +25, "offset_y": 0},
-    {"id": 3, "x": 1400, "y": 300, "visible": True, "offset_x": 0, "offset_y": -25},
-    {"id": 4, "x": 918,  "y": 300, "visible": True, "offset_x": 0, "offset_y": -25},
-    {"id": 5, "x": 843,  "y": 248, "visible": True, "offset_x": 0, "offset_y": -25},
-    {"id": 6, "x": 680,  "y": 248, "visible": True, "offset_x": 0, "offset_y": -25},
-    {"id": 7, "x": 605,  "y": 300, "visible": True, "offset_x": 0, "offset_y": -25},
-    {"id": 8, "x": 180,  "y": 300, "visible": True, "offset_x": 0, "offset_y": -25},
-    {"id": 9, "x": 116,  "y": 375, "visible": True, "offset_x": -25, "offset_y": 0},
-    {"id": 10, "x": 116, "y": 620, "visible": True, "offset_x": -25, "offset_y": 0}
+    {"id": 0, "x": 1491, "y": 640, "visible": False, "offset_x": 0, "offset_y": 0, "speed": 100},
+    {"id": 1, "x": 1491, "y": 600, "visible": True, "offset_x": +25, "offset_y": 0, "speed": 150},
+    {"id": 2, "x": 1491, "y": 375, "visible": True, "offset_x": +25, "offset_y": 0, "speed": 150},
+    {"id": 3, "x": 1400, "y": 300, "visible": True, "offset_x": 0, "offset_y": -25, "speed": 100},
+    {"id": 4, "x": 918,  "y": 300, "visible": True, "offset_x": 0, "offset_y": -25, "speed": 150},
+    {"id": 5, "x": 843,  "y": 248, "visible": True, "offset_x": 0, "offset_y": -25, "speed": 100},
+    {"id": 6, "x": 680,  "y": 248, "visible": True, "offset_x": 0, "offset_y": -25, "speed": 100},
+    {"id": 7, "x": 605,  "y": 300, "visible": True, "offset_x": 0, "offset_y": -25, "speed": 100},
+    {"id": 8, "x": 180,  "y": 300, "visible": True, "offset_x": 0, "offset_y": -25, "speed": 150},
+    {"id": 9, "x": 116,  "y": 375, "visible": True, "offset_x": -25, "offset_y": 0, "speed": 100},
+    {"id": 10, "x": 116, "y": 620, "visible": True, "offset_x": -25, "offset_y": 0, "speed": 150}
 ]
 
 def get_segment_length(seg):
@@ -299,6 +301,15 @@ def get_position_and_heading(seg, t):
 
     return 0, 0, 0
 
+ROUTE_MM_PER_PX = 10    # 지도 1 pixel 당 실제 거리 (mm)
+
+# 각 WP 의 경로 위치 s (driving_path[i-1] 이 WP i-1 -> WP i 구간), 클라이언트가 /waypoints 로 받아 속도 프로파일 계산
+_route_s = 0.0
+for _wp, _seg in zip(waypoints, [None] + driving_path):
+    if _seg is not None:
+        _route_s += get_segment_length(_seg) * ROUTE_MM_PER_PX
+    _wp['s'] = round(_route_s, 1)
+
 def move_agv():
     global target_wp_id, target_reached, agv_speed
     
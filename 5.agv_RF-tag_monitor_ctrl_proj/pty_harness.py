@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+하드웨어 없이 Comm / AsyncComm 을 실행해 보기 위한 pty 기반 가상 시리얼 포트 (Linux/macOS)
+- PtyPort: pty 한 쌍을 만들고 slave 경로(.port)를 Comm 에 넘김, master 쪽이 STM(AGV) 역할
+- FakeAGV: 주기적으로 $STS 프레임을 송신하고 수신한 $CLR 명령을 기록하는 가상 AGV 스레드
+- MasterSerial: pty master 를 pyserial 처럼 쓰게 해 주는 어댑터 (agv_simulator.ser 교체용),
+  baudrate 를 주면 실제 UART 처럼 송신 속도를 제한
+- LoopbackSerial: pty 없이 프로세스 안에서 연결되는 가상 시리얼 한 쌍 (VirtualClock 실행용,
+  Comm(transport=...) 와 agv_simulator.ser 에 각각 연결)
+- CaptureReplayer: Comm(capture=...) 로 기록한 캡처 파일의 수신 데이터를 pty 로 다시 보내는 재생기
+  (1배속, N배속, 최대 속도), 실제 현장 데이터로 표시/제어 프로그램을 다시 실행할 때 사용
+- measure_fault_recovery(): agv_simulator.FaultInjector 로 장애를 넣은 프레임을 Comm 으로 받아
+  장애 하나당 잃은 정상 프레임 수와 재동기화 시간 측정
+- python pty_harness.py 로 실행하면 Comm, AsyncComm, SerialHub 의 송수신,
+  agv_simulator 폐루프(headless) 모델의 CLR 반응, 캡처/재생, 장애 후 재동기화를 차례로 점검
+"""
+
+import asyncio
+import fcntl
+import os
+import select
+import struct
+import sys
+import tempfile
+import termios
+import threading
+import time
+import tty
+
+from Donkibot_i import (CAPTURE_RX, CAPTURE_TX, FRAMING_ASCII, FRAMING_AUTO, ODOMETER_MM_PER_COUNT, SYSTEM_CLOCK,
+                        AsyncComm, Comm, SerialHub, STSDecoder, STSFrame, read_capture)
+
+
+def format_sts(frame: STSFrame) -> bytes:
+    """STSFrame -> "$STS,...\\r\\n" 한 줄"""
+    return ("$STS," + ",".join(map(str, frame)) + "\r\n").encode('latin-1')
+
+
+class PtyPort:
+    """가상 시리얼 포트: Comm(port=pty.port) 로 연결하고 write()/read() 로 AGV 쪽 데이터를 주고받음"""
+
+    def __init__(self):
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)       # 에코, 줄바꿈 변환 없이 byte 그대로 전달
+        self.port = os.ttyname(self.slave_fd)
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master_fd, view)
+            view = view[written:]
+
+    def read(self, timeout: float = 0.0) -> bytes:
+        """Comm 이 보낸 데이터 읽기 (timeout 동안 없으면 b'')"""
+        readable, _, _ = select.select([self.master_fd], [], [], timeout)
+        if not readable:
+            return b''
+        try:
+            return os.read(self.master_fd, 4096)
+        except OSError:
+            return b''
+
+    def master_serial(self, baudrate=None) -> 'MasterSerial':
+        """master 쪽을 pyserial 인터페이스로 감싼 객체 (AGV 역할 코드에 ser 로 전달)"""
+        return MasterSerial(self, baudrate)
+
+    def close(self):
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MasterSerial:
+    """
+    pty master 에 대한 pyserial 호환 최소 인터페이스 (is_open, in_waiting, read, readline, write)
+    - baudrate 를 주면 1 byte = 10 bit 기준으로 write 시간을 맞춰 실제 링크 대역폭을 흉내냄
+    """
+
+    def __init__(self, pty_port: PtyPort, baudrate=None):
+        self.pty = pty_port
+        self.baudrate = baudrate
+        self.is_open = True
+        self._tx_free_at = 0.0      # 이전 송신이 선로에서 끝나는 시각
+
+    @property
+    def in_waiting(self) -> int:
+        return struct.unpack('i', fcntl.ioctl(self.pty.master_fd, termios.FIONREAD, b'\0\0\0\0'))[0]
+
+    def read(self, size: int = 1) -> bytes:
+        data = b''
+        while len(data) < size:
+            readable, _, _ = select.select([self.pty.master_fd], [], [], 0.1)
+            if not readable:
+                break
+            data += os.read(self.pty.master_fd, size - len(data))
+        return data
+
+    def readline(self) -> bytes:
+        line = b''
+        while not line.endswith(b'\n'):
+            chunk = self.read(1)
+            if not chunk:
+                break
+            line += chunk
+        return line
+
+    def write(self, data: bytes) -> int:
+        if self.baudrate:
+            now = time.monotonic()
+            start = max(now, self._tx_free_at)
+            self._tx_free_at = start + len(data) * 10 / self.baudrate
+            if self._tx_free_at > now:
+                time.sleep(self._tx_free_at - now)
+        self.pty.write(data)
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+
+class LoopbackSerial:
+    """
+    프로세스 내부 가상 시리얼 포트의 한쪽 끝 (pair() 로 한 쌍 생성)
+    - write() 한 데이터는 즉시 상대편 수신 버퍼에 들어가고 clock.notify() 로 알림
+    - read() 는 clock.wait_for() 로 대기하므로 VirtualClock 에서도 데이터 도착과 시간 진행이 어긋나지 않음
+    """
+
+    def __init__(self, name: str, clock=SYSTEM_CLOCK):
+        self.port = name
+        self.clock = clock
+        self.timeout = 0.1
+        self.is_open = True
+        self._rx = bytearray()
+        self._cond = threading.Condition()
+        self._peer = None
+
+    @classmethod
+    def pair(cls, clock=SYSTEM_CLOCK):
+        """(PC 쪽, AGV 쪽) 한 쌍"""
+        host, agv = cls('loopback-host', clock), cls('loopback-agv', clock)
+        host._peer, agv._peer = agv, host
+        return host, agv
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx)
+
+    def writable(self) -> bool:
+        return self.is_open
+
+    def write(self, data: bytes) -> int:
+        peer = self._peer
+        with peer._cond:
+            peer._rx += data
+            peer._cond.notify_all()
+        self.clock.notify()
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        """size byte 또는 timeout 까지 도착한 만큼 (timeout=0 이면 있는 만큼만)"""
+        with self._cond:
+            if not self._rx and self.timeout:
+                self.clock.wait_for(self._cond, lambda: self._rx or not self.is_open, self.timeout)
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+            return data
+
+    def reset_input_buffer(self):
+        with self._cond:
+            del self._rx[:]
+
+    def close(self):
+        self.is_open = False
+        with self._cond:
+            self._cond.notify_all()
+        self.clock.notify()
+
+
+class CaptureReplayer:
+    """
+    캡처 파일의 수신(RX) 데이터를 기록된 시간 간격대로 pty 에 다시 보내는 재생기
+    - 생성 후 소비자를 replayer.port 에 연결하고 start() (Comm 은 포트를 열 때 수신 버퍼를 비우므로)
+    - speed: 1.0 실제 속도, N 이면 N 배속, 0 이면 최대 속도 (소비자가 읽는 만큼씩 보냄)
+    - 소비자가 보낸 명령은 읽어서 버리고 consumer_bytes 로 집계만 함
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.pty = PtyPort()
+        self.port = self.pty.port
+        self.sent_records = 0
+        self.sent_bytes = 0
+        self.consumer_bytes = 0
+        self.finished = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None) -> bool:
+        """재생이 끝날 때까지 대기 (loop=True 이면 stop() 전까지 끝나지 않음)"""
+        return self.finished.wait(timeout)
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(1.0)
+        self.pty.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        fd = self.pty.master_fd
+        os.set_blocking(fd, False)
+        try:
+            while self._running:
+                start = time.monotonic()
+                for t, direction, data in read_capture(self.path):
+                    if direction != CAPTURE_RX:
+                        continue
+                    due = start + t / self.speed if self.speed else None
+                    if not self._send(fd, data, due):
+                        return
+                    self.sent_records += 1
+                if not self.loop:
+                    break
+        finally:
+            self.finished.set()
+
+    def _send(self, fd: int, data: bytes, due) -> bool:
+        """due 시각(None 이면 즉시)에 data 를 보내고, 기다리는 동안 소비자 송신 데이터를 비움"""
+        view = memoryview(data)
+        while self._running:
+            wait = max(0.0, due - time.monotonic()) if due is not None else 0.0
+            if not view:
+                return True
+            writing = wait == 0.0
+            readable, writable, _ = select.select([fd], [fd] if writing else [], [], 0.1 if writing else wait)
+            if readable:
+                try:
+                    self.consumer_bytes += len(os.read(fd, 4096))
+                except OSError:
+                    pass
+            if writable:
+                try:
+                    written = os.write(fd, view)
+                except BlockingIOError:
+                    continue
+                view = view[written:]
+                self.sent_bytes += written
+        return False
+
+
+class FakeAGV:
+    """period 마다 frame_source(seq) 가 만든 STS 프레임을 송신하고, 받은 명령 줄을 received 에 기록"""
+
+    def __init__(self, pty_port: PtyPort, period: float = 0.05, frame_source=None):
+        self.pty = pty_port
+        self.period = period
+        self.frame_source = frame_source or (lambda seq: STSFrame(SOC=100, Odometer=seq))
+        self.received = []
+        self.sent = 0
+        self._rx_buf = b''
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(1.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        next_tx = time.monotonic()
+        while self._running:
+            now = time.monotonic()
+            if now >= next_tx:
+                self.sent += 1
+                self.pty.write(format_sts(self.frame_source(self.sent)))
+                next_tx += self.period
+            # 다음 송신 시각까지 수신 대기
+            chunk = self.pty.read(max(0.0, next_tx - time.monotonic()))
+            if chunk:
+                self._rx_buf += chunk
+                *lines, self._rx_buf = self._rx_buf.split(b'\r\n')
+                self.received.extend(line.decode('latin-1') for line in lines)
+
+
+def check_comm():
+    """Comm: 프레임 수신, wait_for_frame(), CLR 송신, stats() 집계 확인"""
+    with PtyPort() as pty, FakeAGV(pty) as agv:
+        comm = Comm(port=pty.port)
+        try:
+            seq, frame = comm.wait_for_frame(0, timeout=1.0)
+            seq, frame = comm.wait_for_frame(seq, timeout=1.0)
+            comm.CLR(100, -100)
+            time.sleep(0.2)
+            link = comm.stats()
+            return (seq > 0 and frame.SOC == 100 and "$CLR,100,-100" in agv.received
+                    and link['frames'] >= 2 and link['tx']['sent'] >= 1)
+        finally:
+            comm.destroy()
+
+
+async def check_async_comm():
+    """AsyncComm: async for 프레임 스트림, await clr() 송신 확인"""
+    with PtyPort() as pty, FakeAGV(pty) as agv:
+        async with AsyncComm(port=pty.port) as comm:
+            odometers = []
+            async for frame in comm:
+                odometers.append(frame.Odometer)
+                if len(odometers) == 5:
+                    break
+            await comm.clr(-50, 50)
+            await asyncio.sleep(0.2)
+        # 프레임 순서가 유지되고 중간에 빠진 프레임이 없어야 함
+        in_order = odometers == list(range(odometers[0], odometers[0] + 5))
+        return in_order and "$CLR,-50,50" in agv.received
+
+
+def check_serial_hub(n_ports: int = 8):
+    """SerialHub: 포트 n개를 스레드 하나로 처리, 포트별 프레임이 섞이지 않고 CLR 이 해당 포트로만 가는지 확인"""
+    ptys = [PtyPort() for _ in range(n_ports)]
+    # 포트마다 SOC 를 다르게 보내 프레임이 다른 포트로 섞이지 않았는지 확인
+    agvs = [FakeAGV(pty, frame_source=lambda seq, soc=i: STSFrame(SOC=soc, Odometer=seq)).start()
+            for i, pty in enumerate(ptys)]
+    threads_before = threading.active_count()
+    try:
+        with SerialHub() as hub:
+            ports = [hub.open(pty.port) for pty in ptys]
+            one_thread = threading.active_count() == threads_before + 1
+            frames_ok = True
+            for i, port in enumerate(ports):
+                seq, frame = port.wait_for_frame(port.frame_seq, timeout=1.0)
+                frames_ok = frames_ok and seq > 0 and frame.SOC == i
+                port.CLR(10 + i, -10 - i)
+            time.sleep(0.2)
+            clr_ok = all(f"$CLR,{10 + i},{-10 - i}" in agv.received for i, agv in enumerate(agvs))
+        return one_thread and frames_ok and clr_ok
+    finally:
+        for agv in agvs:
+            agv.stop()
+        for pty in ptys:
+            pty.close()
+
+
+def check_closed_loop():
+    """agv_simulator headless 모델: CLR 전진 명령에 Speed/Odometer 가 반응하고 정지 명령에 멈추는지 확인"""
+    import agv_simulator
+    with PtyPort() as pty:
+        agv_simulator.ser = pty.master_serial()
+        _, threads = agv_simulator.start_headless()
+        comm = Comm(port=pty.port)
+        try:
+            end = time.monotonic() + 1.0
+            while time.monotonic() < end:
+                comm.CLR(100, 100)
+                time.sleep(0.05)
+            moving = comm.get_latest_data()
+            comm.CLR(0, 0)
+            time.sleep(0.5)
+            stopped = comm.get_latest_data()
+            return (moving.Speed > 50 and moving.Odometer * ODOMETER_MM_PER_COUNT > 30
+                    and stopped.Speed == 0 and stopped.Odometer >= moving.Odometer)
+        finally:
+            comm.destroy()
+            agv_simulator.isOperating = False
+            for thread in threads:
+                thread.join(1.0)
+
+
+def check_capture_replay():
+    """Comm(capture=...) 로 송수신을 기록하고, 최대 속도 재생으로 같은 프레임이 다시 수신되는지 확인"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'agv.cap')
+        with PtyPort() as pty, FakeAGV(pty, period=0.01):
+            comm = Comm(port=pty.port, capture=path)
+            try:
+                seq, _ = comm.wait_for_frame(0, timeout=1.0)
+                comm.CLR(30, 30)
+                comm.wait_for_frame(seq + 20, timeout=1.0)
+            finally:
+                comm.destroy()
+
+        records = list(read_capture(path))
+        rx = b''.join(data for _, direction, data in records if direction == CAPTURE_RX)
+        tx = b''.join(data for _, direction, data in records if direction == CAPTURE_TX)
+        expected = [frame.Odometer for frame in STSDecoder().feed(rx)]
+
+        with CaptureReplayer(path, speed=0) as replayer:
+            comm = Comm(port=replayer.port)
+            odometers = []
+            comm.subscribe(lambda seq, frame: odometers.append(frame.Odometer))
+            try:
+                replayer.start()
+                replayer.wait(2.0)
+                comm.wait_for_frame(len(expected) - 1, timeout=1.0)
+            finally:
+                comm.destroy()
+        in_order = all(t0 <= t1 for (t0, _, _), (t1, _, _) in zip(records, records[1:]))
+        return len(expected) > 20 and b"$CLR,30,30" in tx and in_order and odometers == expected
+
+
+def measure_fault_recovery(rates: dict, n_frames: int = 1000, seed: int = 0, period: float = 0.002,
+                           binary: bool = False, stall_time: float = 0.02) -> dict:
+    """
+    agv_simulator 송신 단계에 장애를 주입하며 Odometer=순번 인 프레임 n_frames 개를 보내고 Comm 수신 결과와 대조
+    - good_lost: 장애가 없던 프레임 중 수신하지 못한 수 (장애 뒤 재동기화가 늦으면 증가)
+    - per_kind[종류]: 장애 수, 장애 직후 잃은 정상 프레임 수 합/최대, 재동기화 시간(장애 프레임 송신 ~
+      그 뒤 첫 정상 프레임 수신) p50/max ms
+    - corrupted: 값이 바뀐 채 파싱을 통과한 프레임 수 (ASCII 숫자 bit 반전 등, CRC 가 있는 바이너리는 0)
+    """
+    import agv_simulator
+    injector = agv_simulator.FaultInjector(rates, seed=seed, stall_time=stall_time)
+    info = agv_simulator.AGV_info_msg
+    info.update(agvStatus=1, SOC=95, LinePos=-3, EmgFlag=0, LidarDistance=800, TfsAngle=12,
+                TfsDistance=430, Speed=120, Odometer=0, RF_tag1=2, RF_tag2=150)
+    expected = [None]
+    sent_at = [None]
+    received = []
+    with PtyPort() as pty:
+        agv_simulator.ser = pty.master_serial()
+        agv_simulator.tx_binary = binary
+        agv_simulator.fault_injector = injector
+        comm = Comm(port=pty.port, framing=FRAMING_AUTO if binary else FRAMING_ASCII, history_capacity=0)
+        comm.subscribe(lambda seq, frame: received.append((time.monotonic(), frame)))
+        try:
+            next_tx = time.monotonic()
+            for i in range(1, n_frames + 1):
+                info['Odometer'] = i
+                expected.append(STSFrame(**info))
+                sent_at.append(time.monotonic())
+                agv_simulator.on_sending_message()
+                next_tx = max(next_tx + period, time.monotonic())
+                time.sleep(max(0.0, next_tx - time.monotonic()))
+            time.sleep(0.2)
+        finally:
+            agv_simulator.fault_injector = None
+            agv_simulator.tx_binary = False
+            comm.destroy()
+
+    got = {}
+    corrupted = 0
+    for t_rx, frame in received:
+        i = frame.Odometer
+        if 1 <= i <= n_frames and frame == expected[i]:
+            got.setdefault(i, t_rx)
+        else:
+            corrupted += 1
+    faulted = {i: kind for i, kind in injector.events if kind != 'stall'}
+    good_lost = sum(1 for i in range(1, n_frames + 1) if i not in faulted and i not in got)
+
+    per_kind = {}
+    for i, kind in injector.events:
+        # 장애 뒤 첫 정상 수신 프레임 찾기 (stall 은 해당 프레임 자체가 정상이어야 함)
+        j = i if kind == 'stall' else i + 1
+        lost = 0
+        while j <= n_frames and j not in got:
+            if j not in faulted:
+                lost += 1
+            j += 1
+        stats = per_kind.setdefault(kind, {'faults': 0, 'good_lost': 0, 'max_good_lost': 0, 'resync_ms': []})
+        stats['faults'] += 1
+        stats['good_lost'] += lost
+        stats['max_good_lost'] = max(stats['max_good_lost'], lost)
+        if j <= n_frames:
+            stats['resync_ms'].append((got[j] - sent_at[i]) * 1000.0)
+    per_kind = {kind: per_kind[kind] for kind in agv_simulator.FAULT_KINDS if kind in per_kind}
+    for stats in per_kind.values():
+        resync = sorted(stats.pop('resync_ms'))
+        stats['resync_p50_ms'] = resync[len(resync) // 2] if resync else None
+        stats['resync_max_ms'] = resync[-1] if resync else None
+
+    return {'frames': n_frames, 'faults': len(injector.events), 'received': len(got),
+            'good_lost': good_lost, 'corrupted': corrupted, 'per_kind': per_kind,
+            'parse_errors': {k: v for k, v in comm.stats()['parse_errors'].items() if v}}
+
+
+def check_fault_recovery():
+    """모든 장애 종류에 대해 장애 뒤 다음 정상 프레임을 잃지 않는지(1 프레임 안에 재동기화) 확인 (ASCII, 바이너리)"""
+    rates = {'drop': 0.04, 'flip': 0.04, 'truncate': 0.04, 'garbage': 0.04, 'stall': 0.01}
+    ok = True
+    for binary in (False, True):
+        report = measure_fault_recovery(rates, n_frames=800, seed=1, binary=binary)
+        print(f"  {'binary' if binary else 'ascii '} 프레임 {report['frames']}, 장애 {report['faults']}, "
+              f"정상 프레임 손실 {report['good_lost']}, 값 변조 통과 {report['corrupted']}")
+        for kind, stats in report['per_kind'].items():
+            print(f"    {kind:<8s} x{stats['faults']:3d} | 손실 {stats['good_lost']} (최대 {stats['max_good_lost']}) | "
+                  f"재동기화 p50 {stats['resync_p50_ms']:.1f} ms, max {stats['resync_max_ms']:.1f} ms")
+        ok = ok and report['good_lost'] == 0 and len(report['per_kind']) == 5
+        if binary:
+            ok = ok and report['corrupted'] == 0
+    return ok
+
+
+if __name__ == '__main__':
+    results = {
+        'Comm': check_comm(),
+        'AsyncComm': asyncio.run(check_async_comm()),
+        'SerialHub': check_serial_hub(),
+        'ClosedLoopSim': check_closed_loop(),
+        'CaptureReplay': check_capture_replay(),
+        'FaultRecovery': check_fault_recovery(),
+    }
+    for name, ok in results.items():
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}")
+    sys.exit(0 if all(results.values()) else 1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시리얼 캡처 파일 재생기 (Linux/macOS)
+- Comm(capture='agv.cap') 또는 agv.start_capture('agv.cap') 로 현장에서 기록한 파일의 수신 데이터를
+  pty 가상 포트로 다시 보내, agv_state_disp.py / 대시보드 / 제어 루프를 같은 데이터로 다시 실행
+- --info: 재생하지 않고 캡처 내용 요약 (기간, 프레임 수, 파싱 오류, 송신 명령 수)
+
+python serial_replay.py agv.cap [--speed 1 | --speed 10 | --speed 0(최대)] [--loop] [--delay 3]
+  -> 출력된 /dev/pts/N 을 소비자 프로그램의 포트로 지정 (예: python agv_state_disp.py /dev/pts/N)
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from Donkibot_i import CAPTURE_RX, CAPTURE_TX, STSDecoder, read_capture, read_capture_header
+from pty_harness import CaptureReplayer
+
+
+def capture_info(path: str) -> dict:
+    """캡처 파일 요약: 기간, 방향별 byte 수, 수신 프레임 수/파싱 오류, 송신 명령 수"""
+    _, wall = read_capture_header(path)
+    decoder = STSDecoder(accept_binary=True)
+    frames = records = rx_bytes = tx_bytes = 0
+    tx_lines = 0
+    duration = 0.0
+    for t, direction, data in read_capture(path):
+        records += 1
+        duration = t
+        if direction == CAPTURE_RX:
+            rx_bytes += len(data)
+            frames += len(decoder.feed(data))
+        elif direction == CAPTURE_TX:
+            tx_bytes += len(data)
+            tx_lines += max(1, data.count(b'\r\n'))
+    return {
+        'start': datetime.fromtimestamp(wall).strftime("%Y-%m-%d %H:%M:%S"),
+        'duration_s': duration,
+        'records': records,
+        'rx_bytes': rx_bytes,
+        'tx_bytes': tx_bytes,
+        'frames': frames,
+        'binary_frames': decoder.binary_count,
+        'parse_errors': {name: count for name, count in decoder.errors.items() if count},
+        'tx_commands': tx_lines,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="시리얼 캡처 파일을 pty 가상 포트로 재생")
+    parser.add_argument('capture', help="캡처 파일 경로")
+    parser.add_argument('--speed', type=float, default=1.0, help="재생 배속 (1: 실제 속도, 0: 최대 속도)")
+    parser.add_argument('--loop', action='store_true', help="끝나면 처음부터 반복")
+    parser.add_argument('--delay', type=float, help="재생 시작 전 대기 시간 (s), 생략 시 Enter 입력 후 시작")
+    parser.add_argument('--info', action='store_true', help="재생하지 않고 캡처 요약만 출력")
+    args = parser.parse_args()
+
+    info = capture_info(args.capture)
+    print(f"캡처 {args.capture}: {info['start']} 부터 {info['duration_s']:.1f}s, 수신 프레임 {info['frames']}개 "
+          f"(바이너리 {info['binary_frames']}), 파싱 오류 {info['parse_errors']}, 송신 명령 {info['tx_commands']}개")
+    if args.info:
+        raise SystemExit(0)
+
+    with CaptureReplayer(args.capture, speed=args.speed, loop=args.loop) as replayer:
+        print(f"가상 시리얼 포트: {replayer.port}  (소비자 프로그램을 이 포트로 연결)")
+        if args.delay is None:
+            input("소비자 프로그램을 연결한 뒤 Enter 를 누르면 재생을 시작합니다...")
+        else:
+            time.sleep(args.delay)
+        start = time.monotonic()
+        replayer.start()
+        try:
+            while not replayer.wait(1.0):
+                print(f"  {time.monotonic() - start:7.1f}s 재생 레코드 {replayer.sent_records}, "
+                      f"{replayer.sent_bytes} byte, 소비자 송신 {replayer.consumer_bytes} byte")
+        except KeyboardInterrupt:
+            pass
+        print(f"재생 종료: 레코드 {replayer.sent_records}, {replayer.sent_bytes} byte, "
+              f"{time.monotonic() - start:.1f}s")
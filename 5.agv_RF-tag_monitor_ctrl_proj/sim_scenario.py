@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가상 시간 시나리오 실행기: agv_simulator 폐루프 모델 + AGV_MACHINE_OPERATE 제어 루프를
+VirtualClock 과 프로세스 내부 연결(LoopbackSerial)로 묶어 실제 시간보다 빠르게 실행
+- 30분 주행 같은 긴 시나리오(태그 통과, 장애물 정지/재출발, 비상정지)를 수 초~수십 초에 재현
+- 서버 없이 실행하면 시작 시 GO 명령을 넣어 둔 상태로 주행 (--server 로 실제 서버 URL 사용 가능,
+  단 HTTP 요청 시간 동안은 가상 시간이 멈춰 있으므로 배속이 크게 떨어짐)
+
+python sim_scenario.py --duration 1800 [--track track.json] [--rate 20]
+"""
+
+import argparse
+import json
+import threading
+import time
+
+import agv_simulator
+from agv_control_client import AGV_MACHINE_OPERATE, CMD_AGV
+from Donkibot_i import VirtualClock
+from pty_harness import LoopbackSerial
+
+NO_SERVER_URL = ''      # 서버 없이 실행: 요청이 네트워크 접근 없이 즉시 실패 (MissingSchema)
+
+
+def run_scenario(duration: float, config=None, rate: float = 20.0, server: str = None, report_every: float = 60.0,
+                 setup=None):
+    """duration(가상 s) 동안 실행 후 요약 dict 반환 (setup: 주행 전에 client 를 받아 설정을 바꾸는 함수)"""
+    config = dict(config if config is not None else agv_simulator.DEFAULT_TRACK)
+    # 제어 클라이언트는 후진 방향 라인 보정(LinePos 부호 반전)을 하므로 센서 부호를 맞춰 줌
+    config['line_pos_sign'] = -1
+    clock = VirtualClock()
+    host, agv_side = LoopbackSerial.pair(clock)
+    agv_simulator.ser = agv_side
+    agv_simulator.TX_PERIOD = 1.0 / rate
+    model, sim_threads = agv_simulator.start_headless(config, clock)
+
+    client = AGV_MACHINE_OPERATE('loopback', clock=clock, transport=host)
+    if server:
+        client.server_post_url = server.rstrip('/') + '/client_data'
+        client.server_get_url = server.rstrip('/') + '/server_data'
+        client.server_waypoints_url = server.rstrip('/') + '/waypoints'
+    else:
+        client.server_post_url = client.server_get_url = client.server_waypoints_url = NO_SERVER_URL
+        client.cmd_data_to_client = {"From_server_cmd": CMD_AGV.GO.value, "Alv_cnt": 0}
+    if setup is not None:
+        setup(client)
+
+    states = {}
+    tags_seen = []
+
+    def monitor():
+        next_report = report_every
+        while clock.now() < duration:
+            clock.sleep(min(0.5, duration - clock.now()))
+            state = client.agv_process_state
+            states[state] = states.get(state, 0) + 0.5
+            tag = agv_simulator.AGV_info_msg['RF_tag1']
+            if tag and (not tags_seen or tags_seen[-1] != tag):
+                tags_seen.append(tag)
+            if clock.now() >= next_report:
+                next_report += report_every
+                print(f"t={clock.now():7.1f}s s={model.s:7.0f} lat={model.lateral:6.1f}mm "
+                      f"Speed={agv_simulator.AGV_info_msg['Speed']:4d} state={state} "
+                      f"{client.agv_clr_cmd}")
+
+    monitor_thread = threading.Thread(target=monitor, daemon=True)
+    clock.register(monitor_thread)
+    start = time.monotonic()
+    monitor_thread.start()
+    monitor_thread.join()
+    real = time.monotonic() - start
+
+    link = client.agv_comm.stats()
+    client.isRunning = False
+    agv_simulator.isOperating = False
+    clock.detach()
+    client.agv_comm.destroy()
+    for thread in sim_threads:
+        thread.join(1.0)
+    return {
+        'virtual_s': round(clock.now(), 3),
+        'real_s': round(real, 3),
+        'speedup': round(clock.now() / real, 1) if real > 0 else None,
+        'distance_mm': round(model.odometer_mm, 1),
+        'laps': round(model.odometer_mm / model.track.length, 2),
+        'final_lateral_mm': round(model.lateral, 1),
+        'tags_seen': tags_seen,
+        'obstacle_stops': client.obstacle_governor.stops,
+        'state_time_s': {str(k): v for k, v in sorted(states.items())},
+        'frames': link['frames'],
+        'clr_sent': link['tx']['sent'],
+        'frame_age_ms': {label: {'decide_mean': round(ch['decide_ms']['mean'], 3),
+                                 'write_mean': round(ch['write_ms']['mean'], 3),
+                                 'write_max': round(ch['write_ms']['max'], 3)}
+                         for label, ch in link['latency']['channels'].items()},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="가상 시간 AGV 시나리오 실행")
+    parser.add_argument('--duration', type=float, default=600.0, help="가상 시간 실행 길이 (s)")
+    parser.add_argument('--track', help="트랙 설정 JSON (agv_simulator.DEFAULT_TRACK 형식)")
+    parser.add_argument('--rate', type=float, default=20.0, help="STS 송신 주기 (Hz)")
+    parser.add_argument('--server', help="서버 주소 (예: http://localhost:5000), 생략 시 서버 없이 GO 상태로 주행")
+    parser.add_argument('--report', type=float, default=60.0, help="진행 상황 출력 간격 (가상 s)")
+    args = parser.parse_args()
+
+    track = None
+    if args.track:
+        with open(args.track, encoding='utf-8') as f:
+            track = json.load(f)
+    summary = run_scenario(args.duration, track, args.rate, args.server, args.report)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
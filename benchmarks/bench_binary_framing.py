@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASCII / 바이너리 STS 프레임 처리량 비교 (agv_simulator + pty, 하드웨어 불필요)
+- 링크 처리량: agv_simulator 의 송신 스레드를 쉬지 않고(TX_PERIOD=0) 돌리고,
+  pty master 쓰기를 115200 baud 속도로 제한한 상태에서 Comm 이 받은 frames/s 측정
+  (framing='ascii' 와 framing='auto' -> "$MODE,BIN" 협상 후 바이너리)
+- 디코더 CPU: 같은 프레임을 ASCII / 바이너리로 인코딩해 STSDecoder 로 디코딩하는 시간
+
+실행: python benchmarks/bench_binary_framing.py [측정 시간(s)]
+"""
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+import agv_simulator
+from Donkibot_i import FRAMING_ASCII, FRAMING_AUTO, Comm, STSDecoder, STSFrame, encode_sts_binary
+from pty_harness import PtyPort, format_sts
+
+BAUDRATE = 115200
+N_FRAMES = 100000
+REPEAT = 5
+SAMPLE = STSFrame(1, 95, 12, 0, 532, -15, 420, 120, 34567, 123, 255)
+
+
+def measure_link(framing, duration):
+    """시뮬레이터 최대 송신율에서 Comm 이 실제로 받은 (frames/s, byte/frame, 최종 형식)"""
+    with PtyPort() as pty:
+        agv_simulator.ser = pty.master_serial(BAUDRATE)
+        agv_simulator.TX_PERIOD = 0
+        agv_simulator.tx_binary = False
+        agv_simulator.AGV_info_msg.update(SAMPLE._asdict())     # 실제와 비슷한 길이의 ASCII 프레임
+        agv_simulator.isOperating = True
+        threads = [threading.Thread(target=agv_simulator.tx_thread_func, daemon=True),
+                   threading.Thread(target=agv_simulator.rx_thread_func, daemon=True)]
+        for thread in threads:
+            thread.start()
+        comm = Comm(port=pty.port, baudrate=BAUDRATE, framing=framing, history_capacity=0)
+        try:
+            time.sleep(0.5)     # 협상 및 안정화
+            start = comm.stats()
+            time.sleep(duration)
+            end = comm.stats()
+        finally:
+            agv_simulator.isOperating = False
+            for thread in threads:
+                thread.join(1.0)
+            comm.destroy()
+    frames = end['frames'] - start['frames']
+    rx_bytes = end['rx_bytes'] - start['rx_bytes']
+    return frames / duration, rx_bytes / max(frames, 1), end['framing']
+
+
+def measure_decoder(data, n_frames):
+    best = float('inf')
+    for _ in range(REPEAT):
+        decoder = STSDecoder(accept_binary=True)
+        start = time.process_time()
+        # 수신 스레드처럼 4 KiB 조각으로 나누어 입력
+        for i in range(0, len(data), 4096):
+            decoder.feed(data[i:i + 4096])
+        best = min(best, time.process_time() - start)
+    assert decoder.frame_count == n_frames
+    return best / n_frames * 1e6
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+    print(f"링크 처리량 ({BAUDRATE} baud 제한, {duration:.0f}s)")
+    for framing in (FRAMING_ASCII, FRAMING_AUTO):
+        fps, frame_bytes, active = measure_link(framing, duration)
+        print(f"  framing={framing:<5s} -> {active:<6s} | {fps:7.1f} frames/s | "
+              f"{frame_bytes:5.1f} byte/frame | 이론 최대 {BAUDRATE / 10 / frame_bytes:6.1f} frames/s")
+
+    print(f"디코더 CPU ({N_FRAMES} frames, best of {REPEAT})")
+    for name, encode in (('ascii', format_sts), ('binary', encode_sts_binary)):
+        us = measure_decoder(encode(SAMPLE) * N_FRAMES, N_FRAMES)
+        print(f"  {name:<6s} | {us:5.2f} us/frame | {1e6 / us:9.0f} frames/s")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comm 수신 모드 비교 벤치마크 (pty 사용, 하드웨어 불필요)
+- 유휴 CPU: 데이터가 전혀 없을 때 수신 스레드가 소모하는 CPU 시간
+- 지연 시간: pty 에 프레임을 쓴 시점부터 Comm.latest_data 가 갱신될 때까지 걸린 시간
+
+실행: python benchmarks/bench_comm_reader.py [유휴 측정 시간(s)] [프레임 수]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from Donkibot_i import Comm, READ_MODE_EVENT, READ_MODE_POLL
+
+FRAME_PERIOD = 0.02     # 50 Hz 송신
+
+
+class TimedComm(Comm):
+    """latest_data 가 갱신되는 순간의 시각을 기록하는 Comm"""
+
+    def __init__(self, *args, **kwargs):
+        self.arrivals = {}
+        super().__init__(*args, **kwargs)
+
+    @property
+    def latest_data(self):
+        return self._latest
+
+    @latest_data.setter
+    def latest_data(self, frame):
+        self._latest = frame
+        self.arrivals[frame.Odometer] = time.perf_counter()
+
+
+def measure_idle_cpu(read_mode, duration):
+    master, slave = os.openpty()
+    comm = TimedComm(port=os.ttyname(slave), read_mode=read_mode)
+    try:
+        time.sleep(0.2)
+        cpu_start = time.process_time()
+        time.sleep(duration)
+        cpu = time.process_time() - cpu_start
+    finally:
+        comm.destroy()
+        os.close(master)
+        os.close(slave)
+    return cpu / duration * 100.0
+
+
+def measure_latency(read_mode, n_frames):
+    master, slave = os.openpty()
+    comm = TimedComm(port=os.ttyname(slave), read_mode=read_mode)
+    sent = {}
+    try:
+        time.sleep(0.2)
+        for seq in range(1, n_frames + 1):
+            line = f"$STS,1,95,0,0,500,0,0,0,{seq},0,100\r\n".encode('latin-1')
+            sent[seq] = time.perf_counter()
+            os.write(master, line)
+            time.sleep(FRAME_PERIOD)
+        time.sleep(0.2)
+    finally:
+        comm.destroy()
+        os.close(master)
+        os.close(slave)
+
+    latencies = sorted((comm.arrivals[seq] - sent[seq]) * 1e6
+                       for seq in sent if seq in comm.arrivals)
+    if not latencies:
+        return {'received': 0}
+    return {
+        'received': len(latencies),
+        'mean_us': statistics.fmean(latencies),
+        'p50_us': latencies[len(latencies) // 2],
+        'p99_us': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def run(idle_seconds=3.0, n_frames=300):
+    results = {}
+    for mode in (READ_MODE_POLL, READ_MODE_EVENT):
+        results[mode] = {
+            'idle_cpu_percent': measure_idle_cpu(mode, idle_seconds),
+            'latency': measure_latency(mode, n_frames),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    idle = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    for mode, r in run(idle, n).items():
+        lat = r['latency']
+        print(f"[{mode:5s}] 유휴 CPU {r['idle_cpu_percent']:5.2f} % | "
+              f"수신 {lat['received']}/{n} | 지연 평균 {lat.get('mean_us', 0):7.1f} us, "
+              f"p50 {lat.get('p50_us', 0):7.1f} us, p99 {lat.get('p99_us', 0):7.1f} us")
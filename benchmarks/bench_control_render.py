@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+curses 화면 출력이 제어 주기 지터에 주는 영향 비교 (pty + FakeAGV 사용, Linux 전용)
+- inline: 기존 구조 재현 (제어 주기마다 stdscr.clear() + 전체 addstr + refresh 를 제어 스레드에서 실행)
+- decoupled: line_follow_control_mode (제어는 ControlLoop 스레드, 화면은 100ms 마다 바뀐 칸만 갱신)
+- 터미널: fast(출력 지연 없음), slow(SSH 흉내: refresh 마다 고정 지연 + 전송한 칸 수에 비례한 지연)
+
+실행: python benchmarks/bench_control_render.py [측정 시간(s)] [slow 고정 지연 ms] [slow 칸당 지연 us]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '4.agv_line_follow_proj'))
+sys.path.append(os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))     # pty_harness
+
+import agv_line_follow_control
+from Donkibot_i import Comm, PeriodicScheduler, STSFrame, display_width
+from pty_harness import FakeAGV, PtyPort
+
+CONTROL_INTERVAL = 0.05     # agv_line_follow_control 와 같은 제어 주기
+SCREEN_ROWS, SCREEN_COLS = 40, 100
+
+
+class SlowScreen:
+    """
+    curses stdscr 대용: refresh() 에서 직전 refresh 이후 쓴 칸 수만큼 터미널 전송 시간을 흉내내어 sleep
+    - clear() 후에는 화면 전체(rows x cols)를 다시 보내는 것으로 계산
+    - 시작 직후 's'(주행 시작), duration 이 지나면 'm'(메뉴로) 키 입력을 돌려줌
+    """
+
+    def __init__(self, duration: float, latency: float = 0.0, per_cell: float = 0.0):
+        self.latency = latency
+        self.per_cell = per_cell
+        self._end = time.monotonic() + duration
+        self._timeout_ms = -1
+        self._keys = [ord('s')]
+        self._pending = 0
+        self.refreshes = 0
+        self.cells_sent = 0
+
+    def timeout(self, ms: int):
+        self._timeout_ms = ms
+
+    def nodelay(self, flag: bool):
+        self._timeout_ms = 0 if flag else -1
+
+    def getch(self) -> int:
+        if self._keys:
+            return self._keys.pop(0)
+        if time.monotonic() >= self._end:
+            return ord('m')
+        if self._timeout_ms > 0:
+            time.sleep(self._timeout_ms / 1000.0)
+        return -1
+
+    def getmaxyx(self):
+        return SCREEN_ROWS, SCREEN_COLS
+
+    def clear(self):
+        self._pending = SCREEN_ROWS * SCREEN_COLS
+
+    def addstr(self, row: int, col: int, text: str):
+        if row >= SCREEN_ROWS or col + display_width(text) > SCREEN_COLS:
+            raise ValueError("화면 밖 좌표")
+        self._pending += display_width(text)
+
+    def refresh(self):
+        self.refreshes += 1
+        self.cells_sent += self._pending
+        if self.latency or self.per_cell:
+            time.sleep(self.latency + self.per_cell * self._pending)
+        self._pending = 0
+
+
+def inline_mode(screen, agv):
+    """기존 구조: 한 스레드에서 키 확인 -> 주기 대기 -> 제어 -> 화면 전체 다시 쓰기"""
+    ticker = PeriodicScheduler(CONTROL_INTERVAL)
+    screen.nodelay(True)
+    while screen.getch() not in (ord('m'), ord('M')):
+        ticker.tick()
+        s = agv.get_latest_data()
+        agv.CLR(150 - s.LinePos, 150 + s.LinePos)
+        screen.clear()
+        screen.addstr(0, 0, "=" * 70)
+        for row in range(1, 24):
+            screen.addstr(row, 4, f"항목 {row:2d}       : {s.LinePos:5d} {s.Odometer:8d} {s.Speed:5d} mm/s")
+        screen.addstr(25, 2, ticker.summary())
+        screen.refresh()
+    agv.CLR(0, 0)
+    return ticker.stats()
+
+
+def measure(kind: str, duration: float, latency: float, per_cell: float):
+    def frame_source(seq):
+        return STSFrame(SOC=90, LinePos=seq % 11 - 5, LidarDistance=2000, Speed=150, Odometer=seq * 7)
+
+    screen = SlowScreen(duration, latency, per_cell)
+    with PtyPort() as pty, FakeAGV(pty, period=0.05, frame_source=frame_source):
+        agv = Comm(port=pty.port)
+        try:
+            time.sleep(0.2)
+            if kind == 'inline':
+                stats = inline_mode(screen, agv)
+            else:
+                stats = agv_line_follow_control.line_follow_control_mode(screen, agv)
+        finally:
+            agv.destroy()
+    return stats, screen
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    slow_latency = float(sys.argv[2]) / 1000.0 if len(sys.argv) > 2 else 0.02
+    slow_per_cell = (float(sys.argv[3]) if len(sys.argv) > 3 else 10.0) / 1e6
+
+    print(f"제어 주기 {CONTROL_INTERVAL * 1000:.0f}ms, {duration:.0f}s 측정, slow 터미널: refresh 당 "
+          f"{slow_latency * 1000:.0f}ms + 칸당 {slow_per_cell * 1e6:.0f}us")
+    for terminal, latency, per_cell in (('fast', 0.0, 0.0), ('slow', slow_latency, slow_per_cell)):
+        for kind in ('inline', 'decoupled'):
+            stats, screen = measure(kind, duration, latency, per_cell)
+            jitter, busy = stats['jitter_ms'], stats['exec_ms']
+            print(f"  {terminal:<4s} {kind:<9s} | {stats['rate_hz']:5.1f} Hz | 지터 평균 {jitter['mean']:6.2f} "
+                  f"최대 {jitter['max']:6.2f} ms | 실행 최대 {busy['max']:6.2f} ms | overrun {stats['overruns']:3d} "
+                  f"건너뜀 {stats['skipped']:3d} | 화면 전송 {screen.cells_sent / duration:8.0f} 칸/s")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+감지-구동 지연 추적(LatencyTracer) 비용과 측정 예 (Linux 전용, pty + FakeAGV 사용)
+- cost: get_latest_data() + CLR() 한 번(제어 주기 1회)의 추적 켬/끔 시간 차이, 이벤트 기록 함수 단독 비용 (ns)
+- 측정 예: FakeAGV 약 21Hz(48ms, STM 클럭은 PC 제어 주기와 맞춰져 있지 않음) 프레임에 대한 세 제어 방식의
+  프레임 나이 (decide: CLR 호출 시점, write: 포트에 쓴 시점)
+  fixed_50ms : ControlLoop 50ms 고정 주기로 최신 프레임 사용 (이전 방식, 비교용)
+  frame_loop : ControlLoop(frames=agv) 로 새 프레임마다 제어, 100ms keepalive (agv_line_follow_control / agv_tfs_control 방식)
+  frame_wait : wait_for_frame() 으로 새 프레임마다 제어 (agv_control_client 방식)
+
+실행: python benchmarks/bench_latency_trace.py [방식별 측정 시간(s)]
+"""
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from Donkibot_i import Comm, ControlLoop, LatencyTracer, STSFrame
+from pty_harness import FakeAGV, LoopbackSerial, PtyPort, format_sts
+
+CONTROL_INTERVAL = 0.05
+FRAME_PERIOD = 0.048
+KEEPALIVE_INTERVAL = 0.1
+COST_CALLS = 200000
+
+
+def control_cost(trace: bool, calls: int = COST_CALLS) -> float:
+    """제어 주기 1회(get_latest_data + CLR)의 평균 시간 (ns), 송신 스레드는 루프백 포트에 씀"""
+    host, agv = LoopbackSerial.pair()
+    comm = Comm(transport=host, trace=trace, history_capacity=0)
+    try:
+        agv.write(format_sts(STSFrame(SOC=100)))
+        comm.wait_for_frame(0, timeout=1.0)
+        start = time.perf_counter()
+        for i in range(calls):
+            s = comm.get_latest_data()
+            comm.CLR(100 + (i & 7), 100 + s.LinePos)
+        return (time.perf_counter() - start) / calls * 1e9
+    finally:
+        comm.destroy()
+
+
+def record_cost(calls: int = COST_CALLS) -> float:
+    """record_decide() + record_write() 한 쌍의 평균 시간 (ns)"""
+    tracer = LatencyTracer()
+    start = time.perf_counter()
+    for i in range(calls):
+        tracer.record_decide('bench', i, 0.003)
+        tracer.record_write('bench', 0.004)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def frame_wait_loop(agv: Comm, duration: float):
+    """agv_control_client.main_control_loop 과 같은 새 프레임 대기 제어"""
+    agv.trace_label('frame_wait')
+    end = time.monotonic() + duration
+    seq = 0
+    last_clr = (0, 0)
+    while time.monotonic() < end:
+        new_seq, _ = agv.wait_for_frame(seq, timeout=2 * CONTROL_INTERVAL)
+        if new_seq == seq:
+            agv.CLR(*last_clr)      # 프레임이 늦으면 마지막 명령만 재송신
+            continue
+        seq = new_seq
+        s = agv.get_latest_data()
+        last_clr = (100 + s.LinePos, 100 - s.LinePos)
+        agv.CLR(*last_clr)
+
+
+def measure(kind: str, duration: float) -> dict:
+    def frame_source(seq):
+        return STSFrame(SOC=90, LinePos=seq % 11 - 5, LidarDistance=2000, Speed=100, Odometer=seq * 5)
+
+    with PtyPort() as pty, FakeAGV(pty, period=FRAME_PERIOD, frame_source=frame_source):
+        agv = Comm(port=pty.port)
+        try:
+            agv.wait_for_frame(0, timeout=1.0)
+            agv.tracer.reset()
+            if kind in ('fixed_50ms', 'frame_loop'):
+                def step():
+                    s = agv.get_latest_data()
+                    agv.CLR(100 + s.LinePos, 100 - s.LinePos)
+                if kind == 'fixed_50ms':
+                    loop = ControlLoop(step, CONTROL_INTERVAL, name=kind)
+                else:
+                    loop = ControlLoop(step, KEEPALIVE_INTERVAL, name=kind, frames=agv)
+                with loop:
+                    time.sleep(duration)
+            else:
+                worker = threading.Thread(target=frame_wait_loop, args=(agv, duration), name=kind)
+                worker.start()
+                worker.join()
+            return agv.stats()['latency']['channels'][kind]
+        finally:
+            agv.destroy()
+
+
+def share_below(hist: dict, limit_ms: float) -> float:
+    """히스토그램에서 limit_ms 경계 아래 칸의 비율"""
+    below = sum(n for edge, n in zip(hist['edges'], hist['counts']) if edge <= limit_ms)
+    return below / hist['count'] if hist['count'] else 0.0
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+
+    off = min(control_cost(False) for _ in range(3))
+    on = min(control_cost(True) for _ in range(3))
+    print(f"제어 주기 1회 (get_latest_data + CLR): 추적 끔 {off:6.0f} ns, 켬 {on:6.0f} ns, "
+          f"추가 {on - off:5.0f} ns")
+    print(f"record_decide + record_write: {min(record_cost() for _ in range(3)):5.0f} ns (이벤트 2개)")
+
+    print(f"FakeAGV {1 / FRAME_PERIOD:.0f}Hz, 방식별 {duration:.0f}s, 프레임 나이 (평균/최대 ms, 5ms 미만 비율)")
+    for kind in ('fixed_50ms', 'frame_loop', 'frame_wait'):
+        ch = measure(kind, duration)
+        decide, write = ch['decide_ms'], ch['write_ms']
+        print(f"  {kind:<10s} | decide {decide['mean']:5.1f}/{decide['max']:5.1f} ms ({share_below(decide, 5) * 100:3.0f}%) | "
+              f"write {write['mean']:5.1f}/{write['max']:5.1f} ms ({share_below(write, 5) * 100:3.0f}%) | "
+              f"CLR {decide['count']:4d} 송신 {write['count']:4d} 같은 프레임 재사용 {ch['reused']:4d}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라인 추종 제어기 비교: 기존 if/elif 제어(클라이언트, 라인 추종 모드)와 표 기반 PD 제어기(LineController)
+- agv_simulator.KinematicAGV (차동 구동, 바퀴 가속 한계, LinePos 5mm 양자화) 를 실제 시간 없이 적분
+- 제어 주기 50ms, 센서 값은 제어 시점의 LinePos, 속도 제한을 고정한 채 기본 트랙(둥근 사각형)을 주행
+- 지표: 평균 속도, 횡오차 RMS / 최대 (mm), 조향 변화 RMS (주기 간 바퀴 속도 차 변화량 mm/s, 명령이 튀는 정도),
+  LineController.update 호출 비용 (us)
+
+실행: python benchmarks/bench_line_controller.py [주행 시간(s)] [속도 제한 목록 예: 100,150,200,250,300]
+"""
+
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+import agv_simulator
+from Donkibot_i import LineController
+
+CONTROL_INTERVAL = 0.05
+
+
+def client_ladder(line_pos, limit):
+    """AGV_MACHINE_OPERATE.line_following_control 의 기존 제어 (정수 보정 0/1, ±5 초과 시 제자리 회전)"""
+    radius = 5
+    if abs(line_pos) > radius:
+        return (-limit // 2, limit // 2) if line_pos < -radius else (limit // 2, -limit // 2)
+    if line_pos == 0:
+        return limit, limit
+    correction = int(80 * int(abs(line_pos) / (radius * 1.0)))
+    return (limit - correction, limit) if line_pos < 0 else (limit, limit - correction)
+
+
+def mode_ladder(line_pos, limit):
+    """line_follow_control_mode 의 기존 제어 (±8 초과 제자리 회전, 그 안은 회전 강도 50 비례)"""
+    turn = 50
+    if abs(line_pos) > 8:
+        return (-turn, turn) if line_pos < -8 else (turn, -turn)
+    if line_pos == 0:
+        return limit, limit
+    reduction = int(turn * abs(line_pos) / 8.0)
+    return (limit - reduction, limit) if line_pos < 0 else (limit, limit - reduction)
+
+
+def drive(control, limit, duration):
+    """고정 속도 제한으로 duration(s) 주행 후 지표 dict"""
+    config = dict(agv_simulator.DEFAULT_TRACK, tags=[])
+    model = agv_simulator.KinematicAGV(agv_simulator.Track.from_config(config), config)
+    substeps = int(round(CONTROL_INTERVAL / agv_simulator.SIM_SUBSTEP))
+    sq_sum, samples, worst, steer_sq, last_steer = 0.0, 0, 0.0, 0.0, 0
+    for _ in range(int(duration / CONTROL_INTERVAL)):
+        vl, vr = control(model.line_pos(), limit)
+        steer_sq += (vl - vr - last_steer) ** 2
+        last_steer = vl - vr
+        for _ in range(substeps):
+            model.step(agv_simulator.SIM_SUBSTEP, vl, vr)
+        sq_sum += model.lateral ** 2
+        samples += 1
+        worst = max(worst, abs(model.lateral))
+    return {
+        'speed': model.odometer_mm / duration,
+        'rms_mm': math.sqrt(sq_sum / samples),
+        'max_mm': worst,
+        'steer_change_rms': math.sqrt(steer_sq / samples),
+    }
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    limits = [int(v) for v in sys.argv[2].split(',')] if len(sys.argv) > 2 else [100, 150, 200, 250, 300]
+
+    controller = LineController()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.5:
+        for pos in range(-15, 16):
+            controller.update(pos, 150)
+        calls += 31
+    print(f"LineController.update: {(time.perf_counter() - start) / calls * 1e6:.2f} us/회, 이득 {controller.gains}")
+
+    print(f"기본 트랙 {duration:.0f}s 주행, 제어 주기 {CONTROL_INTERVAL * 1000:.0f}ms")
+    for limit in limits:
+        for name, control in (('client', client_ladder), ('mode', mode_ladder),
+                              ('pd_table', LineController().update)):
+            r = drive(control, limit, duration)
+            print(f"  limit {limit:3d} {name:<8s} | 평균 속도 {r['speed']:6.1f} mm/s | 횡오차 RMS {r['rms_mm']:6.1f} "
+                  f"최대 {r['max_mm']:7.1f} mm | 조향 변화 RMS {r['steer_change_rms']:6.1f} mm/s")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+장애물 속도 조절 비교 (가상 시간 시뮬레이터, sim_scenario.run_scenario)
+- hard_stop: 기존 방식 재현 (LidarDistance < 150mm 이면 정지, 150mm 이상이면 즉시 재출발)
+- governor: ObstacleGovernor (TTC 기반 연속 감속, 정지 거리는 최후 수단, 해제 히스테리시스)
+- 경로 위 장애물: 앞서 걷는 사람(80mm/s, 60s), 길을 막은 대차(20s), 다시 느리게 가는 대차(50mm/s, 40s)
+- 라이다 잡음: 장애물 거리에 표준편차 LIDAR_NOISE(mm) 가우시안 잡음 (잡음 없는 거리로 맞춘 이득은 실제 AGV 에서 정지 반복)
+- 지표: 평균 주행 속도 (mm/s, 경로 처리량), 최후 수단 정지 횟수, 장애물 정지 상태 시간, 장애물까지 최소 거리
+
+실행: python benchmarks/bench_obstacle_governor.py [가상 주행 시간(s)] [라이다 잡음 표준편차(mm)]
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+import agv_simulator
+from agv_control_client import AGV_STATE_OBSTACLE_ESTOP
+from sim_scenario import run_scenario
+
+OBSTACLES = [
+    {"s": 1500, "t_on": 10, "t_off": 70, "speed": 80},
+    {"s": 5200, "t_on": 100, "t_off": 120},
+    {"s": 900, "t_on": 150, "t_off": 190, "speed": 50},
+]
+LIDAR_NOISE = 5.0
+
+
+def hard_stop(client):
+    """기존 check_obstacle 과 같은 동작: TTC 감속 없음, 정지 거리 밖이면 바로 해제"""
+    client.obstacle_governor.set_gains(ttc=0, release_margin=0, release_time=0, release_accel=1e9)
+
+
+def run(duration, config, legacy):
+    closest = [agv_simulator.LIDAR_MAX]
+
+    def setup(client):
+        if legacy:
+            hard_stop(client)
+        client.agv_comm.subscribe(lambda seq, frame: closest.__setitem__(0, min(closest[0], frame.LidarDistance)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        r = run_scenario(duration, config, report_every=duration * 2, setup=setup)
+    r['closest_mm'] = closest[0]
+    return r
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 240.0
+    noise = float(sys.argv[2]) if len(sys.argv) > 2 else LIDAR_NOISE
+    config = dict(agv_simulator.DEFAULT_TRACK, obstacles=OBSTACLES, lidar_noise=noise)
+    print(f"기본 트랙 {duration:.0f}s (가상 시간), 장애물 {len(OBSTACLES)} 개 구간, 라이다 잡음 {noise:.0f}mm")
+    for name, legacy in (('hard_stop', True), ('governor', False)):
+        r = run(duration, config, legacy)
+        estop_time = r['state_time_s'].get(str(AGV_STATE_OBSTACLE_ESTOP), 0.0)
+        print(f"  {name:<9s} | 평균 속도 {r['distance_mm'] / r['virtual_s']:6.1f} mm/s | 최후 수단 정지 "
+              f"{r['obstacle_stops']:4d} 회 | 장애물 정지 상태 {estop_time:6.1f} s | 최소 거리 {r['closest_mm']:4d} mm")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+센서 필터(FrameFilter) 효과 비교: 원시 값을 그대로 쓰는 기존 제어와 필터를 거친 값을 쓰는 제어
+- lidar: 20Hz 프레임, 평소 1200mm 근처 + 한 프레임짜리 튐(0~120mm, 반사 실패), 마지막에 실제 장애물이 150mm/s 로 접근
+  지표: 잘못된 정지 횟수 (실제 거리 >= 150mm 인데 정지 판단으로 들어간 횟수), 실제 장애물 정지 지연 (프레임)
+- tfs: bench_tfs_controller 의 작업자 경로를 TfsController 로 따라가며 각도 떨림(±4°)과 거리 튐(5%, ±800mm) 추가
+  지표: 거리 평균/최대, 조향 변화 RMS (명령 떨림)
+- cpu: FrameFilter.update 프레임당 비용 (us, 기본 SENSOR_FILTERS)
+
+실행: python benchmarks/bench_sensor_filter.py [lidar 주행 시간(s)] [작업자 속도 목록 mm/s 예: 150,250]
+"""
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from Donkibot_i import FrameFilter, STSFrame, TfsController, VirtualClock
+from bench_tfs_controller import follow
+
+FRAME_INTERVAL = 0.05
+OBSTACLE_E_STOP_DISTANCE = 150      # agv_line_follow_control / agv_control_client 와 같은 정지 거리
+SPIKE_RATE = 0.03                   # 라이다 튐 프레임 비율
+
+
+def lidar_trace(duration, seed=0):
+    """(실제 거리, 측정 거리) 목록과 장애물 접근 시작 프레임: duration 동안 1200mm 근처,
+    이후 600mm 에서 장애물이 150mm/s 로 접근해 50mm 까지"""
+    rng = random.Random(seed)
+    trace = []
+    for _ in range(int(duration / FRAME_INTERVAL)):
+        true = 1200.0 + rng.uniform(-30, 30)
+        measured = rng.randint(0, 120) if rng.random() < SPIKE_RATE else int(true + rng.uniform(-15, 15))
+        trace.append((true, measured))
+    approach = len(trace)
+    true = 600.0
+    while true > 50.0:
+        trace.append((true, int(true + rng.uniform(-15, 15))))
+        true -= 150.0 * FRAME_INTERVAL
+    return trace, approach
+
+
+def stop_decisions(trace, approach, use_filter):
+    """
+    정지 판단(거리 < OBSTACLE_E_STOP_DISTANCE)을 프레임마다 내려서
+    (주행 구간의 잘못된 정지 횟수, 실제 거리가 정지 거리 아래로 들어간 뒤 정지까지 프레임 수) 반환
+    """
+    sensors = FrameFilter(clock=VirtualClock())
+    false_stops, stopped, first_true, first_stop = 0, False, None, None
+    for i, (true, measured) in enumerate(trace):
+        frame = STSFrame(LidarDistance=measured)
+        if use_filter:
+            frame = sensors.update(frame, i * FRAME_INTERVAL)
+        stop = frame.LidarDistance < OBSTACLE_E_STOP_DISTANCE
+        if i < approach:
+            false_stops += stop and not stopped
+        else:
+            if first_true is None and true < OBSTACLE_E_STOP_DISTANCE:
+                first_true = i
+            if first_stop is None and stop:
+                first_stop = i
+        stopped = stop
+    return false_stops, first_stop - first_true
+
+
+def noisy_tfs(control, seed, use_filter, clock):
+    """TFS 각도/거리에 떨림과 튐을 더해 control 에 전달하는 함수 (use_filter 면 FrameFilter 를 거침)"""
+    rng = random.Random(seed)
+    sensors = FrameFilter(clock=clock)
+
+    def wrapped(angle, distance):
+        angle = max(-80, min(80, angle + rng.randint(-4, 4)))
+        if rng.random() < 0.05:
+            distance = max(0, distance + rng.choice((-800, 800)))
+        if use_filter:
+            frame = sensors.update(STSFrame(TfsAngle=angle, TfsDistance=distance))
+            angle, distance = frame.TfsAngle, frame.TfsDistance
+        return control(angle, distance)
+    return wrapped
+
+
+def filter_cost(seconds=0.5):
+    sensors = FrameFilter(clock=VirtualClock())
+    rng = random.Random(1)
+    frames = [STSFrame(LidarDistance=rng.randint(100, 1500), TfsAngle=rng.randint(-80, 80),
+                       TfsDistance=rng.randint(0, 2800)) for _ in range(1000)]
+    calls, t = 0, 0.0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for frame in frames:
+            sensors.update(frame, t)
+            t += FRAME_INTERVAL
+        calls += len(frames)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 600.0
+    speeds = [int(v) for v in sys.argv[2].split(',')] if len(sys.argv) > 2 else [150, 250]
+
+    print(f"FrameFilter.update: {filter_cost():.1f} us/프레임 (제어 주기 {FRAME_INTERVAL * 1000:.0f}ms)")
+
+    trace, approach = lidar_trace(duration)
+    print(f"lidar {duration:.0f}s 주행, 튐 비율 {SPIKE_RATE * 100:.0f}%, 정지 거리 {OBSTACLE_E_STOP_DISTANCE}mm")
+    for name, use_filter in (('raw', False), ('filtered', True)):
+        false_stops, delay = stop_decisions(trace, approach, use_filter)
+        print(f"  {name:<8s} | 잘못된 정지 {false_stops:4d} 회 | 실제 장애물 정지 지연 {delay} 프레임 "
+              f"({delay * FRAME_INTERVAL * 1000:.0f}ms)")
+
+    print("tfs 작업자 추종, 각도 떨림 ±4°, 거리 튐 5% ±800mm")
+    for speed in speeds:
+        for name, use_filter in (('raw', False), ('filtered', True)):
+            clock = VirtualClock()
+            control = noisy_tfs(TfsController(clock=clock).update, speed, use_filter, clock)
+            r = follow(control, speed, clock)
+            print(f"  작업자 {speed:3d} mm/s {name:<8s} | 거리 평균 {r['distance_mean']:6.0f} 최대 "
+                  f"{r['distance_max']:6.0f} mm | 방위각 RMS {r['angle_rms']:5.1f}° | "
+                  f"조향 변화 RMS {r['steer_change_rms']:6.1f} mm/s")
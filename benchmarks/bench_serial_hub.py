@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+포트 수에 따른 수신/송신 CPU 사용량 비교: Comm(poll), Comm(event), SerialHub (pty 사용, Linux 전용)
+- 포트마다 20 Hz 로 $STS 프레임을 보내고 20 Hz 로 CLR 명령을 보냄 (AGV 쪽은 스레드 하나가 모든 pty 처리)
+- 스레드별 CPU 시계(pthread_getcpuclockid)로 Comm 쪽 스레드(수신/송신/허브)의 CPU 시간만 합산
+
+실행: python benchmarks/bench_serial_hub.py [측정 시간(s)] [포트 수 목록 예: 1,8,32]
+"""
+
+import os
+import select
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from Donkibot_i import READ_MODE_EVENT, READ_MODE_POLL, Comm, SerialHub, STSFrame
+from pty_harness import PtyPort, format_sts
+
+RATE_HZ = 20
+
+
+def thread_cpu(threads):
+    """스레드들의 CPU 시간 합 (s)"""
+    return sum(time.clock_gettime(time.pthread_getcpuclockid(t.ident)) for t in threads)
+
+
+def agv_side(ptys, stop):
+    """모든 pty master 에 RATE_HZ 로 프레임을 보내고 받은 명령은 버리는 AGV 역할 루프"""
+    period = 1.0 / RATE_HZ
+    next_tx = time.monotonic()
+    seq = 0
+    masters = [pty.master_fd for pty in ptys]
+    while not stop.is_set():
+        now = time.monotonic()
+        if now >= next_tx:
+            seq += 1
+            frame = format_sts(STSFrame(SOC=100, Odometer=seq))
+            for pty in ptys:
+                pty.write(frame)
+            next_tx += period
+        readable, _, _ = select.select(masters, [], [], max(0.0, next_tx - time.monotonic()))
+        for fd in readable:
+            os.read(fd, 4096)
+
+
+def measure(kind, n_ports, duration):
+    ptys = [PtyPort() for _ in range(n_ports)]
+    hub = None
+    if kind == 'hub':
+        hub = SerialHub()
+        comms = [hub.open(pty.port, history_capacity=0) for pty in ptys]
+        threads = [hub._thread]
+    else:
+        read_mode = READ_MODE_POLL if kind == 'poll' else READ_MODE_EVENT
+        comms = [Comm(port=pty.port, read_mode=read_mode, history_capacity=0) for pty in ptys]
+        threads = [t for c in comms for t in (c.thread, c._tx._thread)]
+
+    stop = threading.Event()
+    feeder = threading.Thread(target=agv_side, args=(ptys, stop), daemon=True)
+    feeder.start()
+    try:
+        time.sleep(0.5)
+        frames_start = sum(c.frame_seq for c in comms)
+        cpu_start = thread_cpu(threads)
+        end = time.monotonic() + duration
+        step = 0
+        while time.monotonic() < end:
+            step += 1
+            for c in comms:
+                c.CLR(step % 100, step % 100)
+            time.sleep(1.0 / RATE_HZ)
+        cpu = thread_cpu(threads) - cpu_start
+        frames = sum(c.frame_seq for c in comms) - frames_start
+    finally:
+        stop.set()
+        feeder.join(1.0)
+        if hub is not None:
+            hub.close()
+        else:
+            for c in comms:
+                c.destroy()
+        for pty in ptys:
+            pty.close()
+    return cpu / duration * 100.0, frames / duration, len(threads)
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    counts = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 8, 32]
+
+    print(f"포트당 {RATE_HZ} Hz STS 수신 + {RATE_HZ} Hz CLR 송신, {duration:.0f}s 측정")
+    for n_ports in counts:
+        for kind in ('poll', 'event', 'hub'):
+            cpu, fps, n_threads = measure(kind, n_ports, duration)
+            print(f"  ports={n_ports:3d} {kind:<5s} | 스레드 {n_threads:3d} | CPU {cpu:6.2f} % | "
+                  f"{fps:7.1f} frames/s (기대 {n_ports * RATE_HZ})")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RF 태그 구간 속도 프로파일 비교: 태그를 읽는 순간 속도 제한을 바꾸는 기존 방식과 SpeedProfilePlanner
+- 경로: 스테이션 서버의 driving_path / waypoints (ROUTE_MM_PER_PX 배율, WP 마다 RF 태그와 속도 제한)
+- agv_simulator.KinematicAGV (차동 구동, 바퀴 가속 한계) + LineController, 제어 주기 50ms, WP0 에서 정지 상태로 출발
+- legacy: 속도 제한 = 마지막으로 읽은 태그의 RF_tag2 (태그 미인식 시 50), 클라이언트의 기존 동작
+- planner: 서버 waypoints 의 s/speed 로 앞 구간 제한을 보고 가속도/jerk 제한 프로파일 (Odometer 로 위치 추정)
+- 지표: 경로 완주 시간, 최대 감속도 (mm/s^2, 제어 주기 간 평균 바퀴 속도 변화, 조향 떨림에 의한 변화도 포함),
+  구간 제한 초과 주행 거리/최대 초과 속도 (시뮬레이터 태그 위치 기준, 느린 구간에 빠르게 들어간 정도)
+
+실행: python benchmarks/bench_speed_profile.py
+"""
+
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+import agv_simulator
+import agv_station_server as server
+from Donkibot_i import LineController, SpeedProfilePlanner, VirtualClock
+
+CONTROL_INTERVAL = 0.05
+CURVE_POINTS = 20           # 서버 경로의 곡선 구간을 나누는 점 수
+
+
+def station_route():
+    """(시뮬레이터 트랙 설정, 서버 waypoints) - 트랙은 서버 경로를 mm 로 바꾼 열린 폴리라인, 태그는 WP 위치"""
+    scale = server.ROUTE_MM_PER_PX
+    points = []
+    for seg in server.driving_path:
+        steps = CURVE_POINTS if seg['type'] == 'curve' else 1
+        for i in range(steps + 1):
+            x, y, _ = server.get_position_and_heading(seg, i / steps)
+            if not points or math.hypot(x * scale - points[-1][0], y * scale - points[-1][1]) > 1.0:
+                points.append((x * scale, y * scale))
+    track = agv_simulator.Track(points, loop=False)
+    tags = []
+    for wp in server.waypoints:
+        s, _, _ = track.project(wp['x'] * scale, wp['y'] * scale)
+        tags.append({"s": s, "tag1": wp['id'], "tag2": wp['speed']})
+    config = dict(agv_simulator.DEFAULT_TRACK, points=points, loop=False, tags=tags, obstacles=[], estops=[])
+    return config, server.waypoints
+
+
+def drive(config, route, use_planner):
+    clock = VirtualClock()
+    track = agv_simulator.Track.from_config(config)
+    model = agv_simulator.KinematicAGV(track, config)
+    controller = LineController()
+    planner = SpeedProfilePlanner(route, clock=clock, start_s=0.0)
+    zone = SpeedProfilePlanner([{'id': t['tag1'], 's': t['s'], 'speed': t['tag2']} for t in config['tags']])
+    substeps = int(round(CONTROL_INTERVAL / agv_simulator.SIM_SUBSTEP))
+    end = track.length - 100.0
+    last_v, peak_decel, over_mm, over_max = 0.0, 0.0, 0.0, 0.0
+    while model.s < end and clock.now() < 600.0:
+        if use_planner:
+            limit = planner.update(model.odometer(), model.tag1, model.tag2)
+        else:
+            limit = model.tag2 if model.tag1 else 50
+        vl, vr = controller.update(model.line_pos(), limit)
+        for _ in range(substeps):
+            model.step(agv_simulator.SIM_SUBSTEP, vl, vr)
+            v = (model.vl + model.vr) / 2
+            excess = v - zone.zone_limit(model.s)
+            if excess > 1.0:
+                over_mm += v * agv_simulator.SIM_SUBSTEP
+                over_max = max(over_max, excess)
+        v = (model.vl + model.vr) / 2
+        peak_decel = max(peak_decel, (last_v - v) / CONTROL_INTERVAL)
+        last_v = v
+        clock.sleep(CONTROL_INTERVAL)
+    return {'lap_s': clock.now(), 'peak_decel': peak_decel, 'over_mm': over_mm, 'over_max': over_max,
+            'length': track.length}
+
+
+if __name__ == '__main__':
+    config, route = station_route()
+    print(f"스테이션 경로 {len(route)} WP, 제어 주기 {CONTROL_INTERVAL * 1000:.0f}ms, 프로파일 설정 "
+          f"{SpeedProfilePlanner().gains}")
+    for name, use_planner in (('legacy', False), ('planner', True)):
+        r = drive(config, route, use_planner)
+        print(f"  {name:<8s} | 완주 {r['lap_s']:6.1f} s ({r['length'] / 1000:.1f} m) | 최대 감속도 {r['peak_decel']:6.0f} mm/s^2 | "
+              f"제한 초과 주행 {r['over_mm']:6.0f} mm, 최대 초과 {r['over_max']:5.1f} mm/s")
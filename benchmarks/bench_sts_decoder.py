@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+$STS 프레임 파싱 마이크로벤치마크 (하드웨어 불필요)
+- 기존 방식: readline() 한 줄 -> latin-1 decode -> STSFrame.parser()
+  (pyserial 의 readline() 은 read(1) 을 반복하므로 byte 단위 읽기 비용을 함께 측정)
+- 신규 방식: 수신 bytes 조각 -> STSDecoder.feed()
+- 측정 잡음을 줄이기 위해 REPEAT 회 반복하여 가장 빠른 값을 사용
+
+실행: python benchmarks/bench_sts_decoder.py [프레임 수]
+"""
+
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from Donkibot_i import STSDecoder, STSFrame
+
+SAMPLE_LINE = b"$STS,1,95,12,0,532, -15, 420, 120, 34567,123,255\r\n"
+CHUNK_SIZE = 64     # 시리얼 read() 한 번에 들어오는 byte 수 (대략값)
+REPEAT = 5
+
+
+class ByteReader(io.RawIOBase):
+    """readline() 이 byte 단위 read 를 반복하는 시리얼 포트를 흉내내는 메모리 스트림"""
+
+    def __init__(self, data):
+        self._data = data
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._data) - self._pos)
+        b[:n] = self._data[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def make_stream(n_frames):
+    """값이 조금씩 변하는 n_frames 개의 STS 라인 목록 생성"""
+    lines = []
+    for i in range(n_frames):
+        lines.append(
+            f"$STS,1,95,{i % 31 - 15},0,{200 + i % 1000}, {i % 160 - 80}, {i % 2800}, "
+            f"{i % 300}, {i},{i % 11},{100 + i % 3 * 50}\r\n".encode('latin-1'))
+    return lines
+
+
+def bench_legacy(lines):
+    """기존 Comm._read_loop 경로: 라인 단위 decode + STSFrame.parser"""
+    count = 0
+    for line in lines:
+        if STSFrame.parser(line.decode('latin-1', errors='ignore')):
+            count += 1
+    return count
+
+
+def bench_legacy_readline(stream):
+    """readline() 으로 한 줄씩 읽는 비용까지 포함한 기존 경로"""
+    reader = ByteReader(stream)
+    count = 0
+    line = reader.readline()
+    while line:
+        if STSFrame.parser(line.decode('latin-1', errors='ignore')):
+            count += 1
+        line = reader.readline()
+    return count
+
+
+def bench_decoder(chunks):
+    """STSDecoder 경로: 임의 크기 bytes 조각을 그대로 feed"""
+    decoder = STSDecoder()
+    count = 0
+    for chunk in chunks:
+        count += len(decoder.feed(chunk))
+    return count
+
+
+def measure(func, arg, n_frames):
+    wall = cpu = float('inf')
+    for _ in range(REPEAT):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        parsed = func(arg)
+        cpu = min(cpu, time.process_time() - cpu_start)
+        wall = min(wall, time.perf_counter() - wall_start)
+    return {
+        'frames': parsed,
+        'frames_per_sec': parsed / wall if wall > 0 else 0.0,
+        'cpu_us_per_frame': cpu / n_frames * 1e6,
+    }
+
+
+def run(n_frames=200000):
+    lines = make_stream(n_frames)
+    stream = b''.join(lines)
+    chunks = [stream[i:i + CHUNK_SIZE] for i in range(0, len(stream), CHUNK_SIZE)]
+
+    return {
+        'legacy_parser': measure(bench_legacy, lines, n_frames),
+        'legacy_readline': measure(bench_legacy_readline, stream, n_frames),
+        'stream_decoder': measure(bench_decoder, chunks, n_frames),
+    }
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    results = run(n)
+    print(f"프레임 수: {n}")
+    for name, r in results.items():
+        print(f"{name:16s} | {r['frames_per_sec']:>10.0f} frames/s | "
+              f"{r['cpu_us_per_frame']:6.2f} us/frame (CPU) | parsed={r['frames']}")
+    new = results['stream_decoder']['cpu_us_per_frame']
+    for name in ('legacy_parser', 'legacy_readline'):
+        print(f"CPU 시간 비율 (stream_decoder/{name}): {new / results[name]['cpu_us_per_frame']:.2f}")
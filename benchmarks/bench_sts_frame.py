@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STSFrame 표현 방식 비교 (하드웨어 불필요)
+- 기존: @dataclass (인스턴스마다 __dict__)
+- 신규: NamedTuple 기반 STSFrame (__dict__ 없음, 불변)
+- 로그용 바이너리 행 변환(to_bytes / from_bytes) 처리량
+
+실행: python benchmarks/bench_sts_frame.py [프레임 수]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from Donkibot_i import STS_ROW_STRUCT, STSFrame
+
+
+@dataclass
+class LegacySTSFrame:
+    """변경 전 STSFrame 과 동일한 dataclass"""
+    agvStatus: int = 0
+    SOC: int = 0
+    LinePos: int = 0
+    EmgFlag: int = 0
+    LidarDistance: int = 0
+    TfsAngle: int = 0
+    TfsDistance: int = 0
+    Speed: int = 0
+    Odometer: int = 0
+    RF_tag1: int = 0
+    RF_tag2: int = 0
+
+
+def make_rows(n_frames):
+    """디코더가 만들어내는 것과 같은 정수 필드 목록"""
+    return [(1, 95, i % 31 - 15, 0, 200 + i % 1000, i % 160 - 80, i % 2800,
+             i % 300, i, i % 11, 100 + i % 3 * 50) for i in range(n_frames)]
+
+
+def measure_build(build, rows):
+    """rows 전체를 프레임 객체로 만들 때의 시간과 증가한 메모리"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    frames = [build(row) for row in rows]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return frames, {
+        'frames_per_sec': len(rows) / elapsed,
+        'bytes_per_frame': current / len(rows),
+    }
+
+
+def run(n_frames=1000000):
+    rows = make_rows(n_frames)
+    results = {}
+
+    frames, results['dataclass'] = measure_build(lambda r: LegacySTSFrame(*r), rows)
+    del frames
+    frames, results['namedtuple'] = measure_build(STSFrame._make, rows)
+
+    start = time.perf_counter()
+    packed = b''.join([f.to_bytes() for f in frames])
+    pack_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored = [STSFrame._make(v) for v in STS_ROW_STRUCT.iter_unpack(packed)]
+    unpack_elapsed = time.perf_counter() - start
+    assert restored[-1] == frames[-1]
+
+    results['binary_row'] = {
+        'bytes_per_frame': STS_ROW_STRUCT.size,
+        'pack_frames_per_sec': n_frames / pack_elapsed,
+        'unpack_frames_per_sec': n_frames / unpack_elapsed,
+    }
+    return results
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    r = run(n)
+    print(f"프레임 수: {n}")
+    for name in ('dataclass', 'namedtuple'):
+        print(f"{name:10s} | 생성 {r[name]['frames_per_sec']:>10.0f} frames/s | "
+              f"메모리 {r[name]['bytes_per_frame']:6.1f} byte/frame "
+              f"({r[name]['bytes_per_frame'] * n / 1e6:6.1f} MB)")
+    b = r['binary_row']
+    print(f"binary row | {b['bytes_per_frame']} byte/frame | pack {b['pack_frames_per_sec']:.0f} frames/s | "
+          f"unpack {b['unpack_frames_per_sec']:.0f} frames/s")
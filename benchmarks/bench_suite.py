@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+저장소 전체 성능 벤치마크 모음 (하드웨어 불필요), 결과를 JSON 으로 출력해 릴리스 간 회귀 추적
+- sts_parser: STSFrame.parser 한 줄 파싱 처리량 (+ Comm 이 실제로 쓰는 STSDecoder 처리량)
+- comm_pty: pty 로 최대 속도로 보낸 $STS 프레임의 Comm 수신 처리량
+- line_following: AGV_MACHINE_OPERATE.line_following_control 판단 횟수/s (CLR 송신 포함/미포함)
+- station_server: agv_station_server 엔드포인트별 req/s, p50/p99 지연 (Flask test client, 네트워크 제외)
+- path_geometry: get_segment_length / get_position_and_heading 호출 비용 (직선/곡선)
+- jpeg_encode: RealSenseCamera.get_frame 의 인코딩 경로(크기 조정 + 오버레이 + JPEG) fps, 합성 영상 사용
+
+지표 이름 규칙 (--compare 회귀 판단에 사용): *_per_s 는 클수록 좋음, *_us / *_ms 는 작을수록 좋음
+
+실행: python benchmarks/bench_suite.py [--quick] [--only sts_parser,comm_pty] [--output result.json]
+      python benchmarks/bench_suite.py --compare baseline.json [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+sys.path.append(os.path.join(ROOT, '3.agv_cam_web_proj'))     # realsense_cam (Donkibot_i 는 5번 것을 사용)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """벤치마크 함수 등록: func(scale) -> 지표 dict (scale: 1.0 기본, --quick 이면 0.2)"""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def percentile_ms(samples, p):
+    return float(np.percentile(samples, p)) * 1000.0 if len(samples) else None
+
+
+def timed_loop(func, args_list, min_time):
+    """args_list 를 반복 호출해 min_time 이상 측정, (호출 수, 경과 s)"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for args in args_list:
+            func(*args)
+        calls += len(args_list)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls, elapsed
+
+
+def sts_lines(n):
+    """값이 조금씩 변하는 STS 라인 n개 (bench_sts_decoder.make_stream 과 같은 형식)"""
+    return [f"$STS,1,95,{i % 31 - 15},0,{200 + i % 1000}, {i % 160 - 80}, {i % 2800}, "
+            f"{i % 300}, {i},{i % 11},{100 + i % 3 * 50}\r\n" for i in range(n)]
+
+
+@benchmark('sts_parser')
+def bench_sts_parser(scale):
+    from Donkibot_i import STSDecoder, STSFrame
+    lines = sts_lines(1000)
+    calls, elapsed = timed_loop(STSFrame.parser, [(line,) for line in lines], 1.0 * scale)
+
+    data = ''.join(lines).encode('latin-1')
+    chunks = [data[i:i + 256] for i in range(0, len(data), 256)]
+    decoder = STSDecoder()
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 1.0 * scale:
+        for chunk in chunks:
+            frames += len(decoder.feed(chunk))
+    decode_elapsed = time.perf_counter() - start
+    return {
+        'parser_lines_per_s': calls / elapsed,
+        'parser_us': elapsed / calls * 1e6,
+        'decoder_frames_per_s': frames / decode_elapsed,
+    }
+
+
+@benchmark('comm_pty')
+def bench_comm_pty(scale):
+    from Donkibot_i import Comm
+    from pty_harness import PtyPort
+    block = ''.join(sts_lines(200)).encode('latin-1')
+    stop = threading.Event()
+
+    def feeder(pty):
+        while not stop.is_set():
+            pty.write(block)
+
+    with PtyPort() as pty:
+        comm = Comm(port=pty.port)
+        thread = threading.Thread(target=feeder, args=(pty,), daemon=True)
+        thread.start()
+        try:
+            time.sleep(0.2)
+            seq0, bytes0 = comm.frame_seq, comm.stats()['rx_bytes']
+            start = time.perf_counter()
+            time.sleep(2.0 * scale)
+            elapsed = time.perf_counter() - start
+            link = comm.stats()
+            frames, rx_bytes = comm.frame_seq - seq0, link['rx_bytes'] - bytes0
+        finally:
+            stop.set()
+            comm.destroy()
+            thread.join(1.0)
+    return {
+        'frames_per_s': frames / elapsed,
+        'rx_mb_per_s': rx_bytes / elapsed / 1e6,
+        'parse_errors': sum(link['parse_errors'].values()),
+    }
+
+
+@benchmark('line_following')
+def bench_line_following(scale):
+    from agv_control_client import AGV_MACHINE_OPERATE
+    from Donkibot_i import Comm, LineController, ObstacleGovernor, SpeedProfilePlanner
+    from pty_harness import LoopbackSerial
+
+    # 서버 통신/센서 스레드 없이 판단 함수만 실행하도록 필요한 속성만 채움
+    agv = AGV_MACHINE_OPERATE.__new__(AGV_MACHINE_OPERATE)
+    agv.agv_data = {"line_pos": 0, "odometer": 0, "tag1": 1, "tag2": 150}
+    agv.agv_comm = None
+    agv.agv_clr_cmd = ""
+    agv.line_controller = LineController()
+    agv.obstacle_governor = ObstacleGovernor()
+    agv.speed_planner = SpeedProfilePlanner()
+    cases = [(pos, moving, direction) for pos in range(-15, 16)
+             for moving in (True, False) for direction in ('forward', 'backward')]
+
+    def decide(pos, moving, direction):
+        agv.agv_data["line_pos"] = pos
+        agv.line_following_control(moving, direction)
+
+    calls, elapsed = timed_loop(decide, cases, 1.0 * scale)
+    result = {'decisions_per_s': calls / elapsed, 'decision_us': elapsed / calls * 1e6}
+
+    host, _ = LoopbackSerial.pair()
+    agv.agv_comm = Comm('loopback', transport=host, history_capacity=0)
+    try:
+        calls, elapsed = timed_loop(decide, cases, 1.0 * scale)
+    finally:
+        agv.agv_comm.destroy()
+    result['decisions_with_clr_per_s'] = calls / elapsed
+    result['decision_with_clr_us'] = elapsed / calls * 1e6
+    return result
+
+
+@benchmark('station_server')
+def bench_station_server(scale):
+    import agv_station_server as server
+    client = server.app.test_client()
+    post_body = {"SOC": 90, "LIDAR": 1200, "RF_TAG": 3, "SPEED_LIMIT": 150,
+                 "CURRENT_SPEED": 120, "STATE": 2, "Alv_cnt": 0}
+    requests = {
+        'client_data': lambda: client.post('/client_data', json=post_body),
+        'server_data': lambda: client.get('/server_data'),
+        'agv_position': lambda: client.get('/agv_position'),
+        'agv_data': lambda: client.get('/agv_data'),
+        'check_warning': lambda: client.get('/check_warning'),
+    }
+    result = {}
+    for name, request in requests.items():
+        latency = []
+        start = time.perf_counter()
+        while time.perf_counter() - start < 0.5 * scale or len(latency) < 50:
+            t0 = time.perf_counter()
+            response = request()
+            latency.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"/{name}: HTTP {response.status_code}")
+        elapsed = time.perf_counter() - start
+        result[f'{name}_req_per_s'] = len(latency) / elapsed
+        result[f'{name}_p50_ms'] = percentile_ms(latency, 50)
+        result[f'{name}_p99_ms'] = percentile_ms(latency, 99)
+    return result
+
+
+@benchmark('path_geometry')
+def bench_path_geometry(scale):
+    from agv_station_server import driving_path, get_position_and_heading, get_segment_length
+    result = {}
+    for kind in ('line', 'curve'):
+        segments = [seg for seg in driving_path if seg['type'] == kind]
+        calls, elapsed = timed_loop(get_segment_length, [(seg,) for seg in segments], 0.5 * scale)
+        result[f'segment_length_{kind}_us'] = elapsed / calls * 1e6
+        args = [(seg, i / 20.0) for seg in segments for i in range(21)]
+        calls, elapsed = timed_loop(get_position_and_heading, args, 0.5 * scale)
+        result[f'position_heading_{kind}_us'] = elapsed / calls * 1e6
+    return result
+
+
+@benchmark('jpeg_encode')
+def bench_jpeg_encode(scale):
+    import cv2
+    from realsense_cam import RealSenseCamera
+    width, height = 848, 480      # Sever.py 설정
+    camera = RealSenseCamera.without_device(width, height, 30)
+
+    # 합성 영상: 그라디언트 배경 + 사각형 + 약한 노이즈 (실제 장면에 가까운 압축률)
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    frames = []
+    for i in range(8):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = gradient * np.array([0.4, 0.7, 1.0])
+        for _ in range(6):
+            x, y = rng.integers(0, width - 100), rng.integers(0, height - 80)
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(frame, (int(x), int(y)), (int(x) + 100, int(y) + 80), color, -1)
+        frame = cv2.add(frame, rng.integers(0, 12, frame.shape, dtype=np.uint8))
+        frames.append(frame)
+
+    encoded = []
+    calls, elapsed = timed_loop(lambda frame: encoded.append(len(camera.encode_frame(frame, 1.5))),
+                                [(frame,) for frame in frames], 2.0 * scale)
+    return {
+        'frames_per_s': calls / elapsed,
+        'encode_ms': elapsed / calls * 1000.0,
+        'jpeg_kb': sum(encoded) / len(encoded) / 1024.0,
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def run(names, scale) -> dict:
+    results = {}
+    for name in names:
+        print(f"[{name}] 측정 중...", file=sys.stderr)
+        try:
+            metrics = BENCHMARKS[name](scale)
+            results[name] = {key: round(value, 4) if isinstance(value, float) else value
+                             for key, value in metrics.items()}
+        except ImportError as e:
+            # 선택 패키지(cv2, pyrealsense2, flask 등)가 없는 환경: 건너뛴 이유만 기록
+            results[name] = {'skipped': f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+    return {'environment': environment(), 'scale': scale, 'results': results}
+
+
+def compare(current: dict, baseline: dict, threshold: float):
+    """지표 이름 규칙에 따라 baseline 대비 threshold 이상 나빠진 항목 목록"""
+    regressions = []
+    for name, metrics in current['results'].items():
+        base = baseline.get('results', {}).get(name, {})
+        for key, value in metrics.items():
+            old = base.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+                continue
+            if key.endswith('_per_s'):
+                change = (old - value) / old        # 처리량 감소율
+            elif key.endswith(('_us', '_ms')):
+                change = (value - old) / old        # 지연/비용 증가율
+            else:
+                continue
+            if change > threshold:
+                regressions.append((name, key, old, value, change))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AGV 저장소 성능 벤치마크 모음 (JSON 출력)")
+    parser.add_argument('--only', help=f"실행할 벤치마크 (쉼표 구분): {', '.join(BENCHMARKS)}")
+    parser.add_argument('--quick', action='store_true', help="측정 시간을 1/5 로 줄여 빠르게 실행")
+    parser.add_argument('--output', help="결과 JSON 저장 경로 (생략 시 표준 출력)")
+    parser.add_argument('--compare', help="비교할 기준 결과 JSON (회귀가 있으면 종료 코드 1)")
+    parser.add_argument('--threshold', type=float, default=0.15, help="회귀로 판단할 악화 비율")
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"알 수 없는 벤치마크: {', '.join(unknown)}")
+
+    result = run(names, 0.2 if args.quick else 1.0)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        for name, key, old, value, change in regressions:
+            print(f"[회귀] {name}.{key}: {old} -> {value} ({change * 100:+.1f} %)", file=sys.stderr)
+        if not regressions:
+            print(f"회귀 없음 (기준 {args.compare}, 허용 {args.threshold * 100:.0f} %)", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+텔레메트리 버스(TelemetryBroker / BusComm) 비용과 프로세스 간 전달 지연 (Linux 전용, pty + FakeAGV 사용)
+- publish/read: TelemetryBus 에 프레임 1개 기록(브로커), 1개 읽기(소비자, seqlock 검사 포함) 시간 (ns)
+- since: 최근 1000 프레임 view 를 얻는 시간 (복사 없음, ns)
+- fan-out: FakeAGV 100Hz 를 브로커가 읽고 소비자 프로세스 N 개가 BusComm 으로 받을 때
+  브로커 수신 시각 -> 소비자 subscribe 콜백까지의 지연 (중앙값/99%/최대 ms)과
+  소비자 프로세스의 프레임당 CPU 시간 (µs, 통지 recv + 공유 메모리 읽기 + 프레임 전달)
+
+실행: python benchmarks/bench_telemetry_bus.py [소비자 수별 측정 시간(s)]
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+import numpy as np
+
+from Donkibot_i import BusComm, STSFrame, TelemetryBroker, TelemetryBus
+from pty_harness import FakeAGV, PtyPort
+
+FRAME_PERIOD = 0.01
+COST_CALLS = 200000
+BUS_NAME = 'donkibot_bench'
+
+
+def bus_cost(calls: int = COST_CALLS) -> dict:
+    """TelemetryBus publish / read / since 평균 시간 (ns)"""
+    bus = TelemetryBus(BUS_NAME + '_cost', create=True)
+    try:
+        frame = STSFrame(1, 90, -3, 0, 1500, 10, 800, 120, 123456, 7, 150)
+        start = time.perf_counter()
+        for seq in range(1, calls + 1):
+            bus.publish(seq, 1.0, frame)
+        publish = (time.perf_counter() - start) / calls * 1e9
+        start = time.perf_counter()
+        for seq in range(calls - bus.capacity + 1, calls + 1):
+            bus.read(seq)
+        read = (time.perf_counter() - start) / bus.capacity * 1e9
+        start = time.perf_counter()
+        for _ in range(calls // 10):
+            bus.since(calls - 1000)
+        since = (time.perf_counter() - start) / (calls // 10) * 1e9
+        return {'publish': publish, 'read': read, 'since': since}
+    finally:
+        bus.close()
+        bus.unlink()
+
+
+def consumer(port: str, duration: float, ready, results):
+    """소비자 프로세스: BusComm 으로 프레임을 받아 브로커 수신 시각 기준 지연과 CPU 시간 기록"""
+    ages = []
+    agv = BusComm(port, name=BUS_NAME, label=f"bench{os.getpid()}")
+
+    def on_frame(seq, frame):
+        ages.append(time.monotonic() - agv._latest_rx[1])
+
+    agv.subscribe(on_frame)
+    agv.wait_for_frame(0, timeout=1.0)
+    ready.set()
+    ages.clear()
+    cpu = time.process_time()
+    time.sleep(duration)
+    cpu = time.process_time() - cpu
+    frames = len(ages)
+    agv.destroy()
+    results.put((ages, cpu, frames, agv.lapped))
+
+
+def fan_out(n_consumers: int, duration: float) -> dict:
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    with PtyPort() as pty, FakeAGV(pty, period=FRAME_PERIOD):
+        with TelemetryBroker(pty.port, name=BUS_NAME) as broker:
+            runner = threading.Thread(target=broker.run, daemon=True)
+            runner.start()
+            events = [ctx.Event() for _ in range(n_consumers)]
+            procs = [ctx.Process(target=consumer, args=(pty.port, duration, ev, results)) for ev in events]
+            for p in procs:
+                p.start()
+            for ev in events:
+                ev.wait(10.0)
+            collected = [results.get(timeout=duration + 10.0) for _ in procs]
+            for p in procs:
+                p.join()
+            broker.stop()
+            runner.join(1.0)
+            dropped = broker.counters['notify_dropped']
+    ages = np.concatenate([np.asarray(r[0]) for r in collected]) * 1000
+    frames = sum(r[2] for r in collected)
+    return {
+        'median_ms': float(np.median(ages)),
+        'p99_ms': float(np.percentile(ages, 99)),
+        'max_ms': float(ages.max()),
+        'cpu_us_per_frame': sum(r[1] for r in collected) / frames * 1e6,
+        'frames': frames,
+        'lapped': sum(r[3] for r in collected),
+        'notify_dropped': dropped,
+    }
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+
+    cost = min((bus_cost() for _ in range(3)), key=lambda c: c['publish'])
+    print(f"TelemetryBus: publish {cost['publish']:5.0f} ns, read {cost['read']:5.0f} ns, "
+          f"since(1000 프레임 view) {cost['since']:5.0f} ns")
+
+    print(f"FakeAGV {1 / FRAME_PERIOD:.0f}Hz, 소비자 수별 {duration:.0f}s, 브로커 수신 -> 소비자 콜백 지연")
+    for n in (1, 3, 6):
+        r = fan_out(n, duration)
+        print(f"  소비자 {n} | 지연 중앙값 {r['median_ms']:5.2f} ms, 99% {r['p99_ms']:5.2f} ms, 최대 {r['max_ms']:5.2f} ms | "
+              f"프레임당 CPU {r['cpu_us_per_frame']:5.1f} µs | 수신 {r['frames']:5d} 놓침 {r['lapped']} "
+              f"통지 생략 {r['notify_dropped']}")
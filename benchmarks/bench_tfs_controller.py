@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TFS 추종 제어기 비교: agv_tfs_control.py 의 기존 혼합 제어(고정 *4 배율 + 하드 클램프)와 TfsController
+- 작업자가 직선 -> 좌회전 -> S 자 -> 우회전 경로를 일정 속도로 걸어가고, AGV 가 와이어(TFS)로 따라감
+- AGV: 차동 구동 (agv_simulator 의 바퀴 간격/가속 한계), 제어 주기 50ms
+- TFS 센서: AGV 진행 방향 기준 작업자 방위각(°, 왼쪽 양수)과 거리(mm), 정수 양자화 + 작은 잡음
+- 지표: 작업자와 거리 평균/최대 (따라가는지), 방위각 RMS (°), 조향 변화 RMS (주기 간 바퀴 속도 차 변화량, 진동 정도)
+
+실행: python benchmarks/bench_tfs_controller.py [작업자 속도 목록 mm/s 예: 150,200,250]
+"""
+
+import math
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '5.agv_RF-tag_monitor_ctrl_proj'))
+
+from agv_simulator import SIM_SUBSTEP, WHEEL_ACCEL, WHEEL_BASE
+from Donkibot_i import TFS_ANGLE_MAX, TfsController, VirtualClock
+
+CONTROL_INTERVAL = 0.05
+START_GAP = 800.0           # 시작 시 작업자와의 거리 (mm)
+TFS_DISTANCE_MAX = 2800
+
+
+def legacy_control(angle, distance):
+    """agv_tfs_control.tfs_control_mode 의 기존 제어"""
+    if distance < 100:
+        return 0, 0
+    turn = int((angle / 90.0) * 150) * 4
+    return max(-200, min(200, 200 + turn)), max(-200, min(200, 200 - turn))
+
+
+def operator_path(speed):
+    """(시간 s) -> 작업자 위치 함수와 총 시간: 직선 4m, 반경 1m 좌회전 90°, S 자(반경 1.5m 좌우 60°), 반경 1m 우회전 90°"""
+    segments = [('line', 4000.0), ('arc', 1000.0, math.pi / 2), ('arc', 1500.0, math.pi / 3),
+                ('arc', -1500.0, math.pi / 3), ('arc', -1000.0, math.pi / 2), ('line', 3000.0)]
+    points = []
+    x, y, heading = START_GAP, 0.0, 0.0
+    step = speed * SIM_SUBSTEP
+    for seg in segments:
+        if seg[0] == 'line':
+            for _ in range(int(seg[1] / step)):
+                x += step * math.cos(heading)
+                y += step * math.sin(heading)
+                points.append((x, y))
+        else:
+            radius, sweep = seg[1], seg[2]
+            for _ in range(int(abs(radius) * sweep / step)):
+                heading += step / radius
+                x += step * math.cos(heading)
+                y += step * math.sin(heading)
+                points.append((x, y))
+    return points
+
+
+def follow(control, operator_speed, clock, seed=0):
+    rng = random.Random(seed)
+    path = operator_path(operator_speed)
+    substeps = int(round(CONTROL_INTERVAL / SIM_SUBSTEP))
+    x = y = heading = 0.0
+    vl = vr = 0.0
+    cmd = (0, 0)
+    distances, angle_sq, steer_sq, last_steer, samples = [], 0.0, 0.0, 0, 0
+    for i, (ox, oy) in enumerate(path):
+        if i % substeps == 0:
+            dx, dy = ox - x, oy - y
+            distance = min(TFS_DISTANCE_MAX, int(math.hypot(dx, dy) + rng.uniform(-10, 10)))
+            bearing = math.degrees(math.atan2(dy, dx) - heading)
+            bearing = (bearing + 180.0) % 360.0 - 180.0
+            angle = max(-TFS_ANGLE_MAX, min(TFS_ANGLE_MAX, int(round(bearing + rng.uniform(-1, 1)))))
+            cmd = control(angle, distance)
+            steer = cmd[0] - cmd[1]
+            steer_sq += (steer - last_steer) ** 2
+            last_steer = steer
+            distances.append(math.hypot(dx, dy))
+            angle_sq += bearing ** 2
+            samples += 1
+            clock.sleep(CONTROL_INTERVAL)
+        # vl(왼쪽) 이 빠르면 왼쪽으로 회전하는 좌표계 (TfsAngle 양수 = 왼쪽, 기존 모드의 CLR(-vl, -vr) 후진 추종과 같은 관계)
+        dv = WHEEL_ACCEL * SIM_SUBSTEP
+        vl += max(-dv, min(dv, cmd[0] - vl))
+        vr += max(-dv, min(dv, cmd[1] - vr))
+        v = (vl + vr) / 2
+        heading += (vl - vr) / WHEEL_BASE * SIM_SUBSTEP
+        x += v * math.cos(heading) * SIM_SUBSTEP
+        y += v * math.sin(heading) * SIM_SUBSTEP
+    return {
+        'distance_mean': sum(distances) / samples,
+        'distance_max': max(distances),
+        'angle_rms': math.sqrt(angle_sq / samples),
+        'steer_change_rms': math.sqrt(steer_sq / samples),
+    }
+
+
+if __name__ == '__main__':
+    speeds = [int(v) for v in sys.argv[1].split(',')] if len(sys.argv) > 1 else [150, 200, 250]
+    print(f"작업자 경로 추종, 시작 거리 {START_GAP:.0f}mm, 제어 주기 {CONTROL_INTERVAL * 1000:.0f}ms")
+    for speed in speeds:
+        clock = VirtualClock()
+        for name, control in (('legacy', legacy_control), ('tfs_ctrl', TfsController(clock=clock).update)):
+            r = follow(control, speed, clock)
+            print(f"  작업자 {speed:3d} mm/s {name:<8s} | 거리 평균 {r['distance_mean']:6.0f} 최대 {r['distance_max']:6.0f} mm | "
+                  f"방위각 RMS {r['angle_rms']:5.1f}° | 조향 변화 RMS {r['steer_change_rms']:6.1f} mm/s")
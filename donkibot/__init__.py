@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Donkibot AGV 시리얼 통신/제어 공용 패키지 (각 프로젝트의 Donkibot_i.py 가 이 패키지를 다시 내보냄)
+- STSDecoder: bytes 버퍼 기반 증분 디코더 (문자열 변환 없이 파싱, 쓰레기 데이터 재동기화)
+- 수신 스레드는 기본적으로 시리얼 fd 에서 블로킹 대기 (read_mode='event'),
+  기존 in_waiting 폴링 방식은 read_mode='poll' 로 선택 가능
+- 수신 프레임마다 순번(frame_seq)을 부여하고 wait_for_frame() / subscribe() 로 통지
+- FrameHistory: 수신 시각/순번과 함께 모든 프레임을 열(column) 단위 numpy 링 버퍼에 보관
+- AsyncComm: 스레드 없이 asyncio 이벤트 루프에서 동작하는 Comm (POSIX 전용)
+- TxScheduler: 여러 스레드의 명령 송신을 하나의 송신 스레드로 모아 속도 명령 병합,
+  동일 명령 반복 억제, 정지 명령 우선 전송, 송신 대역폭 제한 적용
+- LinkStats: 프레임/byte 수신율, 원인별 파싱 오류, 프레임 간격 히스토그램,
+  명령-응답 지연 등 링크 상태를 Comm.stats() 스냅샷으로 제공
+- 선택적 바이너리 프레임(동기 byte + 종류 + 길이 + 고정 배치 필드 + CRC16):
+  Comm(framing='auto') 는 "$MODE,BIN" 으로 전환을 요청하고, 응답이 없거나
+  최근 바이너리 프레임의 CRC 오류율이 높으면 ASCII 프레임으로 계속/복귀 (수신 디코더는 두 형식 모두 처리)
+- SerialHub: 여러 포트를 스레드 하나의 selector 루프로 송수신, 포트마다 Comm 호환 HubPort 제공
+- SystemClock / VirtualClock: 시간 소스 주입 (Comm(clock=...)), VirtualClock 은 모든 참여 스레드가
+  대기 중일 때 시간을 건너뛰어 시뮬레이션을 실제 시간보다 빠르게 실행
+- PeriodicScheduler: 절대 마감 시각 기반 고정 주기 루프 (overrun 감지, 밀린 주기 처리 정책,
+  주기 지터/실행 시간 히스토그램)
+- ControlLoop / ScreenRenderer: 제어 함수는 별도 스레드에서 고정 주기로 실행하고, curses 화면은 낮은 주기로
+  제어 상태 스냅샷을 읽어 바뀐 칸만 다시 씀 (느린 터미널이 제어 주기를 늘리지 않음)
+- LineController: LinePos 기반 PD + 피드포워드 라인 추종 제어기, LinePos x 속도 제한별 출력을 미리 계산한 표 조회
+- TfsController: TfsAngle/TfsDistance 로 전진 속도와 회전을 함께 계산하는 TFS 추종 제어기
+  (거리 기반 속도, 속도에 따라 매끄럽게 줄어드는 회전 이득, 가속도 제한)
+- FrameFilter: 필드별 센서 필터 단계(급변 거부, 이동 중앙값, EMA)와 변화율 추정, 프레임마다 상수 시간 갱신
+  (filter.attach(comm) 후 filter.get_latest_data() 로 필터된 프레임 사용)
+- ObstacleGovernor: 라이다 거리와 그 변화율로 충돌 예상 시간(TTC)을 계산해 허용 속도를 연속으로 줄이는 속도 조절기
+  (고정 거리 정지는 최후 수단으로만 남기고, 해제는 거리 여유 + 유지 시간 히스테리시스)
+- SpeedProfilePlanner: 경로의 RF 태그별 속도 제한을 미리 알고 Odometer 거리 기준으로 가속도/jerk 제한 속도 프로파일 생성
+  (느린 구간 태그에 도달하기 전에 감속 완료)
+- LatencyTracer: 수신 프레임의 (순번, 수신 시각)을 제어기를 거쳐 $CLR 까지 전달해, 제어기(스레드)별로
+  CLR 호출 시점과 실제 송신 시점의 프레임 나이 히스토그램 집계 (Comm.stats()['latency'], tracer.dump(path))
+- TelemetryBroker / BusComm: 브로커 프로세스 하나가 시리얼 포트를 열고 STS 프레임을 공유 메모리 seqlock 링
+  (TelemetryBus)에 기록, 여러 프로세스의 BusComm(Comm 호환)이 통지 datagram 만 받고 링에서 바로 읽음,
+  속도 명령은 브로커가 우선순위/제어권(lease)으로 중재 (connect_agv(): 브로커가 있으면 BusComm, 없으면 Comm)
+- SerialCapture: 송수신 byte 조각을 monotonic 시각과 함께 바이너리 파일로 기록 (Comm(capture=...)),
+  read_capture() 로 다시 읽어 재생 (pty_harness.CaptureReplayer)
+"""
+
+from .frames import (
+    SPEED_LIMIT, ODOMETER_COUNTS_PER_REV, WHEEL_DIAMETER_MM, ODOMETER_MM_PER_COUNT, STS_HEADER,
+    STS_TERMINATOR, STS_MAX_FRAME_LEN, STS_ROW_STRUCT, BIN_SYNC, BIN_TYPE_STS,
+    BIN_TYPE_CLR, BIN_STS_STRUCT, BIN_CLR_STRUCT, BIN_CRC_STRUCT, BIN_HEADER_LEN, BIN_PAYLOAD_LEN,
+    FRAMING_ASCII, FRAMING_AUTO, MODE_BIN_COMMAND, MODE_ASCII_COMMAND, STSFrame, format_clr,
+    pack_binary_frame, unpack_binary_frame, encode_sts_binary, encode_clr_binary, decode_clr,
+    STS_FIELD_COUNT, STS_FIELD_NAMES, STSDecoder)
+from .history import HISTORY_CAPACITY, HISTORY_CAPACITY_MAX, FrameHistory
+from .clock import SystemClock, VirtualClock, SYSTEM_CLOCK
+from .tx import TX_KEEPALIVE, TX_BUDGET_RATIO, TX_BURST_BYTES, TX_QUEUE_SIZE, TxScheduler
+from .stats import (
+    GAP_BINS_MS, RESPONSE_BINS_MS, LATENCY_BINS_MS, RESPONSE_TIMEOUT, RESPONSE_SPEED_DELTA, Histogram,
+    LinkStats, LatencyChannel, LatencyTracer)
+from .loop import (
+    PERIOD_JITTER_BINS_MS, PERIOD_EXEC_BINS_MS, CATCHUP_SKIP, CATCHUP_BURST, PERIODIC_MAX_BURST,
+    PeriodicScheduler, ControlLoop, display_width, ScreenRenderer)
+from .control import (
+    LINE_POS_MAX, LINE_GAINS, LINE_SPEED_STEP, TFS_ANGLE_MAX, TFS_GAINS, TFS_MAX_DT, OBSTACLE_GAINS,
+    SPEED_PROFILE_GAINS, PROFILE_MAX_DT, LineController, TfsController, ObstacleGovernor,
+    SpeedProfilePlanner)
+from .filters import (
+    SENSOR_FILTERS, FILTER_OUTLIER_HOLD, FILTER_RATE_ALPHA, EmaFilter, MedianFilter, OutlierFilter,
+    FILTER_STAGES, FrameFilter)
+from .capture import (
+    CAPTURE_MAGIC, CAPTURE_HEADER_STRUCT, CAPTURE_RECORD_STRUCT, CAPTURE_RX, CAPTURE_TX,
+    CAPTURE_FLUSH_INTERVAL, SerialCapture, read_capture_header, read_capture)
+from .comm import READ_MODE_EVENT, READ_MODE_POLL, BIN_NEGOTIATE_TIMEOUT, BIN_ERROR_WINDOW, BIN_MAX_CRC_RATE, Comm
+from .hub import HubPort, SerialHub
+from .bus import (
+    BUS_CAPACITY, BUS_MAGIC, BUS_HEADER_STRUCT, BUS_HEAD_OFFSET, BUS_COUNTER_OFFSET, BUS_COUNTER_STRUCT,
+    BUS_HEADER_SIZE, BUS_U64, BUS_PAYLOAD_STRUCT, BUS_SLOT_STRUCT, BUS_READ_RETRIES, BUS_MSG_STRUCT,
+    BUS_MSG_HELLO, BUS_MSG_BYE, BUS_MSG_SPEED, BUS_MSG_COMMAND, BUS_NOTIFY, BUS_MAX_MESSAGE, BUS_TICK,
+    BUS_LEASE, BUS_HELLO_INTERVAL, BUS_STALE, BUS_PRIORITY_MONITOR, BUS_PRIORITY_CONTROL, bus_name,
+    bus_socket_path, TelemetryBus, TelemetryBroker, BusLink, BusCommandQueue, BusComm, connect_agv)
+from .async_comm import AsyncComm
+
+__all__ = [
+    'SPEED_LIMIT', 'ODOMETER_COUNTS_PER_REV', 'WHEEL_DIAMETER_MM', 'ODOMETER_MM_PER_COUNT',
+    'STS_HEADER', 'STS_TERMINATOR', 'STS_MAX_FRAME_LEN', 'STS_ROW_STRUCT', 'BIN_SYNC',
+    'BIN_TYPE_STS', 'BIN_TYPE_CLR', 'BIN_STS_STRUCT', 'BIN_CLR_STRUCT', 'BIN_CRC_STRUCT',
+    'BIN_HEADER_LEN', 'BIN_PAYLOAD_LEN', 'FRAMING_ASCII', 'FRAMING_AUTO', 'MODE_BIN_COMMAND',
+    'MODE_ASCII_COMMAND', 'STSFrame', 'format_clr', 'pack_binary_frame', 'unpack_binary_frame',
+    'encode_sts_binary', 'encode_clr_binary', 'decode_clr', 'STS_FIELD_COUNT', 'STS_FIELD_NAMES',
+    'STSDecoder', 'HISTORY_CAPACITY', 'HISTORY_CAPACITY_MAX', 'FrameHistory', 'SystemClock', 'VirtualClock',
+    'SYSTEM_CLOCK', 'TX_KEEPALIVE', 'TX_BUDGET_RATIO', 'TX_BURST_BYTES', 'TX_QUEUE_SIZE', 'TxScheduler',
+    'GAP_BINS_MS', 'RESPONSE_BINS_MS', 'LATENCY_BINS_MS', 'RESPONSE_TIMEOUT', 'RESPONSE_SPEED_DELTA', 'Histogram',
+    'LinkStats', 'LatencyChannel', 'LatencyTracer', 'PERIOD_JITTER_BINS_MS', 'PERIOD_EXEC_BINS_MS',
+    'CATCHUP_SKIP', 'CATCHUP_BURST', 'PERIODIC_MAX_BURST', 'PeriodicScheduler', 'ControlLoop',
+    'display_width', 'ScreenRenderer', 'LINE_POS_MAX', 'LINE_GAINS', 'LINE_SPEED_STEP', 'TFS_ANGLE_MAX',
+    'TFS_GAINS', 'TFS_MAX_DT', 'OBSTACLE_GAINS', 'SPEED_PROFILE_GAINS', 'PROFILE_MAX_DT',
+    'LineController', 'TfsController', 'ObstacleGovernor', 'SpeedProfilePlanner', 'SENSOR_FILTERS',
+    'FILTER_OUTLIER_HOLD', 'FILTER_RATE_ALPHA', 'EmaFilter', 'MedianFilter', 'OutlierFilter',
+    'FILTER_STAGES', 'FrameFilter', 'CAPTURE_MAGIC', 'CAPTURE_HEADER_STRUCT', 'CAPTURE_RECORD_STRUCT',
+    'CAPTURE_RX', 'CAPTURE_TX', 'CAPTURE_FLUSH_INTERVAL', 'SerialCapture', 'read_capture_header',
+    'read_capture', 'READ_MODE_EVENT', 'READ_MODE_POLL', 'BIN_NEGOTIATE_TIMEOUT', 'BIN_ERROR_WINDOW', 'BIN_MAX_CRC_RATE',
+    'Comm', 'HubPort', 'SerialHub', 'BUS_CAPACITY', 'BUS_MAGIC', 'BUS_HEADER_STRUCT', 'BUS_HEAD_OFFSET',
+    'BUS_COUNTER_OFFSET', 'BUS_COUNTER_STRUCT', 'BUS_HEADER_SIZE', 'BUS_U64', 'BUS_PAYLOAD_STRUCT',
+    'BUS_SLOT_STRUCT', 'BUS_READ_RETRIES', 'BUS_MSG_STRUCT', 'BUS_MSG_HELLO', 'BUS_MSG_BYE',
+    'BUS_MSG_SPEED', 'BUS_MSG_COMMAND', 'BUS_NOTIFY', 'BUS_MAX_MESSAGE', 'BUS_TICK', 'BUS_LEASE',
+    'BUS_HELLO_INTERVAL', 'BUS_STALE', 'BUS_PRIORITY_MONITOR', 'BUS_PRIORITY_CONTROL', 'bus_name',
+    'bus_socket_path', 'TelemetryBus', 'TelemetryBroker', 'BusLink', 'BusCommandQueue', 'BusComm',
+    'connect_agv', 'AsyncComm'
+]
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""asyncio 기반 시리얼 통신 (AsyncComm, POSIX 전용)"""
+
+import asyncio
+import os
+import serial
+from typing import List, Optional, Tuple
+
+from .capture import CAPTURE_RX, CAPTURE_TX, SerialCapture
+from .clock import SYSTEM_CLOCK
+from .frames import STSDecoder, STSFrame, format_clr
+from .stats import LatencyTracer
+from .tx import TX_BUDGET_RATIO, TX_KEEPALIVE, TxScheduler
+
+
+class AsyncComm:
+    """
+    asyncio 기반 시리얼 통신 클래스 (Comm 과 같은 디코더/프레임 사용)
+    - 수신 스레드 없이 이벤트 루프의 add_reader() 로 시리얼 fd 를 감시 (POSIX 전용)
+    - 하나의 이벤트 루프에서 시리얼 입출력, HTTP/WebSocket, 제어 주기를 함께 처리할 수 있음
+    - async for frame in agv: ... 로 STS 프레임 스트림을 받고 await agv.clr(vl, vr) 로 명령 전송
+    - 송신은 Comm 과 같은 TxScheduler(정지 우선, 속도 명령 병합, 대역폭 제한)를 이벤트 루프에서 구동,
+      감지-구동 지연 추적(tracer)과 캡처도 Comm 과 같게 기록
+
+    사용 예)
+        async with AsyncComm('/dev/ttyUSB0') as agv:
+            async for frame in agv:
+                await agv.clr(100, 100)
+    """
+
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, queue_size=64,
+                 tx_keepalive=TX_KEEPALIVE, capture=None, trace=True):
+        """
+        capture: 송수신 데이터를 기록할 캡처 파일 경로 (start_capture() 로 나중에 시작해도 됨)
+        trace: 감지-구동 지연 추적 (LatencyTracer, self.tracer), False 면 추적 없음
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.queue_size = queue_size    # 구독자별 대기 프레임 수 (넘치면 오래된 프레임부터 버림)
+        self.tx_keepalive = tx_keepalive
+
+        self.latest_data: STSFrame = STSFrame()
+        self.frame_seq = 0
+        self.tracer = LatencyTracer() if trace else None
+        self._decoder = STSDecoder()
+        self._ser = None
+        self._fd = None
+        self._loop = None
+        self._queues: List[asyncio.Queue] = []
+        self._frame_event = None
+        self._latest_rx = (0, 0.0)      # (가장 최근 프레임 순번, 수신 시각)
+        self._trace_src = None          # 마지막으로 읽은 프레임 (CLR 근거 프레임)
+        self._trace_label = 'async'     # trace_label() 을 지정하지 않았을 때의 제어기 이름
+        self._tx: Optional[TxScheduler] = None
+        self._tx_handle = None          # 예약된 송신 스케줄러 poll() 호출
+        self._out = bytearray()         # 출력 버퍼가 가득 차 아직 쓰지 못한 byte
+        self._capture: Optional[SerialCapture] = None
+        self._capture_path = capture
+
+    async def open(self) -> 'AsyncComm':
+        """시리얼 포트를 열고 이벤트 루프에 수신 콜백과 송신 스케줄러 등록"""
+        self._loop = asyncio.get_running_loop()
+        self._frame_event = asyncio.Event()
+        try:
+            self._ser = serial.Serial(self.port, self.baudrate, timeout=0)
+            self._ser.reset_input_buffer()
+        except serial.SerialException as e:
+            print(f'시리얼 포트 {self.port} 연결 실패: {e}')
+            raise
+        self._fd = self._ser.fileno()
+        os.set_blocking(self._fd, False)
+        if self._capture_path is not None:
+            self.start_capture(self._capture_path)
+        # 송신 스레드 없이 명령이 등록될 때마다 이벤트 루프에서 poll() (1 byte = 10 bit)
+        self._tx = TxScheduler(self._write, bytes_per_sec=self.baudrate / 10 * TX_BUDGET_RATIO,
+                               keepalive=self.tx_keepalive, threaded=False,
+                               on_submit=self._wake_tx, on_sent=self._on_clr_sent)
+        self._loop.add_reader(self._fd, self._on_readable)
+        return self
+
+    async def close(self, timeout: float = 0.2):
+        """남은 명령을 (timeout 안에서) 보낸 뒤 수신 콜백 해제, 포트 닫기, 프레임 스트림 종료"""
+        if self._fd is not None:
+            deadline = self._loop.time() + timeout
+            while (self._tx.depth() or self._out) and self._loop.time() < deadline:
+                await asyncio.sleep(0.005)
+            self._stop_io()
+        self.stop_capture()
+        if self._ser is not None and self._ser.is_open:
+            self._ser.close()
+        self._end_streams()
+
+    def _stop_io(self):
+        """송신 스케줄러 정지, fd 의 수신/송신 콜백 해제"""
+        if self._tx_handle is not None:
+            self._tx_handle.cancel()
+            self._tx_handle = None
+        self._tx.close(0)
+        self._loop.remove_reader(self._fd)
+        if self._out:
+            self._loop.remove_writer(self._fd)
+            self._out.clear()
+        self._fd = None
+
+    def _end_streams(self):
+        """async for 프레임 스트림을 끝내고 wait_for_frame() 대기자를 깨움"""
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)      # async for 종료 신호
+        if self._frame_event is not None:
+            self._frame_event.set()
+
+    def _detach(self, reason: str):
+        """
+        수신 에러/연결 끊김: 읽기 가능 상태로 남은 fd 가 이벤트 루프를 바쁘게 만들지 않도록 콜백을 해제하고
+        프레임 스트림 종료 (포트는 close() 에서 닫음)
+        """
+        print(f"시리얼 포트 {self.port} {reason}")
+        self._stop_io()
+        self._end_streams()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _on_readable(self):
+        """fd 에 읽을 데이터가 생기면 이벤트 루프가 호출"""
+        try:
+            chunk = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._detach(f"수신 에러: {e}")
+            return
+        if not chunk:
+            # pty 끊김/USB 어댑터 분리는 예외 없이 0 byte 읽기로 나타남
+            self._detach("연결이 끊겼습니다.")
+            return
+        t_rx = SYSTEM_CLOCK.now()
+        capture = self._capture
+        if capture is not None:
+            capture.record(CAPTURE_RX, t_rx, chunk)
+        for frame in self._decoder.feed(chunk):
+            self._publish_frame(frame, t_rx)
+
+    def _publish_frame(self, frame: STSFrame, t_rx: float):
+        self.frame_seq += 1
+        self.latest_data = frame
+        self._latest_rx = (self.frame_seq, t_rx)
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((self._latest_rx, frame))
+        # 현재 대기자를 모두 깨운 뒤 같은 이벤트를 다음 프레임에 다시 사용
+        self._frame_event.set()
+        self._frame_event.clear()
+
+    async def frames(self):
+        """수신되는 STSFrame 을 차례로 내주는 async 제너레이터 (close() 또는 연결 끊김 시 종료)"""
+        queue = asyncio.Queue(self.queue_size)
+        self._queues.append(queue)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                rx, frame = item
+                if self.tracer is not None:
+                    self._trace_src = rx
+                yield frame
+        finally:
+            self._queues.remove(queue)
+
+    def __aiter__(self):
+        return self.frames()
+
+    async def wait_for_frame(self, after_seq: int, timeout: Optional[float] = None) -> Tuple[int, STSFrame]:
+        """Comm.wait_for_frame() 과 같은 의미의 비동기 버전"""
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while self.frame_seq <= after_seq and self._fd is not None:
+            remaining = None if deadline is None else deadline - self._loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._frame_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        if self.tracer is not None:
+            self._trace_src = self._latest_rx
+        return self.frame_seq, self.latest_data
+
+    def get_latest_data(self) -> STSFrame:
+        """가장 최근에 파싱된 데이터 반환 (추적 중이면 CLR 근거 프레임으로 기록)"""
+        if self.tracer is not None:
+            self._trace_src = self._latest_rx
+        return self.latest_data
+
+    def start_capture(self, path: str) -> SerialCapture:
+        """송수신 데이터 캡처 시작 (이미 캡처 중이면 이전 파일을 닫고 새 파일로 교체)"""
+        previous, self._capture = self._capture, SerialCapture(path)
+        if previous is not None:
+            previous.close()
+        return self._capture
+
+    def stop_capture(self):
+        """캡처 종료 (캡처 중이 아니면 아무것도 하지 않음)"""
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            capture.close()
+
+    def _wake_tx(self):
+        """송신 스케줄러에 명령이 등록되면 호출: 대역폭 대기 중이어도 다음 루프 차례에 바로 poll()"""
+        if self._tx_handle is not None:
+            self._tx_handle.cancel()
+        self._tx_handle = self._loop.call_soon(self._poll_tx)
+
+    def _poll_tx(self):
+        """보낼 수 있는 명령을 모두 송신하고, 대역폭 제한으로 남은 명령은 가능한 시각에 다시 poll()"""
+        self._tx_handle = None
+        if self._fd is None:
+            return
+        wait = self._tx.poll()
+        if wait is not None:
+            self._tx_handle = self._loop.call_later(wait, self._poll_tx)
+
+    def _write(self, data: bytes):
+        """송신 스케줄러가 호출하는 실제 쓰기 (출력 버퍼가 가득 차면 남은 byte 는 쓰기 가능할 때 이어서 전송)"""
+        if self._fd is None:
+            print("경고: 시리얼 포트가 쓰기 가능 상태가 아닙니다.")
+            return
+        if self._out:
+            self._out += data       # 앞선 명령이 아직 대기 중이면 순서를 지켜 뒤에 붙임
+        else:
+            try:
+                written = os.write(self._fd, data)
+            except BlockingIOError:
+                written = 0
+            if written < len(data):
+                self._out += data[written:]
+                self._loop.add_writer(self._fd, self._on_writable)
+        capture = self._capture
+        if capture is not None:
+            capture.record(CAPTURE_TX, SYSTEM_CLOCK.now(), data)
+
+    def _on_writable(self):
+        try:
+            written = os.write(self._fd, self._out)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"송신 에러: {e}")
+            written = len(self._out)
+        del self._out[:written]
+        if not self._out:
+            self._loop.remove_writer(self._fd)
+
+    async def send_command(self, command: str):
+        """명령어 문자열을 송신 대기열에 넣음 (송신 스케줄러가 이벤트 루프에서 순서대로 전송)"""
+        if self._tx is None or self._fd is None:
+            print("경고: 시리얼 포트가 쓰기 가능 상태가 아닙니다.")
+            return
+        self._tx.submit((command + '\r\n').encode('latin-1'))
+
+    async def clr(self, vl: int, vr: int):
+        """
+        좌측 바퀴 속도(vl), 우측 바퀴 속도(vr) 명령 전송
+        - SPEED_LIMIT 적용, 대기 중인 이전 속도 명령은 새 명령으로 교체되고 정지 명령은 먼저 전송
+        - 추적 중이면 마지막으로 읽은 프레임의 나이를 기록하고 송신 시점 기록용 trace 를 붙임
+        """
+        if self._tx is None or self._fd is None:
+            print("경고: 시리얼 포트가 쓰기 가능 상태가 아닙니다.")
+            return
+        trace = None
+        tracer = self.tracer
+        if tracer is not None:
+            src = self._trace_src
+            if src is None:
+                tracer.untraced += 1
+            else:
+                tracer.record_decide(self._trace_label, src[0], SYSTEM_CLOCK.now() - src[1])
+                trace = (self._trace_label, src[1])
+        data = (format_clr(vl, vr) + '\r\n').encode('latin-1')
+        self._tx.submit_speed(data, (vl == 0 and vr == 0), trace)
+
+    def trace_label(self, label: Optional[str] = None) -> str:
+        """이 AsyncComm 에서 낸 CLR 을 집계할 제어기 이름 지정 (생략 시 현재 이름) 후 반환"""
+        if label:
+            self._trace_label = label
+        return self._trace_label
+
+    def _on_clr_sent(self, trace: Tuple[str, float]):
+        """송신 스케줄러가 추적 중인 CLR 을 실제로 쓴 직후 호출"""
+        label, t_rx = trace
+        self.tracer.record_write(label, SYSTEM_CLOCK.now() - t_rx)
+
+    def tx_counters(self) -> dict:
+        """송신 스케줄러 카운터 (sent, coalesced, suppressed, dropped, bytes, queue_depth)"""
+        if self._tx is None:
+            return {}
+        counters = dict(self._tx.counters)
+        counters['queue_depth'] = self._tx.depth()
+        return counters
@@ -0,0 +1,598 @@
+# -*- coding: utf-8 -*-
+"""여러 프로세스가 시리얼 포트 하나를 함께 쓰는 텔레메트리 버스 (TelemetryBroker / BusComm, POSIX 전용)"""
+
+import itertools
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import struct
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Optional, Tuple
+
+from .clock import SYSTEM_CLOCK
+from .comm import Comm
+from .frames import FRAMING_ASCII, STSDecoder, STSFrame, STS_FIELD_NAMES, decode_clr
+
+BUS_CAPACITY = 4096             # 텔레메트리 버스 링 슬롯 수 (115200 baud 최대 프레임율 기준 약 18초)
+BUS_MAGIC = b'DKBBUS02'
+BUS_HEADER_STRUCT = struct.Struct('<8sIIiiI4x')  # magic, 슬롯 수, 슬롯 크기, 브로커 pid, 제어권 (pid, 연결 번호)
+BUS_HEAD_OFFSET = 32                            # 마지막 순번 (u64)
+BUS_COUNTER_OFFSET = 40
+BUS_COUNTER_STRUCT = struct.Struct('<dQQ7Q')    # heartbeat, rx byte, tx byte, 원인별 파싱 오류
+BUS_HEADER_SIZE = 128
+BUS_U64 = struct.Struct('<Q')
+BUS_PAYLOAD_STRUCT = struct.Struct('<Qd11i')    # 순번, 수신 시각, STS 필드
+BUS_SLOT_STRUCT = struct.Struct('<QQd11i')      # seqlock 버전 + payload
+BUS_READ_RETRIES = 8
+BUS_MSG_STRUCT = struct.Struct('<ciIB')         # 소비자 -> 브로커 메시지 머리: 종류, pid, 연결 번호, 우선순위
+BUS_MSG_HELLO = b'H'                            # 통지 등록 (내용: 프로그램 이름)
+BUS_MSG_BYE = b'B'
+BUS_MSG_SPEED = b'S'                            # 내용: $CLR 명령
+BUS_MSG_COMMAND = b'C'                          # 내용: 일반 명령
+BUS_NOTIFY = b'F'                               # 브로커 -> 소비자 새 프레임 통지
+BUS_MAX_MESSAGE = 256
+BUS_TICK = 0.05                 # 브로커 heartbeat/제어권 확인 주기 (s)
+BUS_LEASE = 0.3                 # 이 시간 동안 CLR 이 없으면 제어권 해제 후 정지 (s)
+BUS_HELLO_INTERVAL = 1.0        # 소비자가 통지 등록을 반복하는 주기 (브로커 재시작 대비, s)
+BUS_STALE = 1.0                 # heartbeat 가 이보다 오래되면 브로커가 멈춘 것으로 판단 (s)
+BUS_PRIORITY_MONITOR = 0        # 상태 표시/로거 (속도 명령은 제어권이 비어 있을 때만 전송됨)
+BUS_PRIORITY_CONTROL = 10       # 제어 프로그램
+
+
+def _open_shared_memory(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    resource_tracker 에 등록하지 않는 SharedMemory (Python 3.13 이상은 track=False, 이하는 등록 직후 해제)
+    - 소비자가 종료할 때 브로커의 세그먼트를 지우지 않고, 프로세스들이 같은 tracker 를 공유해도 등록이 꼬이지 않음
+    - 세그먼트는 브로커가 close() 에서 지우고, 비정상 종료로 남은 세그먼트는 다음 브로커가 시작할 때 정리
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _unlink_shared_memory(shm: shared_memory.SharedMemory):
+    """세그먼트 삭제 (이미 지워졌으면 무시)"""
+    untracked = not hasattr(shm, '_track')      # 3.12 이하의 unlink() 는 등록 해제까지 하므로 먼저 등록
+    if untracked:
+        resource_tracker.register(shm._name, 'shared_memory')
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        if untracked:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def bus_name(port) -> str:
+    """시리얼 포트 경로에서 텔레메트리 버스 이름 ('/dev/ttyUSB0' -> 'donkibot_ttyUSB0')"""
+    return 'donkibot_' + os.path.basename(str(port)).replace(os.sep, '_')
+
+
+def bus_socket_path(name: str, pid: Optional[int] = None, index: int = 0) -> str:
+    """브로커(pid=None) 또는 소비자 프로세스의 명령/통지용 UNIX datagram 소켓 경로"""
+    suffix = '' if pid is None else f'.{pid}.{index}'
+    return os.path.join(tempfile.gettempdir(), f'{name}{suffix}.sock')
+
+
+class TelemetryBus:
+    """
+    STS 프레임 공유 메모리 링 (multiprocessing.shared_memory, 브로커 하나가 쓰고 여러 프로세스가 읽음)
+    - 헤더: magic, 슬롯 수, 브로커/제어권 pid, 마지막 순번(head), heartbeat, 링크 카운터 (BUS_HEADER_SIZE byte)
+    - 슬롯: seqlock 버전 + 순번 + 수신 시각 + STS 11개 필드 (BUS_SLOT_STRUCT 와 DTYPE 은 같은 배치)
+      쓰기: 버전 홀수 -> 내용 -> 버전 짝수, 읽기: 짝수 버전이 읽기 전후로 같고 순번이 맞을 때만 사용
+    - FrameHistory 처럼 슬롯을 [i], [i + capacity] 두 곳에 기록 -> history()/since() 는 복사 없는 연속 view
+    - 수신 시각은 time.monotonic() (Linux 에서는 프로세스 사이에 같은 시계라 소비자에서 프레임 나이 계산 가능)
+    """
+
+    DTYPE = np.dtype([('ver', '<u8'), ('seq', '<u8'), ('t_rx', '<f8')] +
+                     [(name, '<i4') for name in STS_FIELD_NAMES])
+    ERROR_KEYS = tuple(STSDecoder().errors)     # 헤더에 기록하는 원인별 파싱 오류 순서
+
+    def __init__(self, name: str, capacity: int = BUS_CAPACITY, create: bool = False):
+        if create:
+            if capacity <= 0:
+                raise ValueError("capacity 는 1 이상이어야 합니다.")
+            size = BUS_HEADER_SIZE + 2 * capacity * BUS_SLOT_STRUCT.size
+            self._shm = _open_shared_memory(name, create=True, size=size)
+            BUS_HEADER_STRUCT.pack_into(self._shm.buf, 0, BUS_MAGIC, capacity, BUS_SLOT_STRUCT.size,
+                                        os.getpid(), 0, 0)
+        else:
+            self._shm = _open_shared_memory(name)
+            magic, capacity, slot_size, _, _, _ = BUS_HEADER_STRUCT.unpack_from(self._shm.buf, 0)
+            if magic != BUS_MAGIC or slot_size != BUS_SLOT_STRUCT.size:
+                self._shm.close()
+                raise ValueError(f"텔레메트리 버스 형식이 다릅니다: {name}")
+        self.name = name
+        self.capacity = capacity
+        self._buf = self._shm.buf
+        self._ring = np.ndarray(2 * capacity, dtype=self.DTYPE, buffer=self._shm.buf,
+                                offset=BUS_HEADER_SIZE)
+        self._limits = (np.iinfo(np.int32).min, np.iinfo(np.int32).max)
+
+    def close(self):
+        """매핑 해제 (history() 로 받은 view 를 먼저 버려야 함)"""
+        self._ring = None
+        self._buf = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass    # 아직 살아 있는 view 가 있으면 프로세스 종료 시 해제됨
+
+    def unlink(self):
+        """세그먼트 삭제 (브로커 종료 시)"""
+        _unlink_shared_memory(self._shm)
+
+    def _slot_offset(self, index: int) -> int:
+        return BUS_HEADER_SIZE + index * BUS_SLOT_STRUCT.size
+
+    def publish(self, seq: int, t_rx: float, frame: STSFrame):
+        """(브로커) 순번 seq 프레임을 기록하고 head 갱신, seq 는 1부터 1씩 증가"""
+        buf = self._buf
+        index = (seq - 1) % self.capacity
+        payload = (seq, t_rx) + frame
+        for offset in (self._slot_offset(index), self._slot_offset(index + self.capacity)):
+            version = BUS_U64.unpack_from(buf, offset)[0] | 1
+            BUS_U64.pack_into(buf, offset, version)
+            try:
+                BUS_PAYLOAD_STRUCT.pack_into(buf, offset + BUS_U64.size, *payload)
+            except struct.error:
+                lo, hi = self._limits
+                payload = (seq, t_rx) + tuple(min(hi, max(lo, v)) for v in frame)
+                BUS_PAYLOAD_STRUCT.pack_into(buf, offset + BUS_U64.size, *payload)
+            BUS_U64.pack_into(buf, offset, version + 1)
+        BUS_U64.pack_into(buf, BUS_HEAD_OFFSET, seq)
+
+    def head(self) -> int:
+        """마지막으로 기록된 프레임 순번 (0: 아직 없음)"""
+        return BUS_U64.unpack_from(self._buf, BUS_HEAD_OFFSET)[0]
+
+    def read(self, seq: int) -> Optional[Tuple[float, STSFrame]]:
+        """순번 seq 프레임의 (수신 시각, 프레임), 이미 덮어써졌거나 읽는 중 계속 바뀌면 None"""
+        buf = self._buf
+        offset = self._slot_offset((seq - 1) % self.capacity)
+        for _ in range(BUS_READ_RETRIES):
+            row = BUS_SLOT_STRUCT.unpack_from(buf, offset)
+            version = row[0]
+            if version & 1 or BUS_U64.unpack_from(buf, offset)[0] != version:
+                continue
+            if row[1] != seq:
+                return None
+            return row[2], STSFrame._make(row[3:])
+        return None
+
+    def history(self, n: Optional[int] = None) -> np.ndarray:
+        """최근 n개 슬롯의 공유 메모리 view (오래된 것부터, 필드 구성은 DTYPE)"""
+        head = self.head()
+        count = min(head, self.capacity)
+        n = count if n is None else max(0, min(n, count))
+        next_index = head % self.capacity
+        end = next_index if head < self.capacity else next_index + self.capacity
+        return self._ring[end - n:end]
+
+    def since(self, seq: int) -> np.ndarray:
+        """순번 seq 보다 뒤에 기록된 슬롯들의 view"""
+        return self.history(max(0, self.head() - seq))
+
+    @property
+    def broker_pid(self) -> int:
+        return BUS_HEADER_STRUCT.unpack_from(self._buf, 0)[3]
+
+    @property
+    def owner(self) -> Tuple[int, int]:
+        """속도 명령 제어권을 가진 연결의 (pid, 연결 번호), 없으면 pid 0"""
+        return BUS_HEADER_STRUCT.unpack_from(self._buf, 0)[4:6]
+
+    def set_owner(self, pid: int, index: int = 0):
+        magic, capacity, slot_size, broker_pid, _, _ = BUS_HEADER_STRUCT.unpack_from(self._buf, 0)
+        BUS_HEADER_STRUCT.pack_into(self._buf, 0, magic, capacity, slot_size, broker_pid, pid, index)
+
+    def write_counters(self, heartbeat: float, rx_bytes: int, tx_bytes: int, errors: dict):
+        """(브로커) heartbeat 시각과 링크 카운터 기록"""
+        BUS_COUNTER_STRUCT.pack_into(self._buf, BUS_COUNTER_OFFSET, heartbeat, rx_bytes, tx_bytes,
+                                     *(errors.get(key, 0) for key in self.ERROR_KEYS))
+
+    def counters(self) -> dict:
+        heartbeat, rx_bytes, tx_bytes, *errors = BUS_COUNTER_STRUCT.unpack_from(self._buf, BUS_COUNTER_OFFSET)
+        return {'heartbeat': heartbeat, 'rx_bytes': rx_bytes, 'tx_bytes': tx_bytes,
+                'parse_errors': dict(zip(self.ERROR_KEYS, errors))}
+
+
+class TelemetryBroker:
+    """
+    시리얼 포트를 혼자 열고 여러 프로세스에 프레임을 나눠주는 브로커 (POSIX 전용, agv_bus_broker.py 로 실행)
+    - 수신: Comm 의 프레임마다 TelemetryBus 에 기록하고, 등록된 소비자 소켓마다 1 byte 통지 datagram 전송
+    - 명령: 소비자(BusComm)가 UNIX datagram 으로 보낸 명령을 하나의 Comm 송신 스케줄러로 전달
+    - 속도 명령 중재: 제어권(lease)을 가진 프로세스의 CLR 만 전송, 다른 프로세스는
+      우선순위가 더 높거나 제어권이 BUS_LEASE 동안 비어 있을 때 제어권을 가져감 (거부된 CLR 은 rejected)
+    - 제어권 프로세스가 BUS_LEASE 동안 CLR 을 보내지 않으면(종료, 멈춤) 제어권 해제 후 정지 명령,
+      제어권이 없는 동안은 STM 이 계속 응답하도록 브로커가 CLR(0,0) 을 keepalive 주기로 전송
+    - 일반 명령($MODE 등)은 누구에게서 와도 FIFO 로 전송
+    """
+
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, name: Optional[str] = None,
+                 capacity: int = BUS_CAPACITY, lease: float = BUS_LEASE, **comm_kwargs):
+        self.name = name or bus_name(port)
+        self.lease = lease
+        self.sock_path = bus_socket_path(self.name)
+        self._check_running()
+        self.comm = Comm(port=port, baudrate=baudrate, history_capacity=0, trace=False, **comm_kwargs)
+        self.bus = TelemetryBus(self.name, capacity, create=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        self._sock.bind(self.sock_path)
+        self._notify_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._notify_sock.setblocking(False)
+
+        self._subscribers = {}      # 소켓 경로 -> (pid, 우선순위, 이름), 수신 스레드는 참조만 읽음
+        self._owner = None          # 제어권: ((pid, 연결 번호), 우선순위)
+        self._owner_time = 0.0
+        self.counters = {'frames': 0, 'notify_dropped': 0, 'speed': 0, 'rejected': 0,
+                         'commands': 0, 'lease_expired': 0}
+        self._running = False
+        self.comm.subscribe(self._on_frame)
+
+    def _check_running(self):
+        """같은 이름의 브로커가 살아 있으면 에러, 이전 브로커가 남긴 세그먼트는 정리"""
+        try:
+            stale = TelemetryBus(self.name)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            shm = _open_shared_memory(self.name)
+            shm.close()
+            _unlink_shared_memory(shm)
+            return
+        pid = stale.broker_pid
+        stale.close()
+        if pid != os.getpid() and _pid_alive(pid):
+            raise RuntimeError(f"텔레메트리 브로커가 이미 실행 중입니다: {self.name} (pid {pid})")
+        shm = _open_shared_memory(self.name)
+        shm.close()
+        _unlink_shared_memory(shm)
+
+    def _on_frame(self, seq: int, frame: STSFrame):
+        """Comm 수신 스레드에서 호출: 링에 기록 후 소비자 통지 (받는 쪽 버퍼가 차 있으면 이미 깨울 통지가 있으므로 생략)"""
+        latest = self.comm._latest_rx
+        t_rx = latest[1] if latest is not None and latest[0] == seq else time.monotonic()
+        self.counters['frames'] = seq
+        self.bus.publish(seq, t_rx, frame)
+        for path in self._subscribers:
+            try:
+                self._notify_sock.sendto(BUS_NOTIFY, path)
+            except BlockingIOError:
+                self.counters['notify_dropped'] += 1
+            except OSError:
+                pass    # 종료된 소비자: _tick() 에서 정리
+
+    def _handle(self, message: bytes, path: str, now: float):
+        if len(message) < BUS_MSG_STRUCT.size:
+            return
+        kind, pid, index, priority = BUS_MSG_STRUCT.unpack_from(message)
+        payload = message[BUS_MSG_STRUCT.size:]
+        writer = (pid, index)
+        if kind == BUS_MSG_HELLO:
+            if path and path not in self._subscribers:
+                subscribers = dict(self._subscribers)
+                subscribers[path] = (pid, priority, payload.decode('utf-8', 'replace'))
+                self._subscribers = subscribers
+        elif kind == BUS_MSG_BYE:
+            if path in self._subscribers:
+                self._subscribers = {p: info for p, info in self._subscribers.items() if p != path}
+            if self._owner is not None and self._owner[0] == writer:
+                self._release(stop=True)
+        elif kind == BUS_MSG_SPEED:
+            wheels = decode_clr(payload)
+            if wheels is None:
+                return
+            owner = self._owner
+            if owner is None or owner[0] == writer or priority > owner[1] or now - self._owner_time > self.lease:
+                if owner is None or owner[0] != writer:
+                    self.bus.set_owner(*writer)
+                self._owner = (writer, priority)
+                self._owner_time = now
+                self.counters['speed'] += 1
+                self.comm.CLR(*wheels)
+            else:
+                self.counters['rejected'] += 1
+        elif kind == BUS_MSG_COMMAND:
+            self.counters['commands'] += 1
+            self.comm.send_command(payload.decode('latin-1').rstrip('\r\n'))
+
+    def _release(self, stop: bool):
+        self._owner = None
+        self.bus.set_owner(0)
+        if stop:
+            self.comm.CLR(0, 0)
+
+    def _tick(self, now: float):
+        """제어권 만료/keepalive, 종료된 소비자 정리, heartbeat/카운터 기록"""
+        if self._owner is not None and now - self._owner_time > self.lease:
+            self.counters['lease_expired'] += 1
+            self._release(stop=True)
+        if self._owner is None:
+            self.comm.CLR(0, 0)     # 같은 명령은 송신 스케줄러가 keepalive 주기로만 전송
+        alive = {path: info for path, info in self._subscribers.items()
+                 if os.path.exists(path) and _pid_alive(info[0])}
+        if len(alive) != len(self._subscribers):
+            for path, info in self._subscribers.items():
+                if path not in alive and os.path.exists(path):
+                    os.unlink(path)     # close() 없이 종료된 소비자의 소켓 파일
+            self._subscribers = alive
+        link = self.comm._link_stats
+        self.bus.write_counters(now, link.rx_bytes, self.comm._tx.counters['bytes'], self.comm._decoder.errors)
+
+    def run(self, duration: Optional[float] = None):
+        """명령 수신 루프 (Ctrl+C 또는 stop() 까지, duration 지정 시 그 시간 동안)"""
+        self._running = True
+        self._sock.settimeout(BUS_TICK)
+        end = None if duration is None else time.monotonic() + duration
+        next_tick = time.monotonic()
+        while self._running and (end is None or time.monotonic() < end):
+            try:
+                message, path = self._sock.recvfrom(BUS_MAX_MESSAGE)
+            except socket.timeout:
+                message = None
+            now = time.monotonic()
+            if message is not None:
+                self._handle(message, path, now)
+            if now >= next_tick:
+                self._tick(now)
+                next_tick = now + BUS_TICK
+
+    def stop(self):
+        self._running = False
+
+    def summary(self) -> str:
+        """한 줄 상태 요약"""
+        owner = self._owner
+        names = ', '.join(f"{info[2]}({info[0]})" for info in self._subscribers.values()) or '-'
+        return (f"프레임 {self.counters['frames']} | 소비자 {names} | 제어권 "
+                f"{'%d.%d' % owner[0] if owner else '-'} | 거부 {self.counters['rejected']} | "
+                f"만료 {self.counters['lease_expired']} | 통지 생략 {self.counters['notify_dropped']}")
+
+    def close(self):
+        """정지 명령 후 포트/세그먼트/소켓 정리"""
+        self._running = False
+        self.comm.CLR(0, 0)
+        self.comm.destroy()
+        self._sock.close()
+        self._notify_sock.close()
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        self.bus.close()
+        self.bus.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BusLink:
+    """
+    BusComm 의 transport: TelemetryBus 에 붙은 공유 메모리와 브로커와 주고받는 UNIX datagram 소켓
+    (Comm 이 기대하는 port/timeout/is_open/close() 만 제공, 시리얼 read/write 는 하지 않음)
+    """
+
+    _count = itertools.count()
+
+    def __init__(self, name: str, priority: int, label: str):
+        self.port = name
+        self.timeout = 0.1
+        self.priority = priority
+        self.label = label
+        self.bus = TelemetryBus(name)
+        self._broker_path = bus_socket_path(name)
+        self.index = next(self._count)
+        self.path = bus_socket_path(name, os.getpid(), self.index)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        # 블로킹 소켓 + 커널 수신 타임아웃: 통지 하나를 recv 한 번(syscall 1회)으로 기다림
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO,
+                              struct.pack('ll', int(self.timeout), int(self.timeout % 1 * 1e6)))
+        self.is_open = True
+
+    def send(self, kind: bytes, payload: bytes = b'') -> bool:
+        """브로커에 메시지 전송, 브로커가 없으면 False"""
+        try:
+            self._sock.sendto(BUS_MSG_STRUCT.pack(kind, os.getpid(), self.index, self.priority) + payload,
+                              self._broker_path)
+            return True
+        except OSError:
+            return False
+
+    def hello(self) -> bool:
+        return self.send(BUS_MSG_HELLO, self.label.encode('utf-8'))
+
+    def wait(self) -> bool:
+        """통지 datagram 하나를 최대 timeout 동안 기다림 (도착하면 True)"""
+        try:
+            self._sock.recv(BUS_MAX_MESSAGE)
+            return True
+        except OSError:     # 수신 타임아웃(EAGAIN) 또는 닫힌 소켓
+            return False
+
+    def broker_alive(self) -> bool:
+        return time.monotonic() - self.bus.counters()['heartbeat'] < BUS_STALE
+
+    def reattach(self) -> bool:
+        """브로커가 다시 시작되어 새 세그먼트가 생겼으면 그쪽으로 옮김"""
+        try:
+            bus = TelemetryBus(self.port)
+        except (FileNotFoundError, ValueError):
+            return False
+        if bus.broker_pid == self.bus.broker_pid:
+            bus.close()
+            return False
+        self.bus.close()
+        self.bus = bus
+        return True
+
+    def close(self):
+        if not self.is_open:
+            return
+        self.is_open = False
+        self.send(BUS_MSG_BYE)
+        self._sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.bus.close()
+
+
+class BusCommandQueue:
+    """
+    BusComm 의 송신 스케줄러 자리 (TxScheduler 와 같은 메서드): 명령을 바로 브로커에 datagram 으로 보냄
+    - 병합/생략/대역폭 제한/제어권 중재는 브로커의 TxScheduler 와 TelemetryBroker 가 처리
+    - 지연 추적(on_sent)은 브로커에 넘긴 시점 기준
+    """
+
+    def __init__(self, link: BusLink, on_sent: Optional[Callable[[object], None]] = None):
+        self._link = link
+        self._on_sent = on_sent
+        self.counters = {'sent': 0, 'coalesced': 0, 'suppressed': 0, 'dropped': 0, 'bytes': 0}
+
+    def submit_speed(self, data: bytes, is_stop: bool, trace=None):
+        if self._send(BUS_MSG_SPEED, data) and trace is not None and self._on_sent is not None:
+            self._on_sent(trace)
+
+    def submit(self, data: bytes):
+        self._send(BUS_MSG_COMMAND, data)
+
+    def _send(self, kind: bytes, data: bytes) -> bool:
+        if self._link.send(kind, data):
+            self.counters['sent'] += 1
+            self.counters['bytes'] += len(data)
+            return True
+        self.counters['dropped'] += 1
+        return False
+
+    def depth(self) -> int:
+        return 0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    def close(self, timeout: float = 0.2):
+        pass
+
+
+class BusComm(Comm):
+    """
+    TelemetryBroker 에 붙는 Comm 호환 소비자 (시리얼 포트를 열지 않음, 실제 시간 전용, POSIX 전용)
+    - 수신 스레드는 브로커의 통지 datagram 을 기다렸다가 공유 메모리 링에서 새 프레임을 바로 읽어
+      Comm 과 같은 경로(latest_data, wait_for_frame(), subscribe(), FrameFilter)로 전달 (프레임당 syscall 은 통지 수신뿐)
+    - frame_seq 는 브로커의 순번, history()/since() 는 공유 메모리 링의 복사 없는 view
+    - CLR()/send_command() 는 브로커로 전송, priority 가 높은 프로세스가 속도 명령 제어권을 가져감
+      (모니터: BUS_PRIORITY_MONITOR, 제어 프로그램: BUS_PRIORITY_CONTROL), has_control() 로 확인
+    - 브로커가 다시 시작되면 새 세그먼트에 다시 붙고, 통지 등록(hello)은 BUS_HELLO_INTERVAL 마다 반복
+    """
+
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, name: Optional[str] = None,
+                 priority: int = BUS_PRIORITY_MONITOR, label: Optional[str] = None, **kwargs):
+        if kwargs.get('clock', SYSTEM_CLOCK) is not SYSTEM_CLOCK:
+            raise ValueError("BusComm 은 실제 시간(SYSTEM_CLOCK)에서만 사용할 수 있습니다.")
+        kwargs.pop('transport', None)
+        kwargs.update(history_capacity=0, framing=FRAMING_ASCII)
+        link = BusLink(name or bus_name(port), priority,
+                       label or os.path.basename(sys.argv[0] or 'python'))
+        self.lapped = 0             # 읽기 전에 링이 한 바퀴 돌아 놓친 프레임 수
+        super().__init__(port=port, baudrate=baudrate, transport=link, **kwargs)
+
+    def _start_io(self, baudrate: int, tx_keepalive: float):
+        link = self.ser
+        self._tx = BusCommandQueue(link, on_sent=self._on_clr_sent)
+        link.hello()
+        self._is_running = True
+        self.thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.thread.start()
+
+    def _read_loop(self):
+        link = self.ser
+        last = max(0, link.bus.head() - 1)      # 최신 프레임 하나는 바로 전달
+        next_hello = time.monotonic() + BUS_HELLO_INTERVAL
+        while self._is_running:
+            notified = link.wait()
+            now = time.monotonic()
+            if now >= next_hello:
+                next_hello = now + BUS_HELLO_INTERVAL
+                if not link.broker_alive() and link.reattach():
+                    last = max(0, link.bus.head() - 1)
+                link.hello()
+            if not notified:
+                continue
+            bus = link.bus
+            head = bus.head()
+            if head < last:
+                last = 0            # 순번이 줄었으면 브로커가 다시 시작됨
+            if head - last > bus.capacity:
+                self.lapped += head - last - bus.capacity
+                last = head - bus.capacity
+            for seq in range(last + 1, head + 1):
+                item = bus.read(seq)
+                if item is None:
+                    self.lapped += 1
+                    continue
+                t_rx, frame = item
+                self._link_stats.on_frame(t_rx, frame)
+                self._publish_frame(frame, t_rx, seq)
+            last = head
+
+    def has_control(self) -> bool:
+        """이 연결이 속도 명령 제어권을 가지고 있는지"""
+        return self.ser.bus.owner == (os.getpid(), self.ser.index)
+
+    def stats(self) -> dict:
+        """Comm.stats() 와 같은 형식 (수신 byte/파싱 오류는 브로커 값) + bus: 브로커/제어권 상태"""
+        link = self.ser
+        counters = link.bus.counters()
+        self._link_stats.rx_bytes = counters['rx_bytes']
+        stats = super().stats()
+        stats['parse_errors'] = counters['parse_errors']
+        stats['bus'] = {
+            'name': link.port,
+            'broker_pid': link.bus.broker_pid,
+            'broker_alive': link.broker_alive(),
+            'owner_pid': link.bus.owner[0],
+            'has_control': self.has_control(),
+            'lapped': self.lapped,
+        }
+        return stats
+
+    def history(self, n: Optional[int] = None) -> np.ndarray:
+        """최근 n개 프레임 (공유 메모리 view, 필드는 TelemetryBus.DTYPE: ver, seq, t_rx, STS 필드)"""
+        return self.ser.bus.history(n)
+
+    def since(self, seq: int) -> np.ndarray:
+        """브로커 순번 seq 이후의 프레임 (공유 메모리 view)"""
+        return self.ser.bus.since(seq)
+
+
+def connect_agv(port='/dev/ttyUSB0', baudrate=115200, priority: int = BUS_PRIORITY_MONITOR, **kwargs) -> Comm:
+    """이 포트의 텔레메트리 브로커가 실행 중이면 BusComm, 아니면 포트를 직접 여는 Comm"""
+    name = kwargs.pop('name', None) or bus_name(port)
+    if os.name == 'posix' and os.path.exists(bus_socket_path(name)):
+        try:
+            return BusComm(port, baudrate, name=name, priority=priority, **kwargs)
+        except (FileNotFoundError, ValueError):
+            pass    # 브로커가 비정상 종료해 소켓만 남은 경우
+    return Comm(port=port, baudrate=baudrate, **kwargs)
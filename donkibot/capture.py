@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""시리얼 캡처 파일 기록(SerialCapture)/읽기(read_capture)"""
+
+import threading
+import struct
+from typing import Tuple
+
+from .clock import SYSTEM_CLOCK
+
+# 시리얼 캡처 파일: 헤더(매직, 시작 monotonic 시각, 시작 벽시계 시각) + 레코드(시각 us, 방향, 길이, 데이터)
+CAPTURE_MAGIC = b'DKBCAP01'
+CAPTURE_HEADER_STRUCT = struct.Struct('<8sdd')
+CAPTURE_RECORD_STRUCT = struct.Struct('<QBH')
+CAPTURE_RX = 0                  # STM -> PC
+CAPTURE_TX = 1                  # PC -> STM
+CAPTURE_FLUSH_INTERVAL = 1.0    # 이 주기마다 파일에 flush (비정상 종료 시 잃는 구간 제한, s)
+
+
+class SerialCapture:
+    """
+    시리얼 송수신 캡처 기록기: 수신/송신 byte 조각을 도착/송신 시각과 함께 그대로 기록
+    - 레코드 헤더 11 byte + 데이터 (20 Hz STS 기준 시간당 약 5 MB)
+    - 수신 스레드와 송신 스레드가 함께 호출하므로 lock 으로 보호
+    """
+
+    def __init__(self, path: str, clock=SYSTEM_CLOCK, flush_interval: float = CAPTURE_FLUSH_INTERVAL):
+        self.path = path
+        self._clock = clock
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._t0 = clock.now()
+        self._last_flush = self._t0
+        self._file = open(path, 'wb')
+        self._file.write(CAPTURE_HEADER_STRUCT.pack(CAPTURE_MAGIC, self._t0, clock.time()))
+        self.records = 0
+        self.bytes = 0
+
+    def record(self, direction: int, t: float, data: bytes):
+        """t(clock.now() 시각)에 direction(CAPTURE_RX/CAPTURE_TX) 방향으로 오간 data 기록"""
+        t_us = max(0, int((t - self._t0) * 1e6))
+        with self._lock:
+            if self._file is None:
+                return
+            for start in range(0, len(data), 0xFFFF):
+                part = data[start:start + 0xFFFF]
+                self._file.write(CAPTURE_RECORD_STRUCT.pack(t_us, direction, len(part)))
+                self._file.write(part)
+                self.records += 1
+            self.bytes += len(data)
+            if t - self._last_flush >= self._flush_interval:
+                self._file.flush()
+                self._last_flush = t
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_capture_header(path: str) -> Tuple[float, float]:
+    """캡처 파일의 (시작 monotonic 시각, 시작 벽시계 시각)"""
+    with open(path, 'rb') as f:
+        magic, t0, wall = CAPTURE_HEADER_STRUCT.unpack(f.read(CAPTURE_HEADER_STRUCT.size))
+    if magic != CAPTURE_MAGIC:
+        raise ValueError(f"캡처 파일 형식이 아닙니다: {path}")
+    return t0, wall
+
+
+def read_capture(path: str):
+    """캡처 파일의 레코드를 (시작 후 경과 시간 s, 방향, 데이터) 로 차례로 반환 (끝이 잘린 레코드는 무시)"""
+    read_capture_header(path)
+    with open(path, 'rb') as f:
+        f.seek(CAPTURE_HEADER_STRUCT.size)
+        while True:
+            head = f.read(CAPTURE_RECORD_STRUCT.size)
+            if len(head) < CAPTURE_RECORD_STRUCT.size:
+                return
+            t_us, direction, length = CAPTURE_RECORD_STRUCT.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield t_us / 1e6, direction, data
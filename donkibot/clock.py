@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""시간 소스: SystemClock(실제 시간), VirtualClock(가상 시간 시뮬레이션)"""
+
+import threading
+import time
+from typing import Optional
+
+
+class SystemClock:
+    """
+    실제 시간 시계 (기본값): time.monotonic() / time.sleep() / Condition.wait_for() 를 그대로 사용
+    - 시간을 쓰는 루프는 clock.now(), clock.sleep(), clock.wait_for() 만 호출하고,
+      공유 상태를 바꾼 쪽은 조건 변수 notify 후 clock.notify() 를 호출 (VirtualClock 과 같은 코드로 동작)
+    """
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        """로그/타임스탬프용 벽시계 시각 (time.time() 대체)"""
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait_for(self, cond: threading.Condition, predicate, timeout: Optional[float] = None):
+        """cond 를 잡은 상태에서 호출, predicate() 가 참이 되거나 timeout 이 지날 때까지 대기"""
+        return cond.wait_for(predicate, timeout)
+
+    def notify(self):
+        pass
+
+    def register(self, thread: threading.Thread):
+        pass
+
+    def detach(self):
+        pass
+
+
+class VirtualClock:
+    """
+    가상 시간 시계: 실제로 기다리지 않고, 참여 스레드가 모두 시계에서 대기 중일 때
+    가장 이른 대기 만료 시각으로 시간을 건너뜀 -> 30분 주행 시나리오를 수 초~수십 초에 실행
+    - 참여 스레드: clock.sleep()/wait_for() 를 한 번이라도 호출했거나 register() 로 등록한 스레드
+      (실행 중인 참여 스레드가 하나라도 있으면 시간은 멈춰 있음, 종료된 스레드는 자동 제외)
+    - 시계 밖에서 블로킹하는 스레드(pty/소켓 수신 등)가 만드는 데이터는 시간 진행과 경합하므로
+      가상 시간 실행에서는 pty 대신 프로세스 내부 연결(pty_harness.LoopbackSerial)을 사용
+    - 참여 스레드가 시계 밖에서 오래 블로킹하면(join 등) 시간이 진행되지 않으므로 그 전에 detach() 호출
+    """
+
+    POLL_INTERVAL = 0.005   # notify() 를 호출하지 않는 생산자에 대비한 predicate 재확인 주기 (실제 시간 s)
+
+    def __init__(self, start: float = 0.0, epoch: Optional[float] = None):
+        self._now = start
+        self._epoch = time.time() if epoch is None else epoch
+        self._start = start
+        self._cond = threading.Condition()
+        # 스레드 -> None(실행 중) 또는 (만료 시각 또는 None, predicate 또는 None)
+        self._participants = {}
+
+    def now(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._epoch + (self._now - self._start)
+
+    def sleep(self, seconds: float):
+        self.wait_for(None, None, seconds)
+
+    def wait_for(self, cond: Optional[threading.Condition], predicate, timeout: Optional[float] = None):
+        """SystemClock.wait_for() 와 같은 의미, 대기하는 동안 cond 를 놓아 생산자가 진행할 수 있게 함"""
+        me = threading.current_thread()
+        if cond is not None:
+            cond.release()
+        try:
+            with self._cond:
+                deadline = None if timeout is None else self._now + max(0.0, timeout)
+                while True:
+                    if predicate is not None and predicate():
+                        result = True
+                        break
+                    if deadline is not None and self._now >= deadline:
+                        result = predicate() if predicate is not None else True
+                        break
+                    self._participants[me] = (deadline, predicate)
+                    self._advance()
+                    if deadline is None or self._now < deadline:
+                        self._cond.wait(self.POLL_INTERVAL)
+                self._participants[me] = None
+                return result
+        finally:
+            if cond is not None:
+                cond.acquire()
+
+    def _advance(self):
+        """(lock 안) 모든 참여 스레드가 만족되지 않은 조건으로 대기 중이면 가장 이른 만료 시각으로 이동"""
+        earliest = None
+        for thread, state in list(self._participants.items()):
+            if thread.ident is not None and not thread.is_alive():
+                del self._participants[thread]
+                continue
+            if state is None:
+                return                      # 실행 중인 스레드가 있음
+            deadline, predicate = state
+            if predicate is not None and predicate():
+                self._cond.notify_all()     # 깨어날 스레드가 있음
+                return
+            if deadline is not None and (earliest is None or deadline < earliest):
+                earliest = deadline
+        if earliest is not None and earliest > self._now:
+            self._now = earliest
+            self._cond.notify_all()
+
+    def notify(self):
+        """공유 상태가 바뀌었음을 알림 (대기 중인 스레드가 predicate 를 다시 확인)"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def register(self, thread: threading.Thread):
+        """시작 전 스레드를 참여 스레드로 등록 (첫 대기 전에 시간이 앞서 가지 않도록)"""
+        with self._cond:
+            self._participants.setdefault(thread, None)
+
+    def detach(self):
+        """현재 스레드를 참여 스레드에서 제외 (시계 밖에서 오래 블로킹하기 전에 호출)"""
+        with self._cond:
+            self._participants.pop(threading.current_thread(), None)
+            self._advance()
+
+
+SYSTEM_CLOCK = SystemClock()
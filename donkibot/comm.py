@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""수신 스레드 기반 시리얼 통신 (Comm)"""
+
+import threading
+import numpy as np
+import serial
+from typing import Callable, List, Optional, Tuple
+
+from .capture import CAPTURE_RX, CAPTURE_TX, SerialCapture
+from .clock import SYSTEM_CLOCK
+from .filters import FrameFilter
+from .frames import (
+    FRAMING_ASCII, FRAMING_AUTO, MODE_ASCII_COMMAND, MODE_BIN_COMMAND, STSDecoder, STSFrame, decode_clr,
+    encode_clr_binary, format_clr)
+from .history import FrameHistory, HISTORY_CAPACITY
+from .stats import LatencyTracer, LinkStats
+from .tx import TX_BUDGET_RATIO, TX_KEEPALIVE, TxScheduler
+
+READ_MODE_EVENT = 'event'   # 데이터가 도착할 때까지 read()에서 블로킹 (select 기반, 유휴 시 CPU 사용 없음)
+READ_MODE_POLL = 'poll'     # in_waiting 확인 후 1ms sleep 반복 (기존 방식)
+
+BIN_NEGOTIATE_TIMEOUT = 1.0     # 이 시간 안에 바이너리 프레임이 오지 않으면 ASCII 로 확정 (s)
+# 바이너리 전환 후 최근 BIN_ERROR_WINDOW 개 바이너리 프레임(정상 + CRC 오류) 중 CRC 오류 비율이
+# BIN_MAX_CRC_RATE 를 넘으면 ASCII 로 복귀 (CRC 가 있는 바이너리는 잡음에도 값이 변조되지 않으므로
+# 잡음 때문에 돌아가지 않고, 상대의 바이너리 구현이 맞지 않아 대부분 실패할 때만 복귀)
+BIN_ERROR_WINDOW = 100
+BIN_MAX_CRC_RATE = 0.5
+
+
+class Comm:
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, read_mode=READ_MODE_EVENT,
+                 history_capacity=HISTORY_CAPACITY, tx_keepalive=TX_KEEPALIVE,
+                 framing=FRAMING_ASCII, clock=SYSTEM_CLOCK, transport=None, capture=None,
+                 trace=True):
+        """
+        clock: 시간 소스 (SYSTEM_CLOCK 또는 VirtualClock), 수신/송신 스레드와 wait_for_frame() 이 사용
+        transport: 포트를 여는 대신 사용할 pyserial 호환 객체 (예: pty_harness.LoopbackSerial)
+        capture: 송수신 데이터를 기록할 캡처 파일 경로 (start_capture() 로 나중에 시작해도 됨)
+        trace: 감지-구동 지연 추적 (LatencyTracer, self.tracer), False 면 추적 없음
+        """
+        if read_mode not in (READ_MODE_EVENT, READ_MODE_POLL):
+            raise ValueError(f"지원하지 않는 read_mode: {read_mode}")
+        if framing not in (FRAMING_ASCII, FRAMING_AUTO):
+            raise ValueError(f"지원하지 않는 framing: {framing}")
+
+        self._clock = clock
+        self.ser = transport if transport is not None else serial.Serial()
+        if transport is None:
+            self.ser.port = port
+            self.ser.baudrate = baudrate
+        self.ser.timeout = 0.1      # event 모드에서 블로킹 read 의 최대 대기 시간 (종료 확인 주기)
+        self.read_mode = read_mode
+
+        self.latest_data: STSFrame = STSFrame() # 항상 최신 데이터를 담고 있음
+        self.frame_seq = 0                      # 수신한 프레임 순번 (1부터 증가, 0: 아직 수신 없음)
+        self._frame_cond = threading.Condition()
+        self._subscribers: List[Callable[[int, STSFrame], None]] = []
+        self._frame_filter: Optional[FrameFilter] = None
+        self.tracer = LatencyTracer(clock=clock) if trace else None
+        self._latest_rx: Optional[Tuple[int, float]] = None    # 최신 프레임의 (순번, 수신 시각)
+        self._trace_local = threading.local()                   # 스레드별 근거 프레임(src)과 라벨(label)
+        # 프레임 이력 링 버퍼 (history_capacity=0 이면 사용 안 함, 링크 최대 프레임율로 보관하려면 HISTORY_CAPACITY_MAX)
+        self.frame_history = FrameHistory(history_capacity) if history_capacity else None
+        self._decoder = STSDecoder(accept_binary=(framing == FRAMING_AUTO))
+        # 바이너리 협상 상태: None(ASCII 고정/확정), 그 외에는 요청 시각
+        self._bin_requested_at: Optional[float] = None
+        self._bin_window = (0, 0)       # CRC 오류율 창 시작 시점의 (바이너리 프레임 수, CRC 오류 수)
+        self._link_stats = LinkStats(clock.now())
+        self._stats_lock = threading.Lock()
+        self._is_running = False
+        self._capture: Optional[SerialCapture] = None
+
+        try:
+            if transport is None:
+                self.ser.open()
+                self.ser.reset_input_buffer()
+            #print(f'시리얼 포트 {port} 연결 성공.')
+        except serial.SerialException as e:
+            print(f'시리얼 포트 {port} 연결 실패: {e}')
+            raise  # 에러 발생 시 프로그램 중단
+
+        if capture is not None:
+            self.start_capture(capture)
+        self._start_io(baudrate, tx_keepalive)
+
+        if framing == FRAMING_AUTO:
+            # 바이너리를 모르는 펌웨어는 이 명령을 무시하므로 그대로 ASCII 로 동작
+            self._bin_requested_at = clock.now()
+            self.send_command(MODE_BIN_COMMAND)
+
+    def _start_io(self, baudrate: int, tx_keepalive: float):
+        """송수신 시작: 수신 스레드 + 송신 스케줄러 스레드 (SerialHub 의 포트는 허브 루프 사용)"""
+        # 명령 송신은 송신 스케줄러 스레드가 전담 (1 byte = 10 bit)
+        self._tx = TxScheduler(self._write, bytes_per_sec=baudrate / 10 * TX_BUDGET_RATIO,
+                               keepalive=tx_keepalive, on_sent=self._on_clr_sent, clock=self._clock)
+
+        # 데이터 수신을 위한 스레드 시작
+        self._is_running = True
+        self.thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._clock.register(self.thread)
+        self.thread.start()
+        #print('시리얼 수신 스레드 시작.')
+
+    def _read_loop(self):
+        """백그라운드에서 시리얼 데이터를 계속 읽고 파싱하는 내부 메서드"""
+        #print("수신 루프 진입...")
+        if self.read_mode == READ_MODE_POLL:
+            self._poll_read_loop()
+        else:
+            self._event_read_loop()
+
+    def _event_read_loop(self):
+        """데이터가 올 때까지 read()에서 잠들어 있다가 도착 즉시 깨어나는 수신 루프"""
+        while self._is_running:
+            try:
+                # 대기 중인 데이터가 없으면 1 byte 가 도착할 때까지(최대 timeout) 블로킹,
+                # 있으면 도착한 만큼 한 번에 읽음
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+                if chunk:
+                    self._handle_chunk(chunk)
+            except Exception as e:
+                print(f"수신 루프 에러: {e}")
+                self._clock.sleep(0.1)
+
+    def _poll_read_loop(self):
+        """in_waiting 을 1ms 간격으로 확인하는 기존 방식의 수신 루프"""
+        while self._is_running:
+            if self.ser.in_waiting > 0:
+
+                try:
+                    # 도착한 만큼 한 번에 읽어 디코더에 전달 (프레임 경계는 디코더가 처리)
+                    chunk = self.ser.read(self.ser.in_waiting)
+                    self._handle_chunk(chunk)
+
+                except Exception as e:
+                    print(f"수신 루프 에러: {e}")
+            self._clock.sleep(0.001) # CPU 사용량 감소
+
+    def _handle_chunk(self, chunk: bytes):
+        """수신한 bytes 조각을 디코딩하여 최신 데이터를 갱신"""
+        t_rx = self._clock.now()
+        capture = self._capture
+        if capture is not None:
+            capture.record(CAPTURE_RX, t_rx, chunk)
+        self._link_stats.on_chunk(len(chunk))
+        for parsed_frame in self._decoder.feed(chunk):
+            self._link_stats.on_frame(t_rx, parsed_frame)
+            self._publish_frame(parsed_frame, t_rx)
+            #print(f"Parsed: {self.latest_data}") # 디버깅 시 주석 해제
+        if self._bin_requested_at is not None:
+            self._check_framing(t_rx)
+
+    def start_capture(self, path: str) -> SerialCapture:
+        """이후 송수신 데이터를 path 에 기록 (이미 기록 중이면 이전 파일을 닫고 새로 시작)"""
+        previous, self._capture = self._capture, SerialCapture(path, self._clock)
+        if previous is not None:
+            previous.close()
+        return self._capture
+
+    def stop_capture(self):
+        """캡처 기록 종료"""
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            capture.close()
+
+    def _check_framing(self, now: float):
+        """바이너리 협상 결과 확인: 무응답이거나 최근 바이너리 프레임의 CRC 오류율이 높으면 ASCII 로 확정"""
+        decoder = self._decoder
+        if decoder.binary_count == 0:
+            if now - self._bin_requested_at > BIN_NEGOTIATE_TIMEOUT:
+                self._bin_requested_at = None
+            return
+        ok_base, crc_base = self._bin_window
+        ok = decoder.binary_count - ok_base
+        crc = decoder.errors['crc'] - crc_base
+        if ok + crc < BIN_ERROR_WINDOW and crc <= BIN_MAX_CRC_RATE * BIN_ERROR_WINDOW:
+            return      # 창이 덜 찼고 CRC 오류도 아직 창 전체 기준 이하
+        if crc > BIN_MAX_CRC_RATE * max(ok + crc, BIN_ERROR_WINDOW):
+            print(f"바이너리 프레임 CRC 오류율 {crc / (ok + crc):.0%}: ASCII 프레임으로 복귀합니다.")
+            self._bin_requested_at = None
+            self.send_command(MODE_ASCII_COMMAND)
+        else:
+            self._bin_window = (decoder.binary_count, decoder.errors['crc'])
+
+    @property
+    def framing(self) -> str:
+        """현재 사용 중인 프레임 형식 ('binary' 또는 'ascii')"""
+        return 'binary' if self._binary_active() else FRAMING_ASCII
+
+    def _binary_active(self) -> bool:
+        return self._bin_requested_at is not None and self._decoder.last_binary
+
+    def _publish_frame(self, frame: STSFrame, t_rx: float, seq: Optional[int] = None):
+        """최신 데이터 갱신, 이력 기록 후 대기 중인 제어 루프와 구독자에게 통지 (seq: 외부 순번, 생략 시 1 증가)"""
+        with self._frame_cond:
+            self.frame_seq = self.frame_seq + 1 if seq is None else seq
+            self.latest_data = frame
+            seq = self.frame_seq
+            self._latest_rx = (seq, t_rx)
+            if self.frame_history is not None:
+                self.frame_history.append(seq, t_rx, frame)
+            if self._frame_filter is not None:
+                self._frame_filter.update(frame, t_rx)
+            self._frame_cond.notify_all()
+        self._clock.notify()
+
+        for callback in self._subscribers:
+            try:
+                callback(seq, frame)
+            except Exception as e:
+                print(f"프레임 구독 콜백 에러: {e}")
+
+    def wait_for_frame(self, after_seq: int, timeout: Optional[float] = None) -> Tuple[int, STSFrame]:
+        """
+        frame_seq 가 after_seq 보다 커질 때까지(새 프레임 수신) 대기 후 (순번, 프레임)을 반환합니다.
+        이미 새 프레임이 있으면 즉시 반환하고, timeout 이 지나면 현재 값을 그대로 반환합니다.
+        (반환된 순번 == after_seq 이면 타임아웃, 순번이 2 이상 증가했으면 그 사이 프레임을 건너뛴 것)
+        """
+        with self._frame_cond:
+            self._clock.wait_for(self._frame_cond,
+                                 lambda: self.frame_seq > after_seq or not self._is_running, timeout)
+            self._trace_local.src = self._latest_rx
+            return self.frame_seq, self.latest_data
+
+    def set_frame_filter(self, frame_filter: Optional[FrameFilter]):
+        """
+        수신 프레임마다 통지 전에 frame_filter.update() 호출 (None 이면 해제), 보통 FrameFilter.attach() 로 호출
+        - 이미 받은 프레임이 있으면 그 값으로 필터를 초기화 (연결 직후 기본값 0 으로 장애물 오검출 방지)
+        """
+        with self._frame_cond:
+            self._frame_filter = frame_filter
+            if frame_filter is not None and self.frame_seq > 0:
+                frame_filter.update(self.latest_data, self._clock.now())
+
+    def subscribe(self, callback: Callable[[int, STSFrame], None]):
+        """
+        프레임 수신 시마다 callback(순번, 프레임)을 호출하도록 등록합니다.
+        콜백은 수신 스레드에서 실행되므로 짧게 끝나야 합니다.
+        """
+        self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Callable[[int, STSFrame], None]):
+        """subscribe() 로 등록한 콜백 해제"""
+        self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+    def destroy(self):
+        """리소스 정리 (스레드 및 시리얼 포트 종료)"""
+
+        self._is_running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()   # wait_for_frame() 대기 중인 스레드 깨우기
+        self._clock.notify()
+
+        if self.thread.is_alive():
+            self.thread.join(0.2)
+        self._tx.close()    # 마지막 정지 명령 등 남은 명령을 보낸 뒤 종료
+        self.stop_capture()
+        if self.ser.is_open:
+            self.ser.close()
+            #print('시리얼 포트가 닫혔습니다.')
+
+    def _write(self, data: bytes):
+        """송신 스케줄러 스레드에서 호출하는 실제 시리얼 쓰기"""
+        if self.ser.is_open and self.ser.writable():
+            self.ser.write(data)
+            capture = self._capture
+            if capture is not None:
+                capture.record(CAPTURE_TX, self._clock.now(), data)
+            wheels = decode_clr(data)
+            if wheels is not None:
+                vl, vr = wheels
+                self._link_stats.on_speed_command(self._clock.now(), (vl + vr) / 2,
+                                                  self.latest_data.Speed)
+            #print(f"Sent: {data}") # 디버깅 시 주석 해제
+        else:
+            print("경고: 시리얼 포트가 쓰기 가능 상태가 아닙니다.")
+
+    def send_command(self, command: str):
+        """명령어 문자열을 송신 대기열에 넣음 (송신 스케줄러가 순서대로 전송)"""
+        self._tx.submit((command + '\r\n').encode('latin-1'))
+
+    def CLR(self, vl: int, vr: int):
+        """
+        좌측 바퀴 속도(vl), 우측 바퀴 속도(vr) 명령 전송
+        - SPEED_LIMIT에 따라 속도 제한 적용, 대기 중인 이전 속도 명령은 새 명령으로 교체
+        - 상대가 바이너리 프레임으로 응답 중이면 바이너리 CLR 로 전송
+        - 추적 중이면 이 스레드가 마지막으로 읽은 프레임의 나이를 기록하고 송신 시점 기록용 trace 를 붙임
+        """
+        if self._binary_active():
+            data = encode_clr_binary(vl, vr)
+        else:
+            data = (format_clr(vl, vr) + '\r\n').encode('latin-1')
+        trace = None
+        tracer = self.tracer
+        if tracer is not None:
+            local = self._trace_local
+            src = getattr(local, 'src', None)
+            if src is None:
+                tracer.untraced += 1
+            else:
+                label = getattr(local, 'label', None) or self.trace_label()
+                tracer.record_decide(label, src[0], self._clock.now() - src[1])
+                trace = (label, src[1])
+        self._tx.submit_speed(data, (vl == 0 and vr == 0), trace)
+
+    def trace_label(self, label: Optional[str] = None) -> str:
+        """이 스레드에서 낸 CLR 을 집계할 제어기 이름 지정 (생략 시 스레드 이름) 후 반환"""
+        label = label or threading.current_thread().name
+        self._trace_local.label = label
+        return label
+
+    def _on_clr_sent(self, trace: Tuple[str, float]):
+        """송신 스케줄러가 추적 중인 CLR 을 실제로 쓴 직후 호출"""
+        label, t_rx = trace
+        self.tracer.record_write(label, self._clock.now() - t_rx)
+
+    def tx_counters(self) -> dict:
+        """송신 스케줄러 카운터 (sent, coalesced, suppressed, dropped, bytes, queue_depth)"""
+        counters = dict(self._tx.counters)
+        counters['queue_depth'] = self._tx.depth()
+        return counters
+
+    def get_latest_data(self) -> STSFrame:
+        """가장 최근에 파싱된 데이터 반환 (추적 중이면 이 스레드의 CLR 근거 프레임으로 기록)"""
+        # 순번을 먼저 읽음: 그 사이 새 프레임이 오면 나이가 실제보다 길게(보수적으로) 기록됨
+        if self.tracer is not None:
+            self._trace_local.src = self._latest_rx
+        return self.latest_data
+
+    def stats(self) -> dict:
+        """
+        링크 상태 스냅샷 (10 Hz 정도로 자주 호출해도 부담 없음)
+        - frames_per_sec, rx_bytes_per_sec, tx_bytes_per_sec: 최근 약 1초 구간 평균
+        - parse_errors: 원인별 파싱 실패 수, gap_ms: 프레임 간격 히스토그램
+        - tx: 송신 스케줄러 카운터/대기열 길이, response_ms: 명령-응답 지연 히스토그램
+        - latency: 제어기별 감지-구동 지연 (LatencyTracer.snapshot(), 추적하지 않으면 None)
+        """
+        link = self._link_stats
+        tx = self.tx_counters()
+        now = self._clock.now()
+        with self._stats_lock:
+            fps, rx_bps, tx_bps = link.rates(now, tx['bytes'])
+        return {
+            'uptime_s': now - link.start_time,
+            'frames': link.frames,
+            'frames_per_sec': fps,
+            'rx_bytes': link.rx_bytes,
+            'rx_bytes_per_sec': rx_bps,
+            'tx_bytes_per_sec': tx_bps,
+            'parse_errors': dict(self._decoder.errors),
+            'gap_ms': link.gap_ms.snapshot(),
+            'tx': tx,
+            'response_ms': link.response_ms.snapshot(),
+            'no_response': link.no_response,
+            'framing': self.framing,
+            'latency': self.tracer.snapshot() if self.tracer is not None else None,
+        }
+
+    def history(self, n: Optional[int] = None) -> np.ndarray:
+        """최근 n개 프레임 이력 (numpy 구조화 배열 view, 오래된 것부터)"""
+        if self.frame_history is None:
+            return np.zeros(0, dtype=FrameHistory.DTYPE)
+        with self._frame_cond:
+            return self.frame_history.history(n)
+
+    def since(self, seq: int) -> np.ndarray:
+        """순번 seq 이후에 수신된 프레임 이력 (numpy 구조화 배열 view)"""
+        if self.frame_history is None:
+            return np.zeros(0, dtype=FrameHistory.DTYPE)
+        with self._frame_cond:
+            return self.frame_history.since(seq)
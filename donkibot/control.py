@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""제어기: 라인 추종(LineController), TFS 추종(TfsController), 장애물 속도 조절(ObstacleGovernor), 속도 프로파일(SpeedProfilePlanner)"""
+
+import bisect
+import math
+from typing import List, Optional, Tuple
+
+from .clock import SYSTEM_CLOCK
+from .frames import ODOMETER_MM_PER_COUNT, SPEED_LIMIT
+
+LINE_POS_MAX = 15               # LinePos 범위 -15 ~ 15
+LINE_GAINS = {
+    'kp': 1.2,          # 편차 최대(±15)일 때 바퀴 속도 차 / 전진 속도 (곡률 명령, 속도에 비례)
+    'kd': 4.0,          # LinePos 가 한 단계 변할 때 더하는 바퀴 속도 차 (mm/s, 샘플 간 변화량 기준)
+    'turn_min': 40.0,   # 편차 최대일 때 속도와 무관하게 더하는 바퀴 속도 차 (mm/s, 저속 회전력)
+    'slowdown': 0.6,    # 편차 최대일 때 전진 속도 감소 비율 (편차 제곱에 비례)
+}
+LINE_SPEED_STEP = 10            # 미리 계산하는 속도 제한 간격 (mm/s), 그 외 값은 처음 쓸 때 계산
+
+TFS_ANGLE_MAX = 80              # TfsAngle 범위 -80 ~ 80 (°)
+TFS_GAINS = {
+    'distance_min': 300,        # 이 당김 거리(mm) 미만이면 정지 (와이어가 느슨함)
+    'distance_full': 1500,      # 이 당김 거리(mm) 이상이면 최대 속도
+    'max_speed': 300,           # 최대 전진 속도 (mm/s)
+    'angle_deadband': 2,        # 이 각도(°) 이하는 직진으로 봄 (센서 떨림)
+    'angle_slowdown': 0.5,      # 각도 최대(±80°)에서 전진 속도 감소 비율 (각도 제곱에 비례)
+    # (전진 속도 mm/s, 1° 당 바퀴 속도 차 mm/s): 사이 값은 직선 보간, 빠를수록 작은 이득으로 진동 억제
+    'turn_schedule': ((0, 3.0), (150, 2.5), (300, 2.0)),
+    'accel': 400.0,             # 전진 속도 변화율 한계 (mm/s^2)
+    'turn_accel': 600.0,        # 바퀴 속도 차 변화율 한계 (mm/s^2)
+}
+TFS_MAX_DT = 0.2                # 가속도 제한 계산에 쓰는 최대 호출 간격 (s, 정지 후 재시작 시 튐 방지)
+
+# 장애물 속도 조절 (ObstacleGovernor): 허용 속도 = 장애물 속도 + (거리 - stop_distance - standoff) / ttc
+OBSTACLE_GAINS = {
+    'stop_distance': 150,       # 최후 수단 정지 거리 (mm), 이보다 가까우면 즉시 정지 후 해제 조건까지 유지
+    'standoff': 75,             # 정지 거리 앞에 남겨 둘 여유 (mm), 감속해서 멈추거나 따라가는 목표 간격 (라이다 잡음 여유)
+    'ttc': 0.5,                 # 목표 충돌 예상 시간 (s), 0 이면 감속 없이 정지 거리만 사용 (기존 방식)
+    'release_margin': 50,       # 정지 해제: 거리가 stop_distance + release_margin 이상이고
+    'release_time': 0.5,        #   그 상태가 이 시간(s) 동안 유지될 때
+    'release_accel': 1500.0,    # 허용 속도가 올라가는 최대 기울기 (mm/s^2, 내려갈 때는 즉시, 재가속은 차량 가속 한계가 정함)
+}
+
+# RF 태그 구간 속도 프로파일 (SpeedProfilePlanner)
+SPEED_PROFILE_GAINS = {
+    'accel': 300.0,             # 가속 한계 (mm/s^2)
+    'decel': 300.0,             # 감속 한계 (mm/s^2)
+    'jerk': 1500.0,             # 가속도 변화 한계 (mm/s^3)
+    'margin': 100,              # 느린 구간 태그보다 이만큼 앞에서 감속을 끝냄 (mm, 지도/Odometer 위치 오차 여유)
+    'default_speed': 50,        # 경로 위치를 모를 때 속도 제한 (mm/s, 태그 미인식 시 기존 기본값과 같음)
+}
+PROFILE_MAX_DT = 0.2            # 프로파일 적분에 쓰는 최대 호출 간격 (s, 정지 후 재시작 시 튐 방지)
+
+
+class LineController:
+    """
+    표 기반 라인 추종 제어기 (PD + 피드포워드), e = LinePos / 15 (-1 ~ 1)
+    - 피드포워드: 편차가 클수록 전진 속도를 줄임   v = limit * (1 - slowdown * e^2)
+    - P: 바퀴 속도 차 = (kp * v + turn_min) * e     (같은 편차에 같은 곡률로 조향, 속도를 올려도 안정)
+    - D: 바퀴 속도 차 += kd * (LinePos - 직전 LinePos)  (고정 주기 루프 기준 샘플 간 변화량)
+    - 좌/우 바퀴 = v ± 바퀴 속도 차, 빠른 쪽 바퀴가 limit 를 넘으면 두 바퀴를 같이 낮춰 회전량 유지
+    - 모든 LinePos(-15..15) x 속도 제한별 (v, P 조향) 과 변화량(-30..30)별 D 조향은 표로 미리 계산,
+      set_gains() 로 이득이 바뀔 때만 다시 계산 (LINE_SPEED_STEP 간격 밖의 속도 제한은 처음 쓸 때 계산)
+    - LinePos 양수(라인이 오른쪽)이면 왼쪽 바퀴가 빨라져 오른쪽으로 회전
+    """
+
+    def __init__(self, gains: Optional[dict] = None, max_speed: int = SPEED_LIMIT):
+        self.max_speed = max_speed
+        self.gains = dict(LINE_GAINS)
+        self._prev = None
+        self.set_gains(**(gains or {}))
+
+    def set_gains(self, **gains):
+        """이득 변경 후 표 다시 계산 (알 수 없는 이름은 ValueError)"""
+        unknown = set(gains) - set(LINE_GAINS)
+        if unknown:
+            raise ValueError(f"알 수 없는 라인 제어 이득: {sorted(unknown)}")
+        self.gains.update(gains)
+        kd = self.gains['kd']
+        self._d_steer = [kd * de for de in range(-2 * LINE_POS_MAX, 2 * LINE_POS_MAX + 1)]
+        self._rows = {}
+        for limit in range(0, self.max_speed + 1, LINE_SPEED_STEP):
+            self._rows[limit] = self._build_row(limit)
+
+    def _build_row(self, limit: int) -> list:
+        kp, turn_min, slowdown = self.gains['kp'], self.gains['turn_min'], self.gains['slowdown']
+        row = []
+        for pos in range(-LINE_POS_MAX, LINE_POS_MAX + 1):
+            e = pos / LINE_POS_MAX
+            v = limit * (1.0 - slowdown * e * e)
+            row.append((v, (kp * v + turn_min) * e if limit > 0 else 0.0))
+        return row
+
+    def table(self, limit: int) -> List[Tuple[int, int]]:
+        """LinePos -15..15 에 대한 (vl, vr) 출력 (LinePos 변화량 0 기준, 화면 표시/점검용)"""
+        row = self._rows.get(limit) or self._rows.setdefault(limit, self._build_row(limit))
+        return [self._mix(v, steer, limit) for v, steer in row]
+
+    def reset(self):
+        """정지/재출발 시 호출 (직전 LinePos 를 잊어 재출발 첫 주기에 D 항이 튀지 않게 함)"""
+        self._prev = None
+
+    @staticmethod
+    def _mix(v: float, steer: float, limit: int) -> Tuple[int, int]:
+        vl, vr = v + steer, v - steer
+        excess = max(vl, vr) - limit
+        if excess > 0:
+            vl -= excess
+            vr -= excess
+        return int(max(-limit, vl)), int(max(-limit, vr))
+
+    def update(self, line_pos: int, limit: int) -> Tuple[int, int]:
+        """LinePos 와 속도 제한(mm/s)으로 (좌, 우) 바퀴 속도 계산"""
+        pos = max(-LINE_POS_MAX, min(LINE_POS_MAX, int(line_pos)))
+        limit = max(0, min(self.max_speed, int(limit)))
+        row = self._rows.get(limit) or self._rows.setdefault(limit, self._build_row(limit))
+        v, steer = row[pos + LINE_POS_MAX]
+        if self._prev is not None and limit > 0:
+            steer += self._d_steer[pos - self._prev + 2 * LINE_POS_MAX]
+        self._prev = pos
+        return self._mix(v, steer, limit)
+
+
+class TfsController:
+    """
+    TFS(와이어 당김 센서) 추종 제어기: TfsAngle / TfsDistance 로 전진 속도와 회전을 함께 계산
+    - 전진 속도: distance_min ~ distance_full 구간에서 0 -> max_speed 로 선형 증가, 각도가 클수록 감속
+    - 회전: 바퀴 속도 차 = 이득(현재 전진 속도) * 각도, 이득은 turn_schedule 점들 사이를 직선 보간
+      (고정 배율 대신 빠를수록 작은 이득 -> 걸어가는 작업자를 빠르게 따라가도 좌우로 흔들리지 않음)
+    - 전진 속도 / 바퀴 속도 차는 accel / turn_accel 가속도 한계로 목표를 따라감 (clock 시각 기준)
+    - distance_min 미만이면 목표 0 으로 감속 정지, 빠른 쪽 바퀴가 max_speed 를 넘으면 두 바퀴를 같이 낮춤
+    - 출력 (vl, vr) 은 기존 TFS 모드와 같은 방향 기준 (TfsAngle 양수 -> vl 증가), 송신은 agv.CLR(-vl, -vr)
+    """
+
+    def __init__(self, gains: Optional[dict] = None, clock=SYSTEM_CLOCK):
+        self.gains = dict(TFS_GAINS)
+        self._clock = clock
+        self.set_gains(**(gains or {}))
+        self.reset()
+
+    def set_gains(self, **gains):
+        unknown = set(gains) - set(TFS_GAINS)
+        if unknown:
+            raise ValueError(f"알 수 없는 TFS 제어 이득: {sorted(unknown)}")
+        self.gains.update(gains)
+        schedule = sorted(self.gains['turn_schedule'])
+        self._sched_v = [v for v, _ in schedule]
+        self._sched_k = [k for _, k in schedule]
+
+    def reset(self):
+        """정지 상태에서 다시 시작 (현재 속도/회전 0)"""
+        self.speed = 0.0
+        self.turn = 0.0
+        self._last = None
+
+    def turn_gain(self, speed: float) -> float:
+        """전진 속도에 따른 1° 당 바퀴 속도 차 (turn_schedule 직선 보간, 범위 밖은 양 끝 값)"""
+        xs, ks = self._sched_v, self._sched_k
+        i = bisect.bisect_right(xs, speed)
+        if i == 0:
+            return ks[0]
+        if i == len(xs):
+            return ks[-1]
+        x0, x1 = xs[i - 1], xs[i]
+        return ks[i - 1] + (ks[i] - ks[i - 1]) * (speed - x0) / (x1 - x0)
+
+    def update(self, angle: int, distance: int) -> Tuple[int, int]:
+        """TfsAngle(°), TfsDistance(mm) 로 (vl, vr) 계산"""
+        g = self.gains
+        now = self._clock.now()
+        dt = 0.0 if self._last is None else min(TFS_MAX_DT, max(0.0, now - self._last))
+        self._last = now
+
+        angle = max(-TFS_ANGLE_MAX, min(TFS_ANGLE_MAX, angle))
+        if abs(angle) <= g['angle_deadband']:
+            angle = 0
+        if distance < g['distance_min']:
+            speed_target = turn_target = 0.0
+        else:
+            ratio = min(1.0, (distance - g['distance_min']) / max(1, g['distance_full'] - g['distance_min']))
+            a = angle / TFS_ANGLE_MAX
+            speed_target = g['max_speed'] * ratio * (1.0 - g['angle_slowdown'] * a * a)
+            turn_target = self.turn_gain(self.speed) * angle
+
+        step = g['accel'] * dt
+        self.speed += max(-step, min(step, speed_target - self.speed))
+        step = g['turn_accel'] * dt
+        self.turn += max(-step, min(step, turn_target - self.turn))
+
+        vl, vr = self.speed + self.turn, self.speed - self.turn
+        excess = max(vl, vr) - g['max_speed']
+        if excess > 0:
+            vl -= excess
+            vr -= excess
+        limit = g['max_speed']
+        return int(max(-limit, vl)), int(max(-limit, vr))
+
+
+class ObstacleGovernor:
+    """
+    충돌 예상 시간(TTC) 기반 장애물 속도 조절기: update() 가 돌려주는 허용 속도(mm/s)로 주행 속도 제한을 낮춤
+    - 접근 속도 = -d(LidarDistance)/dt (FrameFilter.rate, 없으면 자기 속도), 장애물 속도 = 자기 속도 - 접근 속도
+      (TTC = (거리 - stop_distance) / 접근 속도, 멀어지는 중이면 inf)
+    - 허용 속도 = 장애물 속도 + (거리 - stop_distance - standoff) / ttc
+      -> 정지 장애물 앞에서는 standoff 간격을 두고 부드럽게 멈추고, 느리게 가는 장애물은 그 속도로 따라감
+    - 거리 < stop_distance 이면 stopped (최후 수단 정지), 거리 >= stop_distance + release_margin 이
+      release_time 동안 유지되어야 해제 (해제 직후 다시 정지하는 반복 방지)
+    - 허용 속도는 내려갈 때 즉시, 올라갈 때 release_accel 기울기로 (clock 시각 기준)
+    """
+
+    def __init__(self, gains: Optional[dict] = None, max_speed: int = SPEED_LIMIT, clock=SYSTEM_CLOCK):
+        self.gains = dict(OBSTACLE_GAINS)
+        self.max_speed = max_speed
+        self._clock = clock
+        self.set_gains(**(gains or {}))
+        self.reset()
+
+    def set_gains(self, **gains):
+        unknown = set(gains) - set(OBSTACLE_GAINS)
+        if unknown:
+            raise ValueError(f"알 수 없는 장애물 조절 설정: {sorted(unknown)}")
+        self.gains.update(gains)
+
+    def reset(self):
+        self.limit = float(self.max_speed)
+        self.stopped = False
+        self.ttc = float('inf')
+        self.stops = 0
+        self._clear_since = None
+        self._last = None
+
+    def update(self, distance: int, speed: int, distance_rate: Optional[float] = None) -> float:
+        """LidarDistance(mm), Speed(mm/s), LidarDistance 변화율(mm/s) 로 허용 속도(mm/s) 계산"""
+        g = self.gains
+        now = self._clock.now()
+        dt = 0.0 if self._last is None else max(0.0, now - self._last)
+        self._last = now
+
+        if self.stopped:
+            if distance >= g['stop_distance'] + g['release_margin']:
+                if self._clear_since is None:
+                    self._clear_since = now
+                if now - self._clear_since >= g['release_time']:
+                    self.stopped = False
+            else:
+                self._clear_since = None
+        elif distance < g['stop_distance']:
+            self.stopped = True
+            self.stops += 1
+            self._clear_since = None
+
+        speed = abs(speed)
+        closing = speed if distance_rate is None else -distance_rate
+        gap = distance - g['stop_distance'] - g['standoff']
+        self.ttc = max(0.0, distance - g['stop_distance']) / closing if closing > 1.0 else float('inf')
+        if self.stopped:
+            target = 0.0
+        elif g['ttc'] <= 0:
+            target = float(self.max_speed)
+        else:
+            target = max(0.0, speed - closing) + max(0.0, gap) / g['ttc']
+        target = min(float(self.max_speed), target)
+
+        if target < self.limit:
+            self.limit = target
+        else:
+            self.limit = min(target, self.limit + g['release_accel'] * dt)
+        return self.limit
+
+
+class SpeedProfilePlanner:
+    """
+    RF 태그 구간 속도 제한을 앞까지 보고 만드는 속도 프로파일 (태그를 읽은 뒤가 아니라 느린 구간 앞에서 감속)
+    - route: [{'id': 태그 번호(RF_tag1), 's': 경로 위치(mm), 'speed': 그 태그부터 적용되는 속도 제한(mm/s)}, ...]
+      (서버 /waypoints 형식, loop_length 를 주면 순환 경로)
+    - 경로 위치: 태그를 읽으면 그 태그의 s 로 맞추고, 다음 태그까지는 Odometer 증가량(엔코더 count, mm_per_count 배)으로 추정
+    - 속도 상한(s) = min(현재 구간 제한, 앞 구간마다 sqrt(v^2 + 2 * decel * (구간 시작 - margin - lead - s)))
+      lead = 현재 속도 * decel / jerk (감속도를 jerk 기울기로 올리는 동안 가는 거리)
+    - 출력 속도는 가속/감속 한계와 jerk 한계 안에서 상한을 따라감 (clock 시각 기준)
+    - 경로가 없거나 위치를 모르면(start_s=None 이고 경로의 태그를 아직 못 읽음) 읽은 태그의 속도 제한(RF_tag2)을
+      그대로 사용 (기존 방식, 태그 미인식 시 default_speed)
+    """
+
+    def __init__(self, route: Optional[list] = None, gains: Optional[dict] = None, loop_length: Optional[float] = None,
+                 mm_per_count: float = ODOMETER_MM_PER_COUNT, start_s: Optional[float] = None, clock=SYSTEM_CLOCK):
+        self.gains = dict(SPEED_PROFILE_GAINS)
+        self.mm_per_count = mm_per_count
+        self._clock = clock
+        self.set_gains(**(gains or {}))
+        self.set_route(route, loop_length, start_s)
+
+    def set_gains(self, **gains):
+        unknown = set(gains) - set(SPEED_PROFILE_GAINS)
+        if unknown:
+            raise ValueError(f"알 수 없는 속도 프로파일 설정: {sorted(unknown)}")
+        self.gains.update(gains)
+
+    def set_route(self, route: Optional[list], loop_length: Optional[float] = None, start_s: Optional[float] = None):
+        """경로 교체 (위치는 start_s, None 이면 경로의 태그를 읽을 때까지 모름)"""
+        points = sorted(route or [], key=lambda wp: wp['s'])
+        self.route = points
+        self.loop_length = loop_length
+        self._starts = [float(wp['s']) for wp in points]
+        self._limits = [float(wp['speed']) for wp in points]
+        self._tag_s = {wp['id']: float(wp['s']) for wp in points}
+        self.s = start_s
+        self._odo = None
+        self._tag = None
+        self.reset()
+
+    def reset(self):
+        """정지 상태에서 다시 시작 (출력 속도/가속도 0, 경로 위치는 유지)"""
+        self.speed = 0.0
+        self.accel = 0.0
+        self.ceiling = 0.0
+        self._last = None
+
+    def zone_limit(self, s: float) -> float:
+        """경로 위치 s 가 속한 구간의 속도 제한"""
+        i = bisect.bisect_right(self._starts, s) - 1
+        if i < 0:
+            return self._limits[-1] if self.loop_length else float(self.gains['default_speed'])
+        return self._limits[i]
+
+    def speed_ceiling(self, s: float, speed: float = 0.0) -> float:
+        """경로 위치 s 에서 앞 구간 제한까지 감속이 가능한 최대 속도"""
+        g = self.gains
+        ceiling = self.zone_limit(s)
+        lead = speed * g['decel'] / g['jerk']
+        n = len(self._starts)
+        i = bisect.bisect_right(self._starts, s)
+        for k in range(n if self.loop_length else n - i):
+            j = i + k
+            start = self._starts[j % n] + (j // n) * (self.loop_length or 0.0)
+            d = start - g['margin'] - lead - s
+            if d > 0 and 2.0 * g['decel'] * d >= ceiling * ceiling:
+                break       # 이 구간부터는 더 멀어서 제한이 걸리지 않음
+            limit = self._limits[j % n]
+            ceiling = min(ceiling, math.sqrt(limit * limit + 2.0 * g['decel'] * max(0.0, d)))
+        return ceiling
+
+    def locate(self, odometer: int, tag_id: int) -> Optional[float]:
+        """태그/Odometer 로 경로 위치(mm) 갱신 후 반환 (모르면 None)"""
+        if self._odo is not None and self.s is not None:
+            self.s += abs(odometer - self._odo) * self.mm_per_count     # 진행 방향과 관계없이 주행 거리
+        self._odo = odometer
+        if tag_id != self._tag:
+            self._tag = tag_id
+            if tag_id and tag_id in self._tag_s:     # 0: 태그 미인식
+                self.s = self._tag_s[tag_id]
+        if self.loop_length and self.s is not None:
+            self.s %= self.loop_length
+        return self.s
+
+    def update(self, odometer: int, tag_id: int, tag_limit: int) -> float:
+        """Odometer(count), 읽은 태그 번호(RF_tag1)와 그 속도 제한(RF_tag2)으로 속도 제한(mm/s) 계산"""
+        g = self.gains
+        now = self._clock.now()
+        dt = 0.0 if self._last is None else min(PROFILE_MAX_DT, max(0.0, now - self._last))
+        self._last = now
+
+        s = self.locate(odometer, tag_id) if self.route else None
+        if s is None:
+            self.ceiling = float(tag_limit if tag_id else g['default_speed'])
+        else:
+            self.ceiling = self.speed_ceiling(s, self.speed)
+
+        # 가속도는 jerk 한계로 목표 가속도를 따라가고, 목표 가속도는 상한과의 차이를 jerk 로 줄일 수 있는 크기
+        error = self.ceiling - self.speed
+        a_max = g['accel'] if error > 0 else g['decel']
+        want = math.copysign(min(a_max, math.sqrt(2.0 * g['jerk'] * abs(error))), error)
+        step = g['jerk'] * dt
+        self.accel += max(-step, min(step, want - self.accel))
+        self.speed += self.accel * dt
+        if (error > 0) != (self.ceiling - self.speed > 0):
+            self.speed, self.accel = self.ceiling, 0.0      # 상한을 넘어선 경우 상한에 맞춤
+        self.speed = max(0.0, self.speed)
+        return self.speed
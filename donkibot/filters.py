@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""필드별 센서 필터 (FrameFilter)"""
+
+import bisect
+import collections
+from typing import Optional
+
+from .clock import SYSTEM_CLOCK
+from .frames import STSFrame, STS_FIELD_NAMES
+
+# 필드별 필터 단계 (순서대로 적용): ('outlier', 최대 변화량), ('median', 창 크기), ('ema', alpha)
+SENSOR_FILTERS = {
+    'LidarDistance': (('median', 3),),                      # 한 프레임짜리 튐 제거 (지연 1 프레임)
+    'TfsAngle': (('outlier', 25), ('ema', 0.5)),            # 각도 떨림이 바퀴 속도 차로 바로 가지 않게
+    'TfsDistance': (('outlier', 500), ('median', 3), ('ema', 0.5)),
+}
+FILTER_OUTLIER_HOLD = 3         # 급변 거부 후 이만큼 연속으로 같은 쪽 값이 오면 실제 변화로 받아들임
+FILTER_RATE_ALPHA = 0.3         # 변화율 추정 EMA 계수
+
+
+class EmaFilter:
+    """지수 이동 평균: y += alpha * (x - y), 첫 값은 그대로"""
+
+    def __init__(self, alpha: float):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"EMA alpha 는 (0, 1] 범위여야 합니다: {alpha}")
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def __call__(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class MedianFilter:
+    """최근 window 개 값의 중앙값 (정렬된 창을 bisect 로 유지, 창 크기가 작아 프레임당 상수 시간)"""
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError(f"중앙값 창 크기는 1 이상이어야 합니다: {window}")
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._values = collections.deque()
+        self._sorted = []
+
+    def __call__(self, x: float) -> float:
+        if len(self._values) == self.window:
+            del self._sorted[bisect.bisect_left(self._sorted, self._values.popleft())]
+        self._values.append(x)
+        bisect.insort(self._sorted, x)
+        return self._sorted[len(self._sorted) // 2]
+
+
+class OutlierFilter:
+    """
+    급변 거부: 직전 통과 값과 max_step 넘게 다르면 직전 값을 유지 (rejected 집계)
+    - 같은 방향으로 hold 회 연속 벗어나면 실제 변화로 보고 새 값을 받아들임
+    """
+
+    def __init__(self, max_step: float, hold: int = FILTER_OUTLIER_HOLD):
+        self.max_step = max_step
+        self.hold = hold
+        self.rejected = 0
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self._streak = 0
+        self._side = 0
+
+    def __call__(self, x: float) -> float:
+        if self.value is None or abs(x - self.value) <= self.max_step:
+            self.value = x
+            self._streak = 0
+            return x
+        side = 1 if x > self.value else -1
+        self._streak = self._streak + 1 if side == self._side else 1
+        self._side = side
+        if self._streak >= self.hold:
+            self.value = x
+            self._streak = 0
+            return x
+        self.rejected += 1
+        return self.value
+
+
+FILTER_STAGES = {'ema': EmaFilter, 'median': MedianFilter, 'outlier': OutlierFilter}
+
+
+class FrameFilter:
+    """
+    STS 프레임 필드별 필터 단계 + 변화율 추정 (Comm 과 제어기 사이)
+    - config: {필드 이름: ((단계 이름, 인자), ...)} (기본 SENSOR_FILTERS), 설정에 없는 필드는 그대로 통과
+    - 단계: 'outlier'(급변 거부), 'median'(이동 중앙값), 'ema'(지수 이동 평균), 모두 프레임당 상수 시간
+    - attach(comm): Comm 이 프레임을 통지하기 전에 update() 를 호출하므로, wait_for_frame() 으로 깨어난
+      제어 루프가 get_latest_data() 로 읽는 값은 항상 그 프레임까지 반영된 필터 값
+    - 필터 값은 정수 필드에 맞춰 반올림, rate(필드) 는 필터 값 기준 초당 변화량 (EMA 평활)
+    """
+
+    def __init__(self, config: Optional[dict] = None, clock=SYSTEM_CLOCK, rate_alpha: float = FILTER_RATE_ALPHA):
+        config = SENSOR_FILTERS if config is None else config
+        unknown = set(config) - set(STS_FIELD_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 STS 필드: {sorted(unknown)}")
+        self._clock = clock
+        self._chains = {}
+        for field, stages in config.items():
+            chain = []
+            for name, arg in stages:
+                if name not in FILTER_STAGES:
+                    raise ValueError(f"알 수 없는 필터 단계: {name}")
+                chain.append(FILTER_STAGES[name](arg))
+            self._chains[field] = chain
+        self._rate_alpha = rate_alpha
+        self._comm = None
+        self.reset()
+
+    def reset(self):
+        for chain in self._chains.values():
+            for stage in chain:
+                stage.reset()
+        self.raw = STSFrame()
+        self.latest = STSFrame()
+        self.count = 0
+        self._rates = dict.fromkeys(self._chains, 0.0)
+        self._values = dict.fromkeys(self._chains)
+        self._last_t = None
+
+    def update(self, frame: STSFrame, t: Optional[float] = None) -> STSFrame:
+        """프레임 하나를 필터에 넣고 필터된 프레임 반환 (t: 수신 시각, 생략 시 clock.now())"""
+        t = self._clock.now() if t is None else t
+        dt = None if self._last_t is None else t - self._last_t
+        filtered = {}
+        for field, chain in self._chains.items():
+            value = getattr(frame, field)
+            for stage in chain:
+                value = stage(value)
+            prev = self._values[field]
+            if prev is not None and dt:
+                rate = (value - prev) / dt
+                self._rates[field] += self._rate_alpha * (rate - self._rates[field])
+            self._values[field] = value
+            filtered[field] = int(round(value))
+        self._last_t = t
+        self.raw = frame
+        self.latest = frame._replace(**filtered)
+        self.count += 1
+        return self.latest
+
+    def get_latest_data(self) -> STSFrame:
+        """Comm.get_latest_data() 와 같은 형식의 필터된 최신 프레임 (attach 중이면 Comm 의 지연 추적에도 기록)"""
+        if self._comm is not None:
+            self._comm.get_latest_data()
+        return self.latest
+
+    def rate(self, field: str) -> float:
+        """필드의 초당 변화량 추정값 (예: rate('TfsDistance') > 0 이면 작업자가 멀어지는 중)"""
+        return self._rates[field]
+
+    def rejected(self) -> dict:
+        """필드별 급변 거부 횟수"""
+        return {field: sum(stage.rejected for stage in chain if isinstance(stage, OutlierFilter))
+                for field, chain in self._chains.items()}
+
+    def attach(self, comm: 'Comm') -> 'FrameFilter':
+        comm.set_frame_filter(self)
+        self._comm = comm
+        return self
+
+    def detach(self):
+        if self._comm is not None:
+            self._comm.set_frame_filter(None)
+            self._comm = None
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+STS/CLR 프레임 형식: STSFrame, ASCII/바이너리 인코딩, 증분 디코더(STSDecoder)
+
+$STS,1,95,12,0,532, -15, 420, 120, 34567,123,255\r\n
+"""
+
+import binascii
+import math
+import struct
+from typing import List, NamedTuple, Optional, Tuple
+
+SPEED_LIMIT = 300
+
+# Odometer 는 엔코더 count (바퀴 1회전 = ODOMETER_COUNTS_PER_REV), 거리(mm) = Odometer * ODOMETER_MM_PER_COUNT
+ODOMETER_COUNTS_PER_REV = 100000
+WHEEL_DIAMETER_MM = 85.0    # 구동 바퀴 지름 (mm, 차량에 맞게 변경)
+ODOMETER_MM_PER_COUNT = math.pi * WHEEL_DIAMETER_MM / ODOMETER_COUNTS_PER_REV
+
+STS_HEADER = b'$STS,'
+STS_TERMINATOR = b'\r\n'
+STS_MAX_FRAME_LEN = 128     # 정상 프레임은 약 50~70 byte, 이보다 길면 손상된 프레임으로 간주
+
+# 로그용 고정 길이 바이너리 행: 11개 필드 모두 little-endian int32 (44 byte)
+STS_ROW_STRUCT = struct.Struct('<11i')
+
+# 바이너리 링크 프레임: AA 55 | 종류(1) | 길이(1) | payload | CRC16(2, 종류~payload, CCITT 0xFFFF)
+BIN_SYNC = b'\xaa\x55'
+BIN_TYPE_STS = 0x53         # 'S': STM -> PC 상태
+BIN_TYPE_CLR = 0x43         # 'C': PC -> STM 바퀴 속도 명령
+# STS payload 20 byte: agvStatus, SOC, LinePos, EmgFlag (1 byte), LidarDistance ~ Speed (2 byte),
+# Odometer (4 byte), RF_tag1, RF_tag2 (2 byte) -> 프레임 26 byte (ASCII 는 약 40~60 byte)
+BIN_STS_STRUCT = struct.Struct('<bBbBHhHhiHH')
+BIN_CLR_STRUCT = struct.Struct('<hh')
+BIN_CRC_STRUCT = struct.Struct('<H')
+BIN_HEADER_LEN = len(BIN_SYNC) + 2
+BIN_PAYLOAD_LEN = {BIN_TYPE_STS: BIN_STS_STRUCT.size, BIN_TYPE_CLR: BIN_CLR_STRUCT.size}
+
+FRAMING_ASCII = 'ascii'     # 기존 "$STS,...\r\n" / "$CLR,...\r\n" 만 사용
+FRAMING_AUTO = 'auto'       # 바이너리 전환을 요청하고, 상대가 응답하지 않으면 ASCII 유지
+MODE_BIN_COMMAND = '$MODE,BIN'
+MODE_ASCII_COMMAND = '$MODE,ASCII'
+
+
+# 데이터 구조를 명확하게 정의하기 위해 NamedTuple 사용
+# (튜플 기반이라 프레임당 할당이 작고, 필드 이름으로 접근하는 기존 코드는 그대로 동작)
+class STSFrame(NamedTuple):
+    agvStatus: int = 0      # 0: agv_mode, 1: python_mode, 2: ros_mode 
+    SOC: int = 0            # 0 -100 %
+    LinePos: int = 0        #  Left -15:   0     15: right
+    EmgFlag: int = 0        # 0: release, 1: pushed
+    LidarDistance: int = 0  #  200 ~ 1200 mm
+    TfsAngle: int = 0       #  -80 ~ 80
+    TfsDistance: int = 0    #  0 ~ 2800 mm
+    Speed: int = 0          #  2 wheel average /2
+    Odometer: int = 0       #  count 값   100,000cnt/rev
+    RF_tag1: int = 0        # Mission index
+    RF_tag2: int = 0        # 속도 제한 mm/s 
+
+    # 클래스 메서드로 파싱 로직을 분리하여 코드 구조 개선
+    @classmethod
+    def parser(cls, line: str) -> Optional['STSFrame']:
+        """
+        "$STS,..." 문자열 한 줄을 파싱하여 STSFrame 객체를 생성합니다.
+        형식이 맞지 않으면 None을 반환합니다.
+        """
+        if not line.startswith("$STS,") or not line.endswith("\r\n"):
+            return None
+
+        # "$STS," 와 "\r\n" 부분을 제거하고 ',' 로 분리
+        parts = line[5:-2].split(',')       
+
+        # 프로토콜 필드 개수 확인 (11개)
+        if len(parts) != len(cls._fields):
+            return None
+
+        try:
+            # 모든 필드를 정수로 변환
+            int_parts = [int(p.strip()) for p in parts]
+            return cls._make(int_parts)
+
+        except (ValueError, TypeError) as e:
+            print(f"[Parser Error] 데이터 변환 실패: {e}, 원본: {parts}")
+            return None
+
+    def to_bytes(self) -> bytes:
+        """로그 기록용 44 byte 바이너리 행으로 변환 (int32 범위를 넘으면 struct.error)"""
+        return STS_ROW_STRUCT.pack(*self)
+
+    @classmethod
+    def from_bytes(cls, data, offset: int = 0) -> 'STSFrame':
+        """to_bytes() 로 만든 바이너리 행(bytes/bytearray/memoryview)에서 STSFrame 복원"""
+        return cls._make(STS_ROW_STRUCT.unpack_from(data, offset))
+
+
+def format_clr(vl: int, vr: int) -> str:
+    """SPEED_LIMIT에 따라 속도 제한을 적용한 $CLR 명령 문자열 생성"""
+    send_vl = max(-SPEED_LIMIT, min(SPEED_LIMIT, vl))
+    send_vr = max(-SPEED_LIMIT, min(SPEED_LIMIT, vr))
+    return f"$CLR,{send_vl},{send_vr}"
+
+
+def pack_binary_frame(frame_type: int, payload: bytes) -> bytes:
+    """종류/payload 에 동기 byte, 길이, CRC16 을 붙인 바이너리 프레임"""
+    body = bytes((frame_type, len(payload))) + payload
+    return BIN_SYNC + body + BIN_CRC_STRUCT.pack(binascii.crc_hqx(body, 0xFFFF))
+
+
+def unpack_binary_frame(buf, start: int) -> Tuple[str, int, Optional[bytes], int]:
+    """
+    buf[start:] 의 바이너리 프레임 확인 -> (결과, 종류, payload, 다음 위치)
+    결과: 'ok', 'incomplete'(더 받아야 함), 'length'(알 수 없는 종류/길이), 'crc'
+    """
+    if len(buf) - start < BIN_HEADER_LEN:
+        return 'incomplete', 0, None, start
+    frame_type = buf[start + 2]
+    length = buf[start + 3]
+    if BIN_PAYLOAD_LEN.get(frame_type) != length:
+        return 'length', frame_type, None, start + 1
+    end = start + BIN_HEADER_LEN + length + BIN_CRC_STRUCT.size
+    if len(buf) < end:
+        return 'incomplete', frame_type, None, start
+    body = bytes(buf[start + 2:end - BIN_CRC_STRUCT.size])
+    if binascii.crc_hqx(body, 0xFFFF) != BIN_CRC_STRUCT.unpack_from(buf, end - BIN_CRC_STRUCT.size)[0]:
+        return 'crc', frame_type, None, start + 1
+    return 'ok', frame_type, body[2:], end
+
+
+def encode_sts_binary(frame: STSFrame) -> bytes:
+    """STSFrame -> 26 byte 바이너리 STS 프레임 (필드 범위를 넘으면 struct.error)"""
+    return pack_binary_frame(BIN_TYPE_STS, BIN_STS_STRUCT.pack(*frame))
+
+
+def encode_clr_binary(vl: int, vr: int) -> bytes:
+    """SPEED_LIMIT 을 적용한 10 byte 바이너리 CLR 프레임"""
+    send_vl = max(-SPEED_LIMIT, min(SPEED_LIMIT, vl))
+    send_vr = max(-SPEED_LIMIT, min(SPEED_LIMIT, vr))
+    return pack_binary_frame(BIN_TYPE_CLR, BIN_CLR_STRUCT.pack(send_vl, send_vr))
+
+
+def decode_clr(data: bytes) -> Optional[Tuple[int, int]]:
+    """송신할 CLR 명령(ASCII/바이너리)에서 (vl, vr) 추출, CLR 이 아니면 None"""
+    if data.startswith(b'$CLR,'):
+        vl, vr = data[5:].split(b',')
+        return int(vl), int(vr)
+    if data.startswith(BIN_SYNC):
+        result, frame_type, payload, _ = unpack_binary_frame(data, 0)
+        if result == 'ok' and frame_type == BIN_TYPE_CLR:
+            return BIN_CLR_STRUCT.unpack(payload)
+    return None
+
+
+STS_FIELD_COUNT = len(STSFrame._fields)
+STS_FIELD_NAMES = STSFrame._fields
+
+
+class STSDecoder:
+    """
+    시리얼 bytes 스트림을 증분으로 받아 STSFrame 으로 변환하는 디코더
+    - 재사용되는 bytearray 버퍼에 수신 데이터를 누적하고 "$STS," / "\r\n" 경계를 직접 탐색
+    - latin-1 문자열 변환, 필드별 strip 없이 bytes 를 바로 int() 로 변환
+    - 쓰레기 데이터나 잘린 프레임은 버리고 다음 "$STS," 헤더에서 재동기화
+      (잘린 프레임 뒤에 이어 붙은 정상 프레임은 버리지 않음)
+    - accept_binary=True 이면 같은 스트림에 섞여 오는 바이너리 STS 프레임도 처리
+      (CRC 가 맞지 않으면 동기 byte 다음 위치부터 다시 탐색)
+    """
+
+    def __init__(self, max_frame_len: int = STS_MAX_FRAME_LEN, accept_binary: bool = False):
+        self.max_frame_len = max_frame_len
+        self.accept_binary = accept_binary
+        self._buf = bytearray()
+        self.frame_count = 0
+        self.binary_count = 0       # 그중 바이너리 프레임 수
+        self.last_binary = False    # 마지막으로 디코딩한 프레임이 바이너리였는지
+        # 원인별 파싱 실패 카운터
+        self.errors = {
+            'garbage': 0,       # 헤더 앞의 알 수 없는 데이터 (byte 수)
+            'truncated': 0,     # 종료 문자 전에 다음 헤더가 나타난 잘린 프레임
+            'overflow': 0,      # 최대 길이 안에 종료 문자가 없는 프레임
+            'field_count': 0,   # 필드 개수 불일치
+            'value': 0,         # 정수 변환 실패
+            'crc': 0,           # 바이너리 프레임 CRC 불일치
+            'length': 0,        # 바이너리 동기 byte 뒤의 알 수 없는 종류/길이 (잡음 속 우연한 AA 55 포함)
+        }
+
+    def reset(self):
+        """버퍼에 남아 있는 미완성 데이터를 버림"""
+        del self._buf[:]
+
+    def feed(self, data: bytes) -> List[STSFrame]:
+        """
+        수신한 bytes 조각을 버퍼에 추가하고 완성된 프레임 목록을 반환합니다.
+        미완성 프레임은 다음 feed() 호출까지 버퍼에 남겨둡니다.
+        """
+        buf = self._buf
+        buf += data
+        frames = []
+        pos = 0
+        end_of_buf = len(buf)
+        start = None
+
+        while pos < end_of_buf:
+            if start is None or 0 <= start < pos:
+                # 이전에 찾은 헤더 위치가 아직 앞에 있으면 다시 탐색하지 않음
+                start = buf.find(STS_HEADER, pos)
+            if self.accept_binary:
+                bin_start = buf.find(BIN_SYNC, pos, start if start >= 0 else end_of_buf)
+                if bin_start >= 0:
+                    if bin_start > pos:
+                        self.errors['garbage'] += bin_start - pos
+                    result, frame_type, payload, pos = unpack_binary_frame(buf, bin_start)
+                    if result == 'incomplete':
+                        break
+                    if result == 'ok' and frame_type == BIN_TYPE_STS:
+                        frames.append(STSFrame._make(BIN_STS_STRUCT.unpack(payload)))
+                        self.binary_count += 1
+                        self.last_binary = True
+                    elif result != 'ok':
+                        self.errors[result] += 1
+                    continue
+
+            if start < 0:
+                # 헤더가 없으면 헤더 일부일 수 있는 꼬리만 남기고 버림
+                keep_from = max(pos, end_of_buf - (len(STS_HEADER) - 1))
+                dollar = buf.find(b'$', keep_from)
+                keep_from = dollar if dollar >= 0 else end_of_buf
+                if self.accept_binary and buf[-1] == BIN_SYNC[0]:
+                    # 동기 byte 첫 글자로 끝나면 그 byte 도 남김
+                    keep_from = min(keep_from, end_of_buf - 1)
+                self.errors['garbage'] += keep_from - pos
+                pos = keep_from
+                break
+
+            if start > pos:
+                self.errors['garbage'] += start - pos
+
+            body_start = start + len(STS_HEADER)
+            end = buf.find(STS_TERMINATOR, body_start, start + self.max_frame_len)
+            if end < 0:
+                if end_of_buf - start >= self.max_frame_len:
+                    # 종료 문자가 끝내 오지 않는 프레임: 헤더 이후부터 다시 탐색
+                    self.errors['overflow'] += 1
+                    pos = body_start
+                    continue
+                # 프레임이 아직 다 도착하지 않음
+                pos = start
+                break
+
+            parts = buf[body_start:end].split(b',')
+            if len(parts) == STS_FIELD_COUNT:
+                try:
+                    # int() 는 bytes 와 앞뒤 공백을 그대로 처리하므로 decode/strip 불필요
+                    frames.append(STSFrame._make(map(int, parts)))
+                    self.last_binary = False
+                    pos = end + len(STS_TERMINATOR)
+                    continue
+                except ValueError:
+                    cause = 'value'
+            else:
+                cause = 'field_count'
+
+            # 파싱 실패 시에만 확인: 종료 문자 전에 다음 헤더가 있으면 현재 프레임은 잘린 것
+            # -> 버리지 말고 그 헤더에서 재동기화 (뒤따르는 정상 프레임 보존)
+            next_start = buf.rfind(STS_HEADER, body_start, end)
+            if next_start >= 0:
+                self.errors['truncated'] += 1
+                pos = next_start
+            else:
+                self.errors[cause] += 1
+                pos = end + len(STS_TERMINATOR)
+
+        del buf[:pos]
+        self.frame_count += len(frames)
+        return frames
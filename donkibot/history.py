@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""수신 프레임 링 버퍼 (FrameHistory)"""
+
+import numpy as np
+from typing import Optional
+
+from .frames import STSFrame, STS_FIELD_NAMES
+
+HISTORY_CAPACITY = 12000       # STM 의 STS 송신 주기(20 Hz) 기준 10분 보관 (미러 포함 약 0.9 MB)
+HISTORY_CAPACITY_MAX = 136000  # 115200 baud 최대 프레임율(약 226 frames/s) 기준 10분 (약 9.8 MB, history_capacity 로 지정)
+
+
+class FrameHistory:
+    """
+    수신한 모든 STSFrame 을 고정 크기 numpy 구조화 배열(열 단위)에 보관하는 링 버퍼
+    - 각 행: seq(수신 순번), t_rx(time.monotonic() 수신 시각), STSFrame 11개 필드
+    - 미리 할당된 배열에 덮어쓰므로 append 는 O(1), 프레임 객체를 쌓아두지 않음
+    - 모든 행을 [i] 와 [i + capacity] 두 곳에 기록(미러링)하여
+      최근 n개 구간이 항상 연속된 메모리가 되도록 함 -> history()/since() 가 복사 없는 view 반환
+    - 반환된 view 는 링이 한 바퀴 돌면 새 데이터로 덮어써지므로 오래 보관하려면 .copy() 사용
+    - 필드는 int16 (Odometer 만 int32), 범위를 넘는 값은 잘라서(clip) 저장
+      -> 행당 36 byte, 기본 용량(12,000행, 미러 포함) 약 0.9 MB, HISTORY_CAPACITY_MAX(136,000행)는 약 9.8 MB
+    """
+
+    DTYPE = np.dtype(
+        [('seq', np.uint32), ('t_rx', np.float64)] +
+        [(name, np.int32 if name == 'Odometer' else np.int16) for name in STS_FIELD_NAMES])
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity 는 1 이상이어야 합니다.")
+        self.capacity = capacity
+        self._buf = np.zeros(capacity * 2, dtype=self.DTYPE)
+        self._next = 0          # 다음에 기록할 위치 (0 ~ capacity-1)
+        self._count = 0         # 보관 중인 행 수 (최대 capacity)
+        self.last_seq = 0
+        self._limits = [(np.iinfo(self.DTYPE[name]).min, np.iinfo(self.DTYPE[name]).max)
+                        for name in STS_FIELD_NAMES]
+
+    def __len__(self):
+        return self._count
+
+    def append(self, seq: int, t_rx: float, frame: STSFrame):
+        """프레임 1개를 기록 (가장 오래된 행을 덮어씀)"""
+        try:
+            row = (seq, t_rx) + frame
+            self._buf[self._next] = row
+        except OverflowError:
+            values = tuple(min(hi, max(lo, v)) for v, (lo, hi) in zip(frame, self._limits))
+            row = (seq, t_rx) + values
+            self._buf[self._next] = row
+        self._buf[self._next + self.capacity] = row
+
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        if self._count < self.capacity:
+            self._count += 1
+        self.last_seq = seq
+
+    def history(self, n: Optional[int] = None) -> np.ndarray:
+        """최근 n개 행의 view (오래된 것부터), n 생략 시 보관 중인 전체"""
+        count = self._count
+        n = count if n is None else max(0, min(n, count))
+        end = self._next if count < self.capacity else self._next + self.capacity
+        return self._buf[end - n:end]
+
+    def since(self, seq: int) -> np.ndarray:
+        """seq 보다 뒤에 수신된 행들의 view (이미 덮어써진 행은 제외)"""
+        return self.history(max(0, self.last_seq - seq))
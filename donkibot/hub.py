@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""여러 포트를 스레드 하나로 처리하는 SerialHub 와 포트별 Comm 호환 HubPort"""
+
+import collections
+import os
+import selectors
+import threading
+import time
+from typing import List
+
+from .clock import SYSTEM_CLOCK
+from .comm import Comm
+from .tx import TX_BUDGET_RATIO, TxScheduler
+
+
+class HubPort(Comm):
+    """
+    SerialHub.open() 이 돌려주는 포트 핸들 (Comm 과 같은 인터페이스)
+    - 수신 스레드/송신 스레드를 만들지 않고 허브의 selector 루프 하나에서 송수신
+    - latest_data, wait_for_frame(), subscribe(), CLR(), stats() 등은 Comm 과 동일하게 동작
+    """
+
+    def __init__(self, hub: 'SerialHub', port, baudrate=115200, **kwargs):
+        if kwargs.get('clock', SYSTEM_CLOCK) is not SYSTEM_CLOCK:
+            raise ValueError("SerialHub 포트는 실제 시간(SYSTEM_CLOCK)에서만 사용할 수 있습니다.")
+        self._hub = hub
+        super().__init__(port=port, baudrate=baudrate, **kwargs)
+
+    def _start_io(self, baudrate: int, tx_keepalive: float):
+        self.ser.timeout = 0        # 허브 루프에서 읽을 수 있는 만큼만 읽음
+        self._tx = TxScheduler(self._write, bytes_per_sec=baudrate / 10 * TX_BUDGET_RATIO,
+                               keepalive=tx_keepalive, threaded=False,
+                               on_submit=lambda: self._hub._wake(self), on_sent=self._on_clr_sent)
+        self._is_running = True
+        self._hub._call(self._hub._register, self)
+
+    def _on_readable(self):
+        """허브 루프에서 호출: 커널 버퍼에 도착한 데이터를 한 번의 read 로 가져와 디코딩"""
+        try:
+            chunk = os.read(self.ser.fileno(), 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._detach(f"수신 에러, 허브에서 분리합니다: {e}")
+            return
+        if not chunk:
+            # pty 끊김/USB 어댑터 분리는 예외 없이 0 byte 읽기로 나타남
+            self._detach("연결이 끊겼습니다, 허브에서 분리합니다.")
+            return
+        self._handle_chunk(chunk)
+
+    def _detach(self, reason: str):
+        """
+        USB 어댑터 분리 등: 계속 읽기 가능 상태로 남아 루프를 바쁘게 만들지 않도록 허브에서 분리하고
+        wait_for_frame() 대기자를 깨움
+        """
+        print(f"시리얼 포트 {self.ser.port} {reason}")
+        self._hub._unregister(self)
+        self._is_running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+
+    def destroy(self):
+        """남은 명령을 허브 루프가 보내도록 기다린 뒤 허브에서 분리하고 포트를 닫음"""
+        self._is_running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        self._tx.close()
+        self._hub._call(self._hub._unregister, self)
+        self.stop_capture()
+        if self.ser.is_open:
+            self.ser.close()
+
+
+class SerialHub:
+    """
+    여러 AGV 시리얼 포트를 스레드 하나(selector 루프)로 처리하는 허브 (POSIX 전용)
+    - hub.open(port) 으로 Comm 호환 HubPort 를 얻음, 포트 수와 관계없이 스레드는 1개
+    - 수신: 모든 포트 fd 를 selector 에 등록하고 데이터가 도착한 포트만 읽음 (유휴 시 CPU 사용 없음)
+    - 송신: 명령이 등록된 포트만 깨어나 송신, 대역폭 제한으로 미뤄진 송신은 가장 이른 시각에 맞춰 대기
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+        self._lock = threading.Lock()
+        self._tx_ready = set()      # 새 명령이 등록된 포트
+        self._calls = collections.deque()   # 허브 루프에서 실행할 (함수, 인자, 완료 이벤트)
+        self._woken = False
+        self._tx_due = {}           # 대역폭 제한으로 송신이 미뤄진 포트 -> 다시 확인할 시각
+        self.ports: List[HubPort] = []
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def open(self, port, baudrate=115200, **kwargs) -> HubPort:
+        """포트를 열어 허브에 등록하고 HubPort 반환 (kwargs 는 Comm 과 동일: framing, history_capacity 등)"""
+        return HubPort(self, port, baudrate, **kwargs)
+
+    def close(self):
+        """모든 포트를 닫고 허브 루프 종료"""
+        for hub_port in list(self.ports):
+            hub_port.destroy()
+        self._running = False
+        self._signal()
+        self._thread.join(1.0)
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _signal(self):
+        """루프 깨우기 (이미 깨운 상태면 pipe 에 다시 쓰지 않음, lock 안/밖 어디서든 호출 가능)"""
+        if not self._woken:
+            self._woken = True
+            try:
+                os.write(self._wake_w, b'\0')
+            except (BlockingIOError, OSError):
+                pass
+
+    def _wake(self, hub_port: HubPort):
+        """HubPort 송신 스케줄러에 명령이 등록됨"""
+        with self._lock:
+            self._tx_ready.add(hub_port)
+        self._signal()
+
+    def _call(self, func, hub_port: HubPort, timeout: float = 1.0):
+        """func(hub_port) 를 허브 루프 스레드에서 실행하고 완료까지 대기 (selector 변경은 루프에서만)"""
+        if threading.current_thread() is self._thread or not self._thread.is_alive():
+            func(hub_port)
+            return
+        done = threading.Event()
+        with self._lock:
+            self._calls.append((func, hub_port, done))
+        self._signal()
+        done.wait(timeout)
+
+    def _register(self, hub_port: HubPort):
+        self._selector.register(hub_port.ser.fileno(), selectors.EVENT_READ, hub_port)
+        self.ports.append(hub_port)
+
+    def _unregister(self, hub_port: HubPort):
+        if hub_port in self.ports:
+            self._selector.unregister(hub_port.ser.fileno())
+            self.ports.remove(hub_port)
+        self._tx_due.pop(hub_port, None)
+        self._tx_ready.discard(hub_port)
+
+    def _run(self):
+        while self._running:
+            # 이번에 송신을 확인할 포트: 새 명령이 들어온 포트 + 미뤄둔 시각이 지난 포트
+            now = time.monotonic()
+            with self._lock:
+                ready, self._tx_ready = self._tx_ready, set()
+                calls, self._calls = self._calls, collections.deque()
+                self._woken = False
+            for func, hub_port, done in calls:
+                try:
+                    func(hub_port)
+                except Exception as e:
+                    print(f"시리얼 허브 에러: {e}")
+                done.set()
+
+            ready.update(p for p, due in self._tx_due.items() if due <= now)
+            for hub_port in ready:
+                wait = hub_port._tx.poll()
+                if wait is None:
+                    self._tx_due.pop(hub_port, None)
+                else:
+                    self._tx_due[hub_port] = now + wait
+
+            timeout = None
+            if self._tx_due:
+                timeout = max(0.0, min(self._tx_due.values()) - time.monotonic())
+
+            for key, _ in self._selector.select(timeout):
+                hub_port = key.data
+                if hub_port is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                try:
+                    hub_port._on_readable()
+                except Exception as e:
+                    print(f"수신 루프 에러 ({hub_port.ser.port}): {e}")
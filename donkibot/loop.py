@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""고정 주기 루프(PeriodicScheduler, ControlLoop)와 curses 화면 갱신(ScreenRenderer)"""
+
+import threading
+import unicodedata
+from typing import Callable, Optional
+
+from .clock import SYSTEM_CLOCK
+from .stats import Histogram
+
+PERIOD_JITTER_BINS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50)       # 주기 루프 깨어남 지연 히스토그램 경계 (ms)
+PERIOD_EXEC_BINS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50)         # 주기 루프 1회 실행 시간 히스토그램 경계 (ms)
+
+# 고정 주기 루프 (PeriodicScheduler): 마감 시각을 놓친 주기의 처리 정책
+CATCHUP_SKIP = 'skip'           # 밀린 주기는 건너뛰고 다음 주기 경계에 맞춤 (제어 루프 기본값)
+CATCHUP_BURST = 'burst'         # 밀린 주기를 대기 없이 연달아 실행 (최대 max_burst 주기)
+PERIODIC_MAX_BURST = 3
+
+
+class PeriodicScheduler:
+    """
+    고정 주기 루프 스케줄러: 절대 마감 시각(시작 + n * period)까지 clock.sleep() 한 번으로 대기
+    - "time.time() 확인 -> sleep(0.005) -> continue" 폴링과 달리 주기마다 한 번만 깨어나고,
+      sleep 오차가 다음 주기로 누적되지 않음 (monotonic 시계 사용, VirtualClock 도 그대로 동작)
+    - 루프 맨 앞에서 tick() 호출: 직전 주기 실행 시간 기록 -> 다음 마감까지 대기 -> 깨어남 지연(지터) 기록
+    - 마감이 이미 지난 뒤 tick() 에 도착하면 overrun 으로 집계하고 catch_up 정책 적용
+      'skip' : 한 주기 이상 밀렸으면 밀린 주기를 건너뛰고 주기 경계에 다시 맞춤
+      'burst': 밀린 주기를 대기 없이 연달아 실행, max_burst 주기를 넘게 밀린 부분만 건너뜀
+    - tick(wait) 로 이벤트(새 프레임)를 기다리면 마감 전에 이벤트가 오는 즉시 깨어나 그 시각부터 다음 주기를 셈
+      -> 주기는 이벤트가 없을 때의 최대 간격(keepalive), events 는 이벤트로 시작한 주기 수
+    """
+
+    def __init__(self, period: float, clock=SYSTEM_CLOCK, catch_up: str = CATCHUP_SKIP,
+                 max_burst: int = PERIODIC_MAX_BURST):
+        if period <= 0:
+            raise ValueError(f"주기는 0보다 커야 합니다: {period}")
+        if catch_up not in (CATCHUP_SKIP, CATCHUP_BURST):
+            raise ValueError(f"알 수 없는 catch_up 정책: {catch_up}")
+        self.period = period
+        self.catch_up = catch_up
+        self.max_burst = max_burst
+        self._clock = clock
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.events = 0
+        self.jitter_ms = Histogram(PERIOD_JITTER_BINS_MS)
+        self.exec_ms = Histogram(PERIOD_EXEC_BINS_MS)
+        self._start = None
+        self._next = None           # 다음 주기의 마감(시작 예정) 시각
+        self._woke = None           # 이번 주기가 시작된 시각
+        self._busy = 0.0
+
+    def tick(self, wait: Optional[Callable[[float], bool]] = None) -> int:
+        """
+        다음 마감 시각까지 대기 후 반환, 반환값은 이번에 건너뛴 주기 수 (첫 호출은 대기 없이 시작)
+        wait: 남은 시간(s)을 받아 그 안에 이벤트가 오면 True 를 돌려주는 대기 함수 (clock.sleep 대신 사용)
+        """
+        now = self._clock.now()
+        if self._next is None:
+            self._start = self._next = now
+        else:
+            busy = now - self._woke
+            self.exec_ms.add(busy * 1000.0)
+            self._busy += busy
+
+        skipped = 0
+        late = now - self._next
+        if late > 0:
+            self.overruns += 1
+            behind = int(late // self.period)
+            if self.catch_up == CATCHUP_SKIP:
+                skipped = behind
+            elif behind > self.max_burst:
+                skipped = behind - self.max_burst
+            self._next += skipped * self.period
+            self.skipped += skipped
+            if wait is not None and wait(0.0):
+                self.events += 1    # 밀린 사이에 온 이벤트는 이번 주기에서 처리
+        elif late < 0:
+            if wait is None:
+                self._clock.sleep(-late)
+            elif wait(-late):
+                self._next = self._clock.now()      # 이벤트 시각을 이번 주기의 시작으로
+                self.events += 1
+            now = self._clock.now()
+
+        self.jitter_ms.add(max(0.0, now - self._next) * 1000.0)
+        self._woke = now
+        self._next += self.period
+        self.ticks += 1
+        return skipped
+
+    def stats(self) -> dict:
+        """주기 루프 통계 스냅샷 (utilization: 경과 시간 중 루프 본문 실행 비율)"""
+        elapsed = self._clock.now() - self._start if self._start is not None else 0.0
+        return {
+            'period_ms': self.period * 1000.0,
+            'catch_up': self.catch_up,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'events': self.events,
+            'rate_hz': self.ticks / elapsed if elapsed > 0 else 0.0,
+            'utilization': self._busy / elapsed if elapsed > 0 else 0.0,
+            'jitter_ms': self.jitter_ms.snapshot(),
+            'exec_ms': self.exec_ms.snapshot(),
+        }
+
+    def summary(self) -> str:
+        """curses 화면 표시용 한 줄 요약 (지터 평균/최대, 실행 시간 평균/최대)"""
+        jitter, busy = self.jitter_ms, self.exec_ms
+        return (f"주기 {self.period * 1000.0:.0f}ms | 지터 {jitter.total / max(jitter.count, 1):.2f}/{jitter.max:.2f}ms | "
+                f"실행 {busy.total / max(busy.count, 1):.2f}/{busy.max:.2f}ms | "
+                f"overrun {self.overruns} 건너뜀 {self.skipped}" + (f" 새 프레임 {self.events}" if self.events else ""))
+
+
+class ControlLoop:
+    """
+    제어 함수 step() 을 별도 스레드에서 PeriodicScheduler 주기로 실행하고, 반환값을 화면 표시용 스냅샷으로 공유
+    - curses 출력(터미널 I/O)은 표시 스레드에서만 하므로 SSH 등 느린 터미널이 제어 주기를 늘리지 않음
+    - step() 은 lock 을 잡은 상태에서 호출: 키 입력 처리처럼 다른 스레드에서 제어 상태를 바꿀 때도 lock 을 잡음
+    - step() 예외는 error 에 기록하고 다음 주기에 계속 실행
+    - name: 제어 스레드 이름, 이 스레드에서 낸 CLR 은 그 이름으로 지연 추적 (LatencyTracer)
+    - frames: wait_for_frame() 이 있는 Comm/BusComm 등을 주면 새 프레임마다 한 번 step() 실행
+      (period 는 새 프레임이 없을 때 마지막 프레임으로 다시 실행하는 최대 간격, 프레임 주기보다 길게)
+    """
+
+    def __init__(self, step: Callable[[], object], period: float, clock=SYSTEM_CLOCK,
+                 catch_up: str = CATCHUP_SKIP, name: str = 'control_loop', frames=None):
+        self.name = name
+        self.scheduler = PeriodicScheduler(period, clock, catch_up)
+        self.frames = frames
+        self._last_seq = 0
+        self.lock = threading.Lock()
+        self.error = None
+        self._step = step
+        self._clock = clock
+        self._snapshot = None
+        self._running = False
+        self._thread = None
+
+    def start(self) -> 'ControlLoop':
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._clock.register(self._thread)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def snapshot(self):
+        """마지막 step() 반환값 (아직 실행 전이면 None), 참조 교체만 하므로 lock 없이 읽음"""
+        return self._snapshot
+
+    def _wait_frame(self, timeout: float) -> bool:
+        """timeout 안에 새 프레임이 오면 True (이미 와 있으면 즉시)"""
+        seq, _ = self.frames.wait_for_frame(self._last_seq, timeout=timeout)
+        if seq == self._last_seq:
+            return False
+        self._last_seq = seq
+        return True
+
+    def _run(self):
+        wait = self._wait_frame if self.frames is not None else None
+        while self._running:
+            self.scheduler.tick(wait)
+            with self.lock:
+                try:
+                    self._snapshot = self._step()
+                    self.error = None
+                except Exception as e:
+                    self.error = e
+
+
+def display_width(text: str) -> int:
+    """터미널 표시 폭 (한글 등 전각 문자는 2칸)"""
+    return sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+
+
+class ScreenRenderer:
+    """
+    curses 화면 차분 갱신: draw({(row, col): 문자열}) 을 직전 화면과 비교해 바뀐 부분만 addstr 후 refresh
+    - 매 주기 stdscr.clear() 후 전부 다시 쓰면 터미널로 화면 전체가 다시 전송됨 (SSH 에서 수~수십 ms)
+    - 같은 위치의 문자열은 앞부분이 같으면 달라진 뒤쪽만 쓰고, 짧아진 만큼은 공백으로 지움
+    - 이번에 없는 항목은 먼저 공백으로 덮어씀, 화면 밖 좌표 등 addstr 오류는 무시하고 errors 로 집계
+    """
+
+    def __init__(self, stdscr):
+        self._scr = stdscr
+        self._cells = {}
+        self.writes = 0
+        self.errors = 0
+
+    def invalidate(self):
+        """터미널 크기 변경 등으로 화면이 지워졌을 때 다음 draw() 에서 전부 다시 쓰도록 함"""
+        self._scr.clear()
+        self._cells = {}
+
+    def _put(self, row: int, col: int, text: str):
+        try:
+            self._scr.addstr(row, col, text)
+            self.writes += 1
+        except Exception:
+            self.errors += 1
+
+    def draw(self, cells: dict):
+        old = self._cells
+        for (row, col), prev in old.items():
+            if (row, col) not in cells:
+                self._put(row, col, ' ' * display_width(prev))
+        for (row, col), text in cells.items():
+            prev = old.get((row, col))
+            if prev == text:
+                continue
+            if prev is None:
+                self._put(row, col, text)
+                continue
+            i = 0
+            limit = min(len(prev), len(text))
+            while i < limit and prev[i] == text[i]:
+                i += 1
+            pad = display_width(prev[i:]) - display_width(text[i:])
+            self._put(row, col + display_width(text[:i]), text[i:] + ' ' * max(0, pad))
+        self._cells = dict(cells)
+        self._scr.refresh()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""링크 통계(LinkStats)와 감지-구동 지연 추적(LatencyTracer), 공용 Histogram"""
+
+import bisect
+import collections
+import json
+from typing import Tuple
+
+from .clock import SYSTEM_CLOCK
+from .frames import STSFrame
+
+GAP_BINS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)                 # 프레임 간격 히스토그램 경계 (ms)
+RESPONSE_BINS_MS = (10, 20, 50, 100, 200, 500, 1000, 2000)         # 명령-응답 지연 히스토그램 경계 (ms)
+LATENCY_BINS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100)       # 감지-구동 지연(프레임 나이) 히스토그램 경계 (ms)
+RESPONSE_TIMEOUT = 2.0      # 속도 변경 명령 후 이 시간 안에 Speed 가 변하지 않으면 무응답으로 집계 (s)
+RESPONSE_SPEED_DELTA = 5    # Speed 가 이만큼(mm/s) 변하면 명령에 반응한 것으로 판단
+
+
+class Histogram:
+    """고정 경계 히스토그램 (마지막 칸은 마지막 경계 이상), add() 는 bisect 한 번"""
+
+    def __init__(self, edges):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        return {
+            'edges': list(self.edges),
+            'counts': list(self.counts),
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+        }
+
+
+class LinkStats:
+    """
+    시리얼 링크 상태 계측 (수신 스레드/송신 스레드에서 갱신, stats() 로 스냅샷 조회)
+    - 프레임 간격(gap) 히스토그램: 같은 read() 조각에 함께 들어온 프레임은 간격 0
+    - 명령-응답 지연: 속도를 바꾸는 $CLR 송신 후 Speed 값이 변할 때까지 걸린 시간
+    """
+
+    def __init__(self, start_time: float):
+        self.start_time = start_time
+        self.rx_bytes = 0
+        self.frames = 0
+        self.gap_ms = Histogram(GAP_BINS_MS)
+        self.response_ms = Histogram(RESPONSE_BINS_MS)
+        self.no_response = 0
+        self._last_rx = None
+        self._probe = None          # (송신 시각, 송신 당시 Speed)
+        self._samples = collections.deque(maxlen=32)   # 수신율 계산용 (시각, 프레임 수, rx byte, tx byte)
+
+    def on_chunk(self, nbytes: int):
+        self.rx_bytes += nbytes
+
+    def on_frame(self, t_rx: float, frame: STSFrame):
+        self.frames += 1
+        if self._last_rx is not None:
+            self.gap_ms.add((t_rx - self._last_rx) * 1000.0)
+        self._last_rx = t_rx
+
+        probe = self._probe
+        if probe is not None:
+            t_sent, baseline = probe
+            if abs(frame.Speed - baseline) >= RESPONSE_SPEED_DELTA:
+                self.response_ms.add((t_rx - t_sent) * 1000.0)
+                self._probe = None
+            elif t_rx - t_sent > RESPONSE_TIMEOUT:
+                self.no_response += 1
+                self._probe = None
+
+    def on_speed_command(self, t_sent: float, target: float, current_speed: int):
+        """목표 속도가 현재 Speed 와 충분히 다른 명령만 응답 지연 측정 대상으로 등록"""
+        if abs(abs(target) - abs(current_speed)) >= RESPONSE_SPEED_DELTA:
+            self._probe = (t_sent, current_speed)
+
+    def rates(self, now: float, tx_bytes: int) -> Tuple[float, float, float]:
+        """최근 약 1초 구간의 (frames/s, rx byte/s, tx byte/s)"""
+        self._samples.append((now, self.frames, self.rx_bytes, tx_bytes))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= 1.0:
+            self._samples.popleft()
+        t0, frames0, rx0, tx0 = self._samples[0]
+        if now - t0 < 0.05:
+            # 첫 조회: 시작 이후 평균
+            t0, frames0, rx0, tx0 = self.start_time, 0, 0, 0
+        elapsed = max(now - t0, 1e-6)
+        return ((self.frames - frames0) / elapsed, (self.rx_bytes - rx0) / elapsed,
+                (tx_bytes - tx0) / elapsed)
+
+
+class LatencyChannel:
+    """LatencyTracer 의 제어기 하나에 대한 집계"""
+    __slots__ = ('decide_ms', 'write_ms', 'last_seq', 'reused')
+
+    def __init__(self, edges):
+        self.decide_ms = Histogram(edges)   # CLR 호출 시점의 프레임 나이
+        self.write_ms = Histogram(edges)    # 그 CLR 이 포트에 쓰인 시점의 프레임 나이
+        self.last_seq = 0
+        self.reused = 0                     # 이미 CLR 에 쓴 프레임으로 다시 낸 CLR 수 (새 프레임 없이 제어)
+
+
+class LatencyTracer:
+    """
+    감지-구동 지연 추적: $CLR 을 결정한 근거 STS 프레임이 몇 ms 전에 수신된 것인지 제어기별로 집계
+    - Comm 이 get_latest_data()/wait_for_frame() 을 호출한 스레드에 (순번, 수신 시각)을 남기고,
+      그 스레드의 CLR() 이 호출 시각과 함께 기록(decide) 후 송신 스케줄러를 거쳐 실제 쓰기 시각에 다시 기록(write)
+    - 교체(coalesced)/생략(suppressed)된 명령은 포트에 쓰이지 않으므로 write 에 기록하지 않음
+    - 라벨: Comm.trace_label() 로 정한 이름, 없으면 스레드 이름 (ControlLoop(name=...))
+    - 이벤트마다 dict 조회 + Histogram.add() 한 번, lock 없이 갱신 (LinkStats 와 같은 통계용 정확도)
+    """
+
+    def __init__(self, edges=LATENCY_BINS_MS, clock=SYSTEM_CLOCK):
+        self.edges = tuple(edges)
+        self.untraced = 0               # 근거 프레임 없이 낸 CLR 수 (키 입력 정지 등)
+        self._clock = clock
+        self._channels = {}
+
+    def channel(self, label: str) -> LatencyChannel:
+        channel = self._channels.get(label)
+        if channel is None:
+            channel = self._channels.setdefault(label, LatencyChannel(self.edges))
+        return channel
+
+    def record_decide(self, label: str, seq: int, age: float):
+        """CLR 호출 시점 기록 (age: 근거 프레임 수신 후 경과 시간, s)"""
+        channel = self._channels.get(label) or self.channel(label)
+        channel.decide_ms.add(age * 1000.0)
+        if seq == channel.last_seq:
+            channel.reused += 1
+        channel.last_seq = seq
+
+    def record_write(self, label: str, age: float):
+        """CLR 송신 시점 기록"""
+        (self._channels.get(label) or self.channel(label)).write_ms.add(age * 1000.0)
+
+    def reset(self):
+        self.untraced = 0
+        self._channels = {}
+
+    def snapshot(self) -> dict:
+        """{'channels': {라벨: {'decide_ms', 'write_ms', 'reused'}}, 'untraced'}"""
+        return {
+            'channels': {label: {'decide_ms': channel.decide_ms.snapshot(),
+                                 'write_ms': channel.write_ms.snapshot(),
+                                 'reused': channel.reused}
+                         for label, channel in list(self._channels.items())},
+            'untraced': self.untraced,
+        }
+
+    def dump(self, path: str) -> dict:
+        """스냅샷을 JSON 파일로 저장 (time: 벽시계 시각) 후 반환"""
+        snapshot = dict(self.snapshot(), time=self._clock.time())
+        with open(path, 'w') as f:
+            json.dump(snapshot, f, indent=1)
+        return snapshot
+
+    def summary(self) -> str:
+        """curses 화면 표시용 한 줄 요약 (제어기별 송신 시점 프레임 나이 평균/최대)"""
+        parts = []
+        for label, channel in list(self._channels.items()):
+            write = channel.write_ms
+            parts.append(f"{label} {write.total / max(write.count, 1):.1f}/{write.max:.1f}ms")
+        return "프레임 나이(송신) " + (" | ".join(parts) if parts else "-")
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""명령 송신 스케줄러 (TxScheduler): 속도 명령 병합, 정지 우선, 대역폭 제한"""
+
+import collections
+import threading
+from typing import Callable, Optional, Tuple
+
+from .clock import SYSTEM_CLOCK
+
+TX_KEEPALIVE = 0.1          # 동일한 속도 명령도 이 주기마다는 다시 송신 (STM 은 명령을 받아야 응답함)
+TX_BUDGET_RATIO = 0.5       # 명령 송신에 사용할 링크 대역폭 비율 (115200 baud -> 약 5760 byte/s)
+TX_BURST_BYTES = 64         # 대역폭 제한 안에서 한 번에 연속 송신 가능한 byte 수
+TX_QUEUE_SIZE = 32          # 속도 명령 외 일반 명령 대기열 크기 (넘치면 오래된 명령부터 버림)
+
+
+class TxScheduler:
+    """
+    Comm 내부 송신 스케줄러: 모든 스레드의 명령을 하나의 송신 스레드에서 순서대로 전송
+    - 정지 명령($CLR,0,0): 항상 맨 앞에서 전송, 대역폭 제한과 관계없이 즉시 송신하며 버려지지 않음
+    - 속도 명령: 대기 중인 이전 속도 명령은 새 명령으로 교체 (coalesced)
+                 마지막으로 보낸 명령과 같으면 keepalive 주기가 지나기 전까지 생략 (suppressed)
+    - 일반 명령: FIFO 대기열, 넘치면 가장 오래된 명령을 버림 (dropped)
+    - 정지 외 명령은 토큰 버킷으로 초당 송신 byte 수를 제한
+    - threaded=False 이면 송신 스레드 없이 외부 루프(SerialHub)가 poll() 로 송신하며,
+      명령이 등록될 때마다 on_submit() 으로 그 루프를 깨움
+    - 속도 명령에 붙인 trace 는 명령과 함께 교체/생략되고, 실제로 쓰인 명령의 trace 만 on_sent(trace) 로 전달
+    """
+
+    def __init__(self, write: Callable[[bytes], None], bytes_per_sec: float,
+                 keepalive: float = TX_KEEPALIVE, burst_bytes: int = TX_BURST_BYTES,
+                 queue_size: int = TX_QUEUE_SIZE, threaded: bool = True,
+                 on_submit: Optional[Callable[[], None]] = None,
+                 on_sent: Optional[Callable[[object], None]] = None, clock=SYSTEM_CLOCK):
+        self._write = write
+        self._clock = clock
+        self._on_submit = on_submit
+        self._on_sent = on_sent
+        self.bytes_per_sec = bytes_per_sec
+        self.keepalive = keepalive
+        self.burst_bytes = burst_bytes
+
+        self._cond = threading.Condition()
+        self._stop_pending: Optional[bytes] = None
+        self._speed_pending: Optional[bytes] = None
+        self._stop_trace = None
+        self._speed_trace = None
+        self._queue = collections.deque(maxlen=queue_size)
+        self._last_speed: Optional[bytes] = None    # 마지막으로 송신한 속도/정지 명령
+        self._last_speed_time = 0.0
+        self._tokens = float(burst_bytes)
+        self._token_time = clock.now()
+        self._in_flight = 0
+        self.counters = {'sent': 0, 'coalesced': 0, 'suppressed': 0, 'dropped': 0, 'bytes': 0}
+
+        self._running = True
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            clock.register(self._thread)
+            self._thread.start()
+
+    def submit_speed(self, data: bytes, is_stop: bool, trace=None):
+        """속도 명령 등록 (정지 명령이면 우선 전송), trace: 송신 시 on_sent() 로 돌려받을 값"""
+        with self._cond:
+            # 대기 중인 정지 명령까지 보낸 뒤의 바퀴 상태와 같은 명령이면 생략 가능
+            if self._stop_pending is not None:
+                repeated = data == self._stop_pending
+            else:
+                repeated = (data == self._last_speed and
+                            self._clock.now() - self._last_speed_time < self.keepalive)
+
+            # 아직 보내지 않은 이전 속도 명령은 새 명령으로 대체됨
+            if self._speed_pending is not None:
+                self._speed_pending = self._speed_trace = None
+                self.counters['coalesced'] += 1
+
+            if repeated:
+                self.counters['suppressed'] += 1
+                return
+            if is_stop:
+                self._stop_pending, self._stop_trace = data, trace
+            else:
+                self._speed_pending, self._speed_trace = data, trace
+            self._cond.notify()
+        self._clock.notify()
+        if self._on_submit is not None:
+            self._on_submit()
+
+    def submit(self, data: bytes):
+        """일반 명령 등록 (FIFO)"""
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.counters['dropped'] += 1
+            self._queue.append(data)
+            self._cond.notify()
+        self._clock.notify()
+        if self._on_submit is not None:
+            self._on_submit()
+
+    def depth(self) -> int:
+        """송신 대기 중인 명령 수"""
+        with self._cond:
+            return self._pending_count()
+
+    def _pending_count(self) -> int:
+        return ((self._stop_pending is not None) + (self._speed_pending is not None)
+                + len(self._queue) + self._in_flight)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 명령이 모두 송신될 때까지 대기"""
+        with self._cond:
+            return self._clock.wait_for(self._cond, lambda: self._pending_count() == 0, timeout)
+
+    def close(self, timeout: float = 0.2):
+        """남은 명령을 (timeout 안에서) 모두 보낸 뒤 송신 스레드 종료"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._clock.notify()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _take_next(self) -> Tuple[Optional[bytes], float, object]:
+        """다음에 보낼 명령, 대역폭 제한으로 기다려야 할 시간, 명령의 trace (lock 안에서 호출)"""
+        now = self._clock.now()
+        self._tokens = min(self.burst_bytes,
+                           self._tokens + (now - self._token_time) * self.bytes_per_sec)
+        self._token_time = now
+
+        trace = None
+        if self._stop_pending is not None:
+            data, self._stop_pending = self._stop_pending, None
+            trace, self._stop_trace = self._stop_trace, None
+            is_speed = True
+        else:
+            data = self._speed_pending if self._speed_pending is not None else self._queue[0]
+            if self._tokens < len(data):
+                # 기다리는 동안 새 속도 명령이 오면 그 명령으로 교체됨
+                return None, (len(data) - self._tokens) / self.bytes_per_sec, None
+            is_speed = self._speed_pending is not None
+            if is_speed:
+                self._speed_pending = None
+                trace, self._speed_trace = self._speed_trace, None
+            else:
+                self._queue.popleft()
+
+        self._tokens -= len(data)
+        if is_speed:
+            self._last_speed = data
+            self._last_speed_time = now
+        self._in_flight += 1
+        return data, 0.0, trace
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._clock.wait_for(self._cond,
+                                     lambda: not self._running or self._pending_count() > 0)
+                if self._pending_count() == 0:
+                    return
+                data, wait, trace = self._take_next()
+                if data is None:
+                    # 대역폭 대기 중에도 정지 명령이 들어오면 즉시 깨어나 먼저 송신
+                    self._clock.wait_for(self._cond,
+                                         lambda: self._stop_pending is not None or not self._running,
+                                         wait)
+                    continue
+            self._send(data, trace)
+
+    def poll(self) -> Optional[float]:
+        """
+        (threaded=False) 지금 보낼 수 있는 명령을 모두 송신하고,
+        대역폭 제한으로 남은 명령이 있으면 다시 호출해야 할 때까지의 시간(s), 없으면 None 반환
+        """
+        while True:
+            with self._cond:
+                if self._pending_count() == 0:
+                    return None
+                data, wait, trace = self._take_next()
+            if data is None:
+                return wait
+            self._send(data, trace)
+
+    def _send(self, data: bytes, trace=None):
+        """lock 밖에서 실제 쓰기 후 카운터 갱신"""
+        try:
+            self._write(data)
+            sent = True
+        except Exception as e:
+            print(f"송신 에러: {e}")
+            sent = False
+        if sent and trace is not None and self._on_sent is not None:
+            self._on_sent(trace)
+
+        with self._cond:
+            self._in_flight -= 1
+            if sent:
+                self.counters['sent'] += 1
+                self.counters['bytes'] += len(data)
+            else:
+                self.counters['dropped'] += 1
+            self._cond.notify_all()
+        self._clock.notify()